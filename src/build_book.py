@@ -0,0 +1,25 @@
+import argparse
+from engine.services.opening_book import build_book
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book from PGN files.")
+    parser.add_argument("pgn_files", nargs="+", help="PGN game collections")
+    parser.add_argument("--output", default="assets/opening_book.bin", help="book file to write")
+    parser.add_argument("--max-ply", type=int, default=16, help="half-moves per game, default 16")
+    parser.add_argument(
+        "--min-count", type=int, default=1, help="games needed to add a move, default 1"
+    )
+    args = parser.parse_args()
+
+    pgn_texts = []
+    for pgn_file in args.pgn_files:
+        with open(pgn_file, encoding="utf-8", errors="replace") as file:
+            pgn_texts.append(file.read())
+
+    games, entries = build_book(pgn_texts, args.output, args.max_ply, args.min_count)
+    print(f"{games} games, {entries} book entries written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import argparse
+from engine.services.tablebase_generator import DEFAULT_SIGNATURES, generate_tablebases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate endgame tablebases.")
+    parser.add_argument(
+        "signatures",
+        nargs="*",
+        default=DEFAULT_SIGNATURES,
+        help=f"materials such as KQvK, default {' '.join(DEFAULT_SIGNATURES)}",
+    )
+    parser.add_argument("--output", default="assets/tablebases", help="directory of the tables")
+    args = parser.parse_args()
+
+    generate_tablebases(args.output, args.signatures)
+
+
+if __name__ == "__main__":
+    main()
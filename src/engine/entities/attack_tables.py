@@ -0,0 +1,91 @@
+from .pieces import BISHOP, ROOK, QUEEN, WHITE, BLACK
+
+# Row step of a pawn of each color, row 0 is black's back rank and row 7 is white's
+PAWN_DIRECTIONS = {WHITE: -1, BLACK: 1}
+
+KNIGHT_OFFSETS = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+KING_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+BISHOP_DIRECTIONS = [(-1, -1), (-1, 1), (1, 1), (1, -1)]
+ROOK_DIRECTIONS = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+
+
+def _is_in_bounds(row, col):
+    return 0 <= row < 8 and 0 <= col < 8
+
+
+def _targets(offsets):
+    """Builds the squares reachable from each square by a single step of the offsets."""
+    return [
+        tuple(
+            (row + row_offset) * 8 + col + col_offset
+            for row_offset, col_offset in offsets
+            if _is_in_bounds(row + row_offset, col + col_offset)
+        )
+        for row in range(8)
+        for col in range(8)
+    ]
+
+
+def _mask(squares):
+    """Builds the occupancy mask of squares, see engine.entities.bitboard."""
+    mask = 0
+    for square in squares:
+        mask |= 1 << square
+    return mask
+
+
+def _rays(directions):
+    """Builds the rays from each square to the board edge, leaving out empty rays."""
+    rays = []
+    for row in range(8):
+        for col in range(8):
+            square_rays = []
+            for row_direction, col_direction in directions:
+                ray = []
+                new_row, new_col = row + row_direction, col + col_direction
+                while _is_in_bounds(new_row, new_col):
+                    ray.append(new_row * 8 + new_col)
+                    new_row += row_direction
+                    new_col += col_direction
+                if ray:
+                    square_rays.append(tuple(ray))
+            rays.append(tuple(square_rays))
+    return rays
+
+
+# All tables are indexed by square row * 8 + col and hold square indexes
+
+KNIGHT_TARGETS = _targets(KNIGHT_OFFSETS)
+KING_TARGETS = _targets(KING_OFFSETS)
+
+# Squares attacked by a pawn of each color standing on a square
+PAWN_ATTACKS = {
+    color: _targets([(PAWN_DIRECTIONS[color], -1), (PAWN_DIRECTIONS[color], 1)])
+    for color in (WHITE, BLACK)
+}
+
+# Rays ordered outwards from the square, one per direction
+BISHOP_RAYS = _rays(BISHOP_DIRECTIONS)
+ROOK_RAYS = _rays(ROOK_DIRECTIONS)
+
+# Rays in all directions, each with the ranks of the sliders that attack along it
+SLIDER_RAYS = [
+    tuple((ray, {BISHOP, QUEEN}) for ray in bishop_rays)
+    + tuple((ray, {ROOK, QUEEN}) for ray in rook_rays)
+    for bishop_rays, rook_rays in zip(BISHOP_RAYS, ROOK_RAYS)
+]
+
+# The same tables as masks for BitBoard, each slider ray with whether it runs towards higher
+# squares, so its nearest piece is the lowest set bit, and whether it is diagonal
+KNIGHT_MASKS = [_mask(targets) for targets in KNIGHT_TARGETS]
+KING_MASKS = [_mask(targets) for targets in KING_TARGETS]
+PAWN_ATTACK_MASKS = {
+    color: [_mask(targets) for targets in PAWN_ATTACKS[color]] for color in PAWN_ATTACKS
+}
+SLIDER_RAY_MASKS = [
+    tuple(
+        (_mask(ray), ray[0] > square, piece_types == {BISHOP, QUEEN}) for ray, piece_types in rays
+    )
+    for square, rays in enumerate(SLIDER_RAYS)
+]
@@ -0,0 +1,96 @@
+from .board import Board, OPPONENT
+from .pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_CODE_COUNT
+from .attack_tables import KNIGHT_MASKS, KING_MASKS, PAWN_ATTACK_MASKS, SLIDER_RAY_MASKS
+
+
+class BitBoard(Board):
+    """Board backend that stores pieces as 64-bit occupancy masks.
+
+    Square (row, col) maps to bit row * 8 + col of each mask. The masks are kept next to
+    the array of piece codes of Board, so squares are still read by indexing, and both are
+    updated together by set_piece and make_move. Exposes the same interface as Board, so it
+    can be used in its place.
+
+    Attributes:
+        squares: Array of 64 piece codes, square (row, col) at index row * 8 + col.
+        piece_masks: List of occupancy masks indexed by piece code, 0 for unused codes.
+        occupied: Mask of all occupied squares.
+        side_to_move: Color (WHITE or BLACK) of the player whose turn it is.
+        stall_clock: Number of moves without captures or pawn advances.
+        fullmove_number: Number of the current full move, starting at 1 and increased after
+            black's move.
+        en_passant_target: Optional (row, col) tuple of the square a pawn skipped on the last move.
+        king_positions: Positions of both kings.
+        castling_rights: Bitmask of castling rights left, kept up to date by make_move.
+        zobrist_key: 64-bit position hash, kept up to date by set_piece and make_move.
+        phase: Game phase from the pieces left on the board, kept up to date by set_piece.
+        midgame_score: Material and middlegame piece-square score from white's point of
+            view, kept up to date by set_piece.
+        endgame_score: Material and endgame piece-square score from white's point of view.
+    """
+
+    def __init__(self):
+        """Initializes board and piece positions."""
+        super().__init__()
+        self.piece_masks = [0] * PIECE_CODE_COUNT
+        self.occupied = 0
+        for square, piece in enumerate(self.squares):
+            if piece:
+                self.piece_masks[piece] |= 1 << square
+                self.occupied |= 1 << square
+
+    def _set_square(self, square, piece):
+        bit = 1 << square
+        squares = self.squares
+        old_piece = squares[square]
+        squares[square] = piece
+
+        if old_piece:
+            self.piece_masks[old_piece] ^= bit
+            self.occupied ^= bit
+        if piece:
+            self.piece_masks[piece] |= bit
+            self.occupied |= bit
+
+        self._update_key(square, old_piece, piece)
+        self._update_eval(square, old_piece, piece)
+
+    def is_attacked(self, square, attacker_color):
+        """Checks if a square is attacked by the pieces of a color, using the masks.
+
+        Args:
+            square: Index row * 8 + col of the square.
+            attacker_color: Color of the attacking pieces.
+
+        Returns:
+            Boolean for whether the square is under attack.
+        """
+        piece_masks = self.piece_masks
+        if KNIGHT_MASKS[square] & piece_masks[attacker_color | KNIGHT]:
+            return True
+        pawn_mask = piece_masks[attacker_color | PAWN]
+        if PAWN_ATTACK_MASKS[OPPONENT[attacker_color]][square] & pawn_mask:
+            return True
+        if KING_MASKS[square] & piece_masks[attacker_color | KING]:
+            return True
+
+        queens = piece_masks[attacker_color | QUEEN]
+        diagonal_sliders = piece_masks[attacker_color | BISHOP] | queens
+        straight_sliders = piece_masks[attacker_color | ROOK] | queens
+        occupied = self.occupied
+        for ray_mask, increasing, diagonal in SLIDER_RAY_MASKS[square]:
+            sliders = ray_mask & (diagonal_sliders if diagonal else straight_sliders)
+            if not sliders:
+                continue
+            blockers = ray_mask & occupied
+            # The nearest piece on the ray is its lowest or highest set bit
+            nearest = blockers & -blockers if increasing else 1 << blockers.bit_length() - 1
+            if nearest & sliders:
+                return True
+        return False
+
+    def copy(self):
+        new_board = super().copy()
+        new_board.piece_masks = self.piece_masks.copy()
+        new_board.occupied = self.occupied
+        return new_board
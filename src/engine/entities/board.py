@@ -1,29 +1,175 @@
-import copy
-import numpy as np
+from array import array
+from .pieces import (
+    EMPTY,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE,
+    BLACK,
+    RANK_MASK,
+    COLOR_MASK,
+    RANK_NAMES,
+    COLOR_NAMES,
+)
+from .zobrist import (
+    PIECE_KEYS,
+    SIDE_KEY,
+    CASTLING_KEYS,
+    EN_PASSANT_KEYS,
+    ALL_CASTLING_RIGHTS,
+    CASTLING_RIGHTS_KEPT,
+    compute_key,
+)
+from .move import PROMOTION, EN_PASSANT, CASTLING, START_SHIFT, FLAG_SHIFT, SQUARE_MASK
+from .attack_tables import (
+    PAWN_DIRECTIONS,
+    KNIGHT_TARGETS,
+    KING_TARGETS,
+    PAWN_ATTACKS,
+    SLIDER_RAYS,
+)
+from .piece_square_tables import (
+    PIECE_PHASES,
+    MIDGAME_SCORES,
+    ENDGAME_SCORES,
+    compute_eval_scores,
+)
+
+OPPONENT = {WHITE: BLACK, BLACK: WHITE}
+
+# Row tables per color, row 0 is black's back rank and row 7 is white's
+PAWN_START_ROWS = {WHITE: 6, BLACK: 1}
+PROMOTION_ROWS = {WHITE: 0, BLACK: 7}
+HOME_ROWS = {WHITE: 7, BLACK: 0}
+
+FEN_PIECES = {
+    "p": PAWN,
+    "n": KNIGHT,
+    "b": BISHOP,
+    "r": ROOK,
+    "q": QUEEN,
+    "k": KING,
+}
+
+# Castling right bits by their letter in the FEN castling field
+FEN_CASTLING_RIGHTS = {"K": 1, "Q": 2, "k": 4, "q": 8}
 
 
 class Board:
     """Represents the chess board and game state.
 
+    The board has a fixed orientation with white's pieces starting on rows 6 and 7.
+    Pieces are integer codes, see engine.entities.pieces.
+
     Attributes:
-        board_matrix: 8x8 matrix of Piece objects or None.
-        player_color: Color whose perspective the board is oriented by.
+        squares: Array of 64 piece codes, square (row, col) at index row * 8 + col.
+        side_to_move: Color (WHITE or BLACK) of the player whose turn it is.
         stall_clock: Number of moves without captures or pawn advances.
-        en_passant_target: Optional tuple for en passant capture target.
-        king_positions: Positions of both kings from the corresponding color's perspective.
+        fullmove_number: Number of the current full move, starting at 1 and increased after
+            black's move.
+        en_passant_target: Optional (row, col) tuple of the square a pawn skipped on the last move.
+        king_positions: Positions of both kings.
+        castling_rights: Bitmask of castling rights left, kept up to date by make_move.
+        zobrist_key: 64-bit position hash, kept up to date by set_piece and make_move.
+        phase: Game phase from the pieces left on the board, kept up to date by set_piece.
+        midgame_score: Material and middlegame piece-square score from white's point of
+            view, kept up to date by set_piece.
+        endgame_score: Material and endgame piece-square score from white's point of view.
     """
 
-    def __init__(self, player_color: str):
-        """Initializes board and piece positions.
+    def __init__(self):
+        """Initializes board and piece positions."""
+        self.squares = self._setup_board()
+        self.side_to_move = WHITE
+        self.stall_clock = 0
+        self.fullmove_number = 1
+        self.en_passant_target = None
+        self.king_positions = {WHITE: (7, 4), BLACK: (0, 4)}
+        self.castling_rights = ALL_CASTLING_RIGHTS
+        self.zobrist_key = compute_key(self)
+        self.phase, self.midgame_score, self.endgame_score = compute_eval_scores(self)
+
+    @classmethod
+    def from_fen(cls, fen):
+        """Creates a board from a position in Forsyth-Edwards Notation.
 
         Args:
-            player_color: Color ("white" or "black") of the player.
+            fen: FEN string, the move counters at the end are optional.
+
+        Returns:
+            Board object.
         """
-        self.board_matrix = self._setup_board(player_color)
-        self.player_color = player_color
-        self.stall_clock = 0
-        self.en_passant_target = None
-        self.king_positions = {"white": (7, 4), "black": (7, 3)}
+        placement, side, castling, en_passant, *counters = fen.split()
+        board = cls()
+
+        for row, rank in enumerate(placement.split("/")):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    for _ in range(int(char)):
+                        board.set_piece((row, col), EMPTY)
+                        col += 1
+                    continue
+
+                color = WHITE if char.isupper() else BLACK
+                rank = FEN_PIECES[char.lower()]
+                if rank == KING:
+                    board.king_positions[color] = (row, col)
+                board.set_piece((row, col), color | rank)
+                col += 1
+
+        board.castling_rights = 0
+        for char in castling.replace("-", ""):
+            board.castling_rights |= FEN_CASTLING_RIGHTS[char]
+
+        board.side_to_move = WHITE if side == "w" else BLACK
+        board.en_passant_target = (
+            None if en_passant == "-" else (8 - int(en_passant[1]), ord(en_passant[0]) - ord("a"))
+        )
+        board.stall_clock = int(counters[0]) if counters else 0
+        board.fullmove_number = int(counters[1]) if len(counters) > 1 else 1
+        board.zobrist_key = compute_key(board)
+        return board
+
+    def to_fen(self):
+        """Describes the position in Forsyth-Edwards Notation.
+
+        Returns:
+            FEN string that from_fen turns back into the same position.
+        """
+        fen_chars = {rank: char for char, rank in FEN_PIECES.items()}
+        ranks = []
+        for row in range(8):
+            rank = ""
+            empty_squares = 0
+            for col in range(8):
+                piece = self.get_piece((row, col))
+                if not piece:
+                    empty_squares += 1
+                    continue
+                if empty_squares:
+                    rank += str(empty_squares)
+                    empty_squares = 0
+                char = fen_chars[piece & RANK_MASK]
+                rank += char.upper() if piece & COLOR_MASK == WHITE else char
+            ranks.append(rank + (str(empty_squares) if empty_squares else ""))
+
+        castling = "".join(
+            char for char, bit in FEN_CASTLING_RIGHTS.items() if self.castling_rights & bit
+        )
+        en_passant = "-"
+        if self.en_passant_target:
+            row, col = self.en_passant_target
+            en_passant = f"{chr(ord('a') + col)}{8 - row}"
+
+        side = "w" if self.side_to_move == WHITE else "b"
+        return (
+            f"{'/'.join(ranks)} {side} {castling or '-'} {en_passant} "
+            f"{self.stall_clock} {self.fullmove_number}"
+        )
 
     def get_piece(self, position):
         """Gets the piece at a position.
@@ -32,64 +178,271 @@ class Board:
             position: (row, col) tuple for a board square.
 
         Returns:
-            Piece or None, if no piece at location.
+            Integer piece code, EMPTY (0) if no piece at location.
         """
         row, col = position
-        return self.board_matrix[row][col]
+        return self.squares[row * 8 + col]
 
     def set_piece(self, position, piece):
         """Sets a piece at a position.
 
         Args:
             position: (row, col) tuple for a board square.
-            piece: Piece or None, if eaten piece's position is not replaced by another.
+            piece: Integer piece code, EMPTY if eaten piece's position is not replaced by another.
         """
         row, col = position
-        self.board_matrix[row][col] = piece
+        self._set_square(row * 8 + col, piece)
+
+    def is_attacked(self, square, attacker_color):
+        """Checks if a square is attacked by the pieces of a color.
+
+        Args:
+            square: Index row * 8 + col of the square.
+            attacker_color: Color of the attacking pieces.
+
+        Returns:
+            Boolean for whether the square is under attack.
+        """
+        if self._attacked_by_sliders(square, attacker_color):
+            return True
+        if self._attacked_by_piece(KNIGHT_TARGETS[square], attacker_color | KNIGHT):
+            return True
+        # A pawn attacks the square from where a pawn of the other color on it would attack
+        if self._attacked_by_piece(
+            PAWN_ATTACKS[OPPONENT[attacker_color]][square], attacker_color | PAWN
+        ):
+            return True
+        return self._attacked_by_piece(KING_TARGETS[square], attacker_color | KING)
+
+    def make_move(self, move):
+        """Makes a move in place without checking its legality and passes the turn.
+
+        Args:
+            move: Integer move, see engine.entities.move.
+
+        Returns:
+            Undo record to pass to unmake_move.
+        """
+        start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+        flag = move >> FLAG_SHIFT
+        moved_piece = self.squares[start]
+        color, rank = moved_piece & COLOR_MASK, moved_piece & RANK_MASK
+        king_pos = self.king_positions[color]
+        en_passant_target, stall_clock = self.en_passant_target, self.stall_clock
+        castling_rights, zobrist_key = self.castling_rights, self.zobrist_key
+
+        captured_square = self._make_special_move(start, end, flag, color, rank)
+        captured_piece = self.squares[captured_square]
+        undo = (
+            moved_piece,
+            captured_piece,
+            captured_square,
+            en_passant_target,
+            stall_clock,
+            king_pos,
+            castling_rights,
+            zobrist_key,
+        )
+
+        self.zobrist_key ^= SIDE_KEY
+        if en_passant_target:
+            self.zobrist_key ^= EN_PASSANT_KEYS[en_passant_target[1]]
+        if self.en_passant_target:
+            self.zobrist_key ^= EN_PASSANT_KEYS[self.en_passant_target[1]]
+
+        # Moving from or to a king's or rook's starting square loses castling rights
+        self.castling_rights &= CASTLING_RIGHTS_KEPT[start] & CASTLING_RIGHTS_KEPT[end]
+        if self.castling_rights != castling_rights:
+            self.zobrist_key ^= CASTLING_KEYS[castling_rights] ^ CASTLING_KEYS[self.castling_rights]
 
-    def flip_board(self):
-        """Flips board perspective."""
-        self.board_matrix = self.board_matrix[::-1, ::-1]
-        self.player_color = "white" if self.player_color == "black" else "black"
+        if rank == PAWN or captured_piece:
+            self.stall_clock = 0
+            if flag == PROMOTION:
+                moved_piece = color | QUEEN
+        else:
+            self.stall_clock += 1
+
+        self._set_square(captured_square, EMPTY)
+        self._set_square(start, EMPTY)
+        self._set_square(end, moved_piece)
+
+        if rank == KING:
+            self.king_positions[color] = divmod(end, 8)
+
+        if color == BLACK:
+            self.fullmove_number += 1
+        self.side_to_move = OPPONENT[color]
+        return undo
+
+    def unmake_move(self, move, undo):
+        """Takes back a move made with make_move.
+
+        Args:
+            move: Integer move.
+            undo: Undo record returned by make_move.
+        """
+        start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+        moved_piece, captured_piece, captured_square, en_passant_target = undo[:4]
+        stall_clock, king_pos, castling_rights, zobrist_key = undo[4:]
+
+        self._set_square(start, moved_piece)
+        self._set_square(end, EMPTY)
+        if captured_piece:
+            self._set_square(captured_square, captured_piece)
+
+        if move >> FLAG_SHIFT == CASTLING:
+            rook_start, rook_end = _castling_rook_squares(start, end)
+            self._set_square(rook_start, self.squares[rook_end])
+            self._set_square(rook_end, EMPTY)
+
+        color = moved_piece & COLOR_MASK
+        if color == BLACK:
+            self.fullmove_number -= 1
+        self.side_to_move = color
+        self.en_passant_target = en_passant_target
+        self.stall_clock = stall_clock
+        self.king_positions[color] = king_pos
+        self.castling_rights = castling_rights
+        self.zobrist_key = zobrist_key
+
+    def make_null_move(self):
+        """Passes the turn without moving, for null move pruning in the search.
+
+        Returns:
+            Undo record to pass to unmake_null_move.
+        """
+        undo = (self.en_passant_target, self.zobrist_key)
+        self.zobrist_key ^= SIDE_KEY
+        if self.en_passant_target:
+            self.zobrist_key ^= EN_PASSANT_KEYS[self.en_passant_target[1]]
+            self.en_passant_target = None
+        self.side_to_move = OPPONENT[self.side_to_move]
+        return undo
+
+    def unmake_null_move(self, undo):
+        """Takes back a null move made with make_null_move.
+
+        Args:
+            undo: Undo record returned by make_null_move.
+        """
+        self.en_passant_target, self.zobrist_key = undo
+        self.side_to_move = OPPONENT[self.side_to_move]
 
     def __repr__(self):
         board_str = ""
-        for row in self.board_matrix:
+        for row in range(8):
             row_str = ""
-            for piece in row:
+            for piece in self.squares[row * 8 : row * 8 + 8]:
                 if not piece:
                     row_str += "-- "
                 else:
-                    color, rank, _ = piece
-                    abbrev = rank[0].upper() if rank != "knight" else "N"
-                    row_str += f"{color[0]}{abbrev} "
+                    rank = piece & RANK_MASK
+                    abbrev = RANK_NAMES[rank][0].upper() if rank != KNIGHT else "N"
+                    row_str += f"{COLOR_NAMES[piece & COLOR_MASK][0]}{abbrev} "
             board_str += row_str + "\n"
         return board_str
 
-    @staticmethod
-    def _setup_board(player_color):
-        board_matrix = np.full((8, 8), None, dtype=object)
-        enemy_color = "white" if player_color == "black" else "black"
+    def _set_square(self, square, piece):
+        """Sets a piece on a square given by its index, keeping the key and scores up to date."""
+        old_piece = self.squares[square]
+        self.squares[square] = piece
+        self._update_key(square, old_piece, piece)
+        self._update_eval(square, old_piece, piece)
 
-        if enemy_color == "black":
-            enemy_pieces = ["rook", "knight", "bishop", "queen", "king", "bishop", "knight", "rook"]
-            own_pieces = ["rook", "knight", "bishop", "queen", "king", "bishop", "knight", "rook"]
-        else:
-            enemy_pieces = ["rook", "knight", "bishop", "king", "queen", "bishop", "knight", "rook"]
-            own_pieces = ["rook", "knight", "bishop", "king", "queen", "bishop", "knight", "rook"]
+    def _attacked_by_sliders(self, square, attacker_color):
+        """Checks if a square is attacked by bishops, rooks, or queens."""
+        squares = self.squares
+        for ray, piece_types in SLIDER_RAYS[square]:
+            for ray_square in ray:
+                piece = squares[ray_square]
+                if piece:
+                    if piece & COLOR_MASK == attacker_color and piece & RANK_MASK in piece_types:
+                        return True
+                    break
+        return False
+
+    def _attacked_by_piece(self, targets, attacker):
+        """Checks if any of the target squares holds the attacking piece."""
+        squares = self.squares
+        for target in targets:
+            if squares[target] == attacker:
+                return True
+        return False
+
+    def _update_eval(self, square, old_piece, new_piece):
+        """Updates the phase and piece-square totals after a square has changed."""
+        if old_piece:
+            self.phase -= PIECE_PHASES[old_piece]
+            self.midgame_score -= MIDGAME_SCORES[old_piece][square]
+            self.endgame_score -= ENDGAME_SCORES[old_piece][square]
+
+        if new_piece:
+            self.phase += PIECE_PHASES[new_piece]
+            self.midgame_score += MIDGAME_SCORES[new_piece][square]
+            self.endgame_score += ENDGAME_SCORES[new_piece][square]
 
-        board_matrix[0] = [(enemy_color, piece, False) for piece in enemy_pieces]
-        board_matrix[1] = [(enemy_color, "pawn", False) for _ in range(8)]
-        board_matrix[6] = [(player_color, "pawn", False) for _ in range(8)]
-        board_matrix[7] = [(player_color, piece, False) for piece in own_pieces]
+    def _update_key(self, square, old_piece, new_piece):
+        """Updates the Zobrist key after a square has changed."""
+        if old_piece:
+            self.zobrist_key ^= PIECE_KEYS[old_piece][square]
+        if new_piece:
+            self.zobrist_key ^= PIECE_KEYS[new_piece][square]
+
+    def _make_special_move(self, start, end, flag, color, rank):
+        """Updates en passant target and moves the castling rook.
+
+        Returns:
+            Index of the square a capturing move takes a piece from.
+        """
+        captured_square = end
+        self.en_passant_target = None
 
-        return board_matrix
+        # Pawn double step
+        if rank == PAWN and abs(start - end) == 16:
+            self.en_passant_target = divmod(start + PAWN_DIRECTIONS[color] * 8, 8)
+
+        # En passant, the captured pawn is beside the start square
+        elif flag == EN_PASSANT:
+            captured_square = start & ~7 | end & 7
+
+        # Castling
+        elif flag == CASTLING:
+            rook_start, rook_end = _castling_rook_squares(start, end)
+            self._set_square(rook_end, self.squares[rook_start])
+            self._set_square(rook_start, EMPTY)
+
+        return captured_square
+
+    @staticmethod
+    def _setup_board():
+        squares = array("b", [EMPTY] * 64)
+        back_rank = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK]
+
+        for color in (WHITE, BLACK):
+            home_row, pawn_row = HOME_ROWS[color] * 8, PAWN_START_ROWS[color] * 8
+            squares[home_row : home_row + 8] = array("b", [color | rank for rank in back_rank])
+            squares[pawn_row : pawn_row + 8] = array("b", [color | PAWN] * 8)
+
+        return squares
 
     def copy(self):
         new_board = self.__class__.__new__(self.__class__)
-        new_board.board_matrix = self.board_matrix.copy()
-        new_board.player_color = self.player_color
+        new_board.squares = self.squares[:]
+        new_board.side_to_move = self.side_to_move
         new_board.stall_clock = self.stall_clock
-        new_board.en_passant_target = copy.copy(self.en_passant_target)
+        new_board.fullmove_number = self.fullmove_number
+        new_board.en_passant_target = self.en_passant_target
         new_board.king_positions = self.king_positions.copy()
+        new_board.castling_rights = self.castling_rights
+        new_board.zobrist_key = self.zobrist_key
+        new_board.phase = self.phase
+        new_board.midgame_score = self.midgame_score
+        new_board.endgame_score = self.endgame_score
         return new_board
+
+
+def _castling_rook_squares(king_start, king_end):
+    """Gets the rook's start and end squares for a castling king move."""
+    if king_end < king_start:
+        return king_start - 4, king_start - 1
+    return king_start + 3, king_start + 1
@@ -0,0 +1,80 @@
+from .pieces import PAWN, KING, RANK_MASK
+
+# A move is a 16-bit integer: flag << 12 | start square << 6 | end square, where a square is
+# row * 8 + col. The flag marks the moves that change more than the two squares.
+NORMAL = 0
+PROMOTION = 1
+EN_PASSANT = 2
+CASTLING = 3
+
+START_SHIFT = 6
+FLAG_SHIFT = 12
+SQUARE_MASK = 63
+# Start and end squares without the flag, also the move format of the opening book
+SQUARES_MASK = 0xFFF
+
+
+def encode_move(start_pos, end_pos, flag=NORMAL):
+    """Packs a move into an integer.
+
+    Args:
+        start_pos: (row, col) tuple of the square the piece moves from.
+        end_pos: (row, col) tuple of the square the piece moves to.
+        flag: NORMAL, PROMOTION, EN_PASSANT or CASTLING.
+
+    Returns:
+        Integer move.
+    """
+    (start_row, start_col), (end_row, end_col) = start_pos, end_pos
+    return flag << FLAG_SHIFT | (start_row * 8 + start_col) << START_SHIFT | end_row * 8 + end_col
+
+
+def decode_move(move):
+    """Unpacks the squares of a move.
+
+    Args:
+        move: Integer move.
+
+    Returns:
+        (start, end) positions as (row, col) tuples.
+    """
+    return divmod(move >> START_SHIFT & SQUARE_MASK, 8), divmod(move & SQUARE_MASK, 8)
+
+
+def move_from_positions(board, start_pos, end_pos):
+    """Packs a move given by its squares, finding its flag from the piece that moves.
+
+    Moves entered by the player and read from files have no flag, so this converts them
+    before they are compared with generated moves.
+
+    Args:
+        board: Board object before the move.
+        start_pos: (row, col) tuple of the square the piece moves from.
+        end_pos: (row, col) tuple of the square the piece moves to.
+
+    Returns:
+        Integer move.
+    """
+    rank = board.get_piece(start_pos) & RANK_MASK
+    flag = NORMAL
+    if rank == PAWN:
+        if end_pos[0] in (0, 7):
+            flag = PROMOTION
+        elif start_pos[1] != end_pos[1] and not board.get_piece(end_pos):
+            # Pawns only move sideways onto an empty square when capturing en passant
+            flag = EN_PASSANT
+    elif rank == KING and abs(start_pos[1] - end_pos[1]) == 2:
+        flag = CASTLING
+    return encode_move(start_pos, end_pos, flag)
+
+
+def move_name(move):
+    """Names a move by its squares in coordinate notation, e.g. "e2e4".
+
+    Args:
+        move: Integer move.
+
+    Returns:
+        String of the start and end square names.
+    """
+    return "".join(f"{chr(ord('a') + col)}{8 - row}" for row, col in decode_move(move))
@@ -0,0 +1,204 @@
+import numpy as np
+from .pieces import (
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE,
+    BLACK,
+    RANKS,
+    RANK_MASK,
+    PIECE_CODE_COUNT,
+)
+
+PIECE_VALUES = {
+    PAWN: 100,
+    KNIGHT: 320,
+    BISHOP: 330,
+    ROOK: 510,
+    QUEEN: 975,
+    KING: 0,
+}
+
+# Piece-square tables from white's point of view, row 0 being black's back rank
+MIDGAME_POSITION_VALUES = {
+    PAWN: [
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [10, 10, 20, 35, 35, 20, 10, 10],
+        [5, 5, 10, 30, 30, 10, 5, 5],
+        [0, 0, 0, 25, 25, 0, 0, 0],
+        [5, -5, -10, 5, 5, -10, -5, 5],
+        [5, 10, 10, -25, -25, 10, 10, 5],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ],
+    KNIGHT: [
+        [-50, -40, -30, -30, -30, -30, -40, -50],
+        [-40, -20, 0, 0, 0, 0, -20, -40],
+        [-30, 0, 10, 15, 15, 10, 0, -30],
+        [-30, 5, 15, 25, 25, 15, 5, -30],
+        [-30, 0, 15, 25, 25, 15, 0, -30],
+        [-30, 5, 10, 15, 15, 10, 5, -30],
+        [-40, -20, 0, 5, 5, 0, -20, -40],
+        [-50, -40, -30, -30, -30, -30, -40, -50],
+    ],
+    BISHOP: [
+        [-20, -10, -10, -10, -10, -10, -10, -20],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-10, 0, 5, 10, 10, 5, 0, -10],
+        [-10, 5, 5, 10, 10, 5, 5, -10],
+        [-10, 0, 10, 12, 12, 10, 0, -10],
+        [-10, 10, 10, 10, 10, 10, 10, -10],
+        [-10, 5, 0, 0, 0, 0, 5, -10],
+        [-20, -10, -10, -10, -10, -10, -10, -20],
+    ],
+    ROOK: [
+        [0, 0, 0, 5, 5, 0, 0, 0],
+        [35, 40, 40, 40, 40, 40, 40, 35],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [-5, 0, 0, 0, 0, 0, 0, -5],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ],
+    QUEEN: [
+        [-20, -10, -10, -5, -5, -10, -10, -20],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-10, 0, 5, 5, 5, 5, 0, -10],
+        [-5, 0, 5, 5, 5, 5, 0, -5],
+        [0, 0, 5, 5, 5, 5, 0, -5],
+        [-10, 5, 5, 5, 5, 5, 0, -10],
+        [-10, 0, 5, 0, 0, 0, 0, -10],
+        [-20, -10, -10, -5, -5, -10, -10, -20],
+    ],
+    KING: [
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-30, -40, -40, -50, -50, -40, -40, -30],
+        [-20, -30, -30, -40, -40, -30, -30, -20],
+        [-10, -20, -20, -20, -20, -20, -20, -10],
+        [20, 20, 0, 0, 0, 0, 20, 20],
+        [20, 30, 10, 0, 0, 10, 30, 20],
+    ],
+}
+
+ENDGAME_POSITION_VALUES = {
+    PAWN: [
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [80, 80, 80, 80, 80, 80, 80, 80],
+        [50, 50, 50, 50, 50, 50, 50, 50],
+        [30, 30, 30, 30, 30, 30, 30, 30],
+        [20, 20, 20, 20, 20, 20, 20, 20],
+        [10, 10, 10, 10, 10, 10, 10, 10],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ],
+    KNIGHT: [
+        [-50, -40, -30, -30, -30, -30, -40, -50],
+        [-40, -20, -10, -5, -5, -10, -20, -40],
+        [-30, -10, 10, 15, 15, 10, -10, -30],
+        [-30, -5, 15, 20, 20, 15, -5, -30],
+        [-30, -5, 15, 20, 20, 15, -5, -30],
+        [-30, -10, 10, 15, 15, 10, -10, -30],
+        [-40, -20, -10, -5, -5, -10, -20, -40],
+        [-50, -40, -30, -30, -30, -30, -40, -50],
+    ],
+    BISHOP: [
+        [-15, -10, -10, -10, -10, -10, -10, -15],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-10, 0, 5, 10, 10, 5, 0, -10],
+        [-10, 0, 10, 15, 15, 10, 0, -10],
+        [-10, 0, 10, 15, 15, 10, 0, -10],
+        [-10, 0, 5, 10, 10, 5, 0, -10],
+        [-10, 0, 0, 0, 0, 0, 0, -10],
+        [-15, -10, -10, -10, -10, -10, -10, -15],
+    ],
+    ROOK: [
+        [10, 10, 10, 10, 10, 10, 10, 10],
+        [20, 20, 20, 20, 20, 20, 20, 20],
+        [5, 5, 5, 5, 5, 5, 5, 5],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ],
+    QUEEN: [
+        [-20, -10, -10, -5, -5, -10, -10, -20],
+        [-10, 0, 5, 5, 5, 5, 0, -10],
+        [-10, 5, 10, 10, 10, 10, 5, -10],
+        [-5, 5, 10, 15, 15, 10, 5, -5],
+        [-5, 5, 10, 15, 15, 10, 5, -5],
+        [-10, 5, 10, 10, 10, 10, 5, -10],
+        [-10, 0, 5, 5, 5, 5, 0, -10],
+        [-20, -10, -10, -5, -5, -10, -10, -20],
+    ],
+    KING: [
+        [-20, -30, -30, -30, -30, -30, -30, -20],
+        [-10, -20, -20, -20, -20, -20, -20, -10],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [5, 5, 10, 20, 20, 10, 5, 5],
+        [5, 5, 10, 20, 20, 10, 5, 5],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+    ],
+}
+
+# Game phase weights, the phase is the sum over all pieces on the board.
+# MAX_PHASE is the phase of the initial position and stands for the middlegame, 0 for the endgame.
+PHASE_WEIGHTS = {PAWN: 0, KNIGHT: 1, BISHOP: 1, ROOK: 2, QUEEN: 4, KING: 0}
+MAX_PHASE = 24
+
+
+def _square_tables(position_values):
+    """Flattens piece-square tables into an array indexed by piece code and square.
+
+    Squares are row * 8 + col. Scores include the piece value and are positive for white
+    and negative for black. Rows of unused piece codes are zeros.
+    """
+    tables = np.zeros((PIECE_CODE_COUNT, 64), dtype=np.int32)
+    for rank in RANKS:
+        table = np.array(position_values[rank], dtype=np.int32) + PIECE_VALUES[rank]
+        tables[WHITE | rank] = table.ravel()
+        # Black's pieces use the tables turned around
+        tables[BLACK | rank] = -table[::-1, ::-1].ravel()
+    return tables
+
+
+MIDGAME_TABLES = _square_tables(MIDGAME_POSITION_VALUES)
+ENDGAME_TABLES = _square_tables(ENDGAME_POSITION_VALUES)
+PHASE_TABLE = np.array(
+    [PHASE_WEIGHTS.get(piece & RANK_MASK, 0) for piece in range(PIECE_CODE_COUNT)],
+    dtype=np.int32,
+)
+
+# The same tables as lists of ints, which are faster to index one square at a time
+MIDGAME_SCORES = MIDGAME_TABLES.tolist()
+ENDGAME_SCORES = ENDGAME_TABLES.tolist()
+PIECE_PHASES = PHASE_TABLE.tolist()
+
+
+def compute_eval_scores(board):
+    """Computes the evaluation totals that the board keeps up to date.
+
+    Args:
+        board: Board object.
+
+    Returns:
+        (phase, midgame_score, endgame_score) tuple, where the phase is the sum of
+        PHASE_WEIGHTS over all pieces and the scores are from white's point of view.
+    """
+    phase = midgame_score = endgame_score = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.get_piece((row, col))
+            if piece:
+                phase += PIECE_PHASES[piece]
+                midgame_score += MIDGAME_SCORES[piece][row * 8 + col]
+                endgame_score += ENDGAME_SCORES[piece][row * 8 + col]
+    return phase, midgame_score, endgame_score
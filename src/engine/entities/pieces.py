@@ -0,0 +1,59 @@
+# A piece is a small integer: its color bits OR its rank. 0 is an empty square.
+EMPTY = 0
+
+PAWN = 1
+KNIGHT = 2
+BISHOP = 3
+ROOK = 4
+QUEEN = 5
+KING = 6
+
+WHITE = 8
+BLACK = 16
+
+RANK_MASK = 7
+COLOR_MASK = WHITE | BLACK
+
+# Largest piece code plus one, the length of tables indexed by piece
+PIECE_CODE_COUNT = (BLACK | KING) + 1
+
+RANKS = (PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING)
+COLORS = (WHITE, BLACK)
+
+RANK_NAMES = {
+    PAWN: "pawn",
+    KNIGHT: "knight",
+    BISHOP: "bishop",
+    ROOK: "rook",
+    QUEEN: "queen",
+    KING: "king",
+}
+COLOR_NAMES = {WHITE: "white", BLACK: "black"}
+
+RANKS_BY_NAME = {name: rank for rank, name in RANK_NAMES.items()}
+COLORS_BY_NAME = {name: color for color, name in COLOR_NAMES.items()}
+
+
+def piece_names(piece):
+    """Gets the names of a piece, as used by the UI and its piece images.
+
+    Args:
+        piece: Integer piece code, not EMPTY.
+
+    Returns:
+        (color, rank) tuple of names, e.g. ("white", "knight").
+    """
+    return COLOR_NAMES[piece & COLOR_MASK], RANK_NAMES[piece & RANK_MASK]
+
+
+def piece_from_names(color, rank):
+    """Gets the piece code for a color and rank given by name.
+
+    Args:
+        color: "white" or "black".
+        rank: Name of the rank, e.g. "knight".
+
+    Returns:
+        Integer piece code.
+    """
+    return COLORS_BY_NAME[color] | RANKS_BY_NAME[rank]
@@ -0,0 +1,66 @@
+import random
+from .pieces import WHITE, BLACK, RANKS, PIECE_CODE_COUNT
+
+_random = random.Random(20250418)
+
+
+def _piece_keys():
+    piece_keys = [None] * PIECE_CODE_COUNT
+    for color in (WHITE, BLACK):
+        for rank in RANKS:
+            piece_keys[color | rank] = [_random.getrandbits(64) for _ in range(64)]
+    return piece_keys
+
+
+# Keys indexed by piece code and square row * 8 + col, None for unused piece codes
+PIECE_KEYS = _piece_keys()
+SIDE_KEY = _random.getrandbits(64)
+CASTLING_KEYS = [_random.getrandbits(64) for _ in range(16)]
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(8)]
+
+ALL_CASTLING_RIGHTS = 15
+
+# Castling right bit: (color, king position, rook position)
+CASTLING_SQUARES = {
+    1: (WHITE, (7, 4), (7, 7)),
+    2: (WHITE, (7, 4), (7, 0)),
+    4: (BLACK, (0, 4), (0, 7)),
+    8: (BLACK, (0, 4), (0, 0)),
+}
+
+
+def _castling_rights_kept():
+    rights_kept = [ALL_CASTLING_RIGHTS] * 64
+    for right, (_, king_pos, rook_pos) in CASTLING_SQUARES.items():
+        for row, col in (king_pos, rook_pos):
+            rights_kept[row * 8 + col] &= ~right
+    return rights_kept
+
+
+# Castling rights kept when a piece moves from or to a square, by square row * 8 + col.
+# Moving the king or a rook, or capturing a rook on its starting square, loses rights.
+CASTLING_RIGHTS_KEPT = _castling_rights_kept()
+
+
+def compute_key(board):
+    """Computes the Zobrist key of a board from scratch.
+
+    Args:
+        board: Board object.
+
+    Returns:
+        64-bit integer key.
+    """
+    key = 0
+    for row in range(8):
+        for col in range(8):
+            piece = board.get_piece((row, col))
+            if piece:
+                key ^= PIECE_KEYS[piece][row * 8 + col]
+
+    if board.side_to_move == BLACK:
+        key ^= SIDE_KEY
+    if board.en_passant_target:
+        key ^= EN_PASSANT_KEYS[board.en_passant_target[1]]
+
+    return key ^ CASTLING_KEYS[board.castling_rights]
@@ -1,24 +1,78 @@
-import hashlib
 import time
-from .core import simulate_move, generate_moves, is_in_check, evaluate_board
-from .core.board_evaluator import PIECE_VALUES
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from ctypes import c_bool
+from multiprocessing import get_context
+from multiprocessing.sharedctypes import RawValue
+from engine.entities.board import Board
+from engine.entities.pieces import EMPTY, PAWN, QUEEN, KING, RANK_MASK, COLOR_MASK
+from engine.entities.pieces import PIECE_CODE_COUNT
+from engine.entities.piece_square_tables import PIECE_VALUES
+from engine.entities.move import PROMOTION, EN_PASSANT, START_SHIFT, FLAG_SHIFT, SQUARE_MASK
+from .core import generate_legal_moves, is_in_check, evaluate_board
+from .core import generate_moves, generate_quiet_moves, is_pseudo_legal, has_legal_move
+from .core import make_legal_move, mvv_lva_score, static_exchange_evaluation
+from .transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from .search_stats import SearchStats
+from .tablebase import Tablebase, WIN, DRAW, LOSS
 
 
 class AIEngine:
     """AI that selects best move using Negamax.
 
+    With helper workers the search runs in parallel as Lazy SMP: helper processes search
+    the same position, sharing the transposition table through shared memory, and the
+    deepest completed search of all processes decides the move.
+
     Attributes:
         difficulty: Integer 1-3 representing game difficulty.
+        last_search_stats: SearchStats of the latest get_best_move call, or None.
     """
 
     CHECKMATE_SCORE = 100000
     INFINITY = 1000000
-
-    def __init__(self, difficulty):
+    # Tablebase wins score below found checkmates, faster wins higher
+    TABLEBASE_WIN_SCORE = CHECKMATE_SCORE // 2
+    # Deepest iteration of a pondering search that the opponent has not answered yet
+    MAX_PONDER_DEPTH = 32
+    # Size of the principal variation table, more plies than any search reaches
+    MAX_PLY = 64
+    # Scores beyond are checkmates or tablebase wins
+    WIN_SCORE_BOUND = TABLEBASE_WIN_SCORE - 256
+    # Half width of the root search window around the previous iteration's score
+    ASPIRATION_WINDOW = 50
+    # Null move searches are this much shallower, one more from depth 7
+    NULL_MOVE_REDUCTION = 2
+    # Quiet moves from this index on are searched one ply shallower, two from index 6
+    LATE_MOVE_INDEX = 3
+
+    def __init__(
+        self,
+        difficulty,
+        tt_size_mb=16,
+        stats_callback=None,
+        workers=0,
+        transposition_table=None,
+        stop_flag=None,
+        opening_book=None,
+        tablebase=None,
+        null_move_pruning=True,
+        late_move_reductions=True,
+    ):
         """Initializes AI with difficulty level.
 
         Args:
             difficulty: Integer 1-3 (1=easy, 2=medium, 3=hard).
+            tt_size_mb: Memory limit of the transposition table in megabytes.
+            stats_callback: Optional function called with the SearchStats of each search.
+            workers: Number of helper processes searching in parallel, 0 for none.
+            transposition_table: Optional TranspositionTable to use instead of a new one.
+            stop_flag: Optional shared boolean that stops the search when set, see stop.
+            opening_book: Optional OpeningBook to play from before searching.
+            tablebase: Optional Tablebase of endgame positions, looked up at the root and
+                during the search.
+            null_move_pruning: If True, cut off nodes that hold beta even when passing the turn.
+            late_move_reductions: If True, search quiet moves late in the ordering shallower.
         """
         self.difficulty = difficulty
 
@@ -38,157 +92,528 @@ class AIEngine:
                 self.depth = 1
                 self.time_limit = None
 
-        self._transposition_table = {}
+        self._transposition_table = transposition_table or TranspositionTable(
+            tt_size_mb, shared=workers > 0
+        )
         self._start_time = None
         self._current_depth = 0
-
-    def get_best_move(self, board):
+        self._stats = SearchStats()
+        self._stats_callback = stats_callback
+        # A shared flag that is not set is falsy, so test for None
+        self._stop_flag = RawValue(c_bool, False) if stop_flag is None else stop_flag
+        self._opening_book = opening_book
+        self._tablebase = tablebase
+        self._pondering = False
+        self.null_move_pruning = null_move_pruning
+        self.late_move_reductions = late_move_reductions
+        # Triangular table of the best line from each ply, and the line of the last iteration
+        self._pv_table = [[] for _ in range(self.MAX_PLY + 1)]
+        self._pv = []
+        self._follow_pv = False
+        self._expected_reply = None
+        # Quiet moves that caused beta cutoffs, two per ply, and their scores by piece and
+        # target square over the whole search
+        self._killers = [[None, None] for _ in range(self.MAX_PLY + 1)]
+        self._history = array("L", [0]) * (PIECE_CODE_COUNT * 64)
+        self.last_search_stats = None
+
+        self._helpers = None
+        if workers > 0:
+            helpers_ready = get_context("spawn").Barrier(workers)
+            self._helpers = ProcessPoolExecutor(
+                workers,
+                mp_context=get_context("spawn"),
+                initializer=_init_helper,
+                initargs=(
+                    self.difficulty,
+                    self._transposition_table.name,
+                    tt_size_mb,
+                    self._stop_flag,
+                    tablebase.directory if tablebase else None,
+                    null_move_pruning,
+                    late_move_reductions,
+                    helpers_ready,
+                ),
+            )
+            # Start the processes now, not in the first search where starting them would
+            # take up its time limit. Each call waits for the others, so every process
+            # takes one and has run its initializer when they return.
+            for future in [self._helpers.submit(_wait_for_helpers) for _ in range(workers)]:
+                future.result()
+        self._workers = workers
+
+    def get_best_move(self, board, helper_index=0):
         """Finds best move for current player.
 
         Args:
             board: Board object.
+            helper_index: 0 for the main search, otherwise the index of a helper process
+                searching alongside it. Helpers vary the order of the root moves.
 
         Returns:
-            None or move tuple (start, end) where each item is (row, col).
+            None or integer move, see engine.entities.move.
         """
         board = board.copy()
+        if not helper_index:
+            self._stop_flag.value = False
 
-        moves = generate_moves(board)
-        if not moves:
-            return None
-
-        # Only let through moves where own king is not checked
-        valid_moves = [move for move in moves if simulate_move(board, move)]
+        try:
+            return self._search(board, helper_index)
+        finally:
+            # Pondering ends with the call, also when it returns without searching
+            self._pondering = False
 
+    def _search(self, board, helper_index):
+        valid_moves = generate_legal_moves(board)
         if not valid_moves:
             return None
 
         if self.time_limit is not None:
             self._start_time = time.time()
 
+        if helper_index:
+            shift = helper_index % len(valid_moves)
+            valid_moves = valid_moves[shift:] + valid_moves[:shift]
+        else:
+            if (book_move := self._probe_book(board)) in valid_moves:
+                return book_move
+            if (tablebase_move := self._probe_tablebase_root(board, valid_moves)) is not None:
+                return tablebase_move
+            self._transposition_table.new_search()
+
+        self._stats = stats = SearchStats()
+        stats.pondered = self._pondering
+        helper_searches = self._start_helpers(board)
+        search_start = time.perf_counter()
+        best_move = self._iterative_deepening(board, valid_moves)
+
+        if helper_searches:
+            best_move = self._finish_helpers(helper_searches, best_move)
+
+        if len(stats.pv) > 1 and stats.pv[0] == best_move:
+            undo = board.make_move(best_move)
+            self._expected_reply = (board.zobrist_key, stats.pv[1])
+            board.unmake_move(best_move, undo)
+
+        stats.time_ms = (time.perf_counter() - search_start) * 1000
+        self.last_search_stats = stats
+        if self._stats_callback:
+            self._stats_callback(stats)
+
+        return best_move
+
+    def start_pondering(self):
+        """Makes the next get_best_move call ponder on the opponent's time.
+
+        Call before starting the search on the position after the expected reply, e.g. in
+        another thread. A pondering search ignores the time limit and keeps deepening until
+        ponder_hit or stop is called, or MAX_PONDER_DEPTH is reached. Helper processes ponder
+        along with it.
+        """
+        self._pondering = True
+
+    def ponder_hit(self):
+        """Turns a pondering search into a normal one once the opponent played the expected reply.
+
+        The search keeps what it has found so far and its time limit starts now.
+        """
+        self._start_time = time.time()
+        self._pondering = False
+
+    def expected_reply(self, board):
+        """Predicts the opponent's reply to the move just played from the last search.
+
+        Args:
+            board: Board object after the engine's move, with the opponent to move.
+
+        Returns:
+            Integer move of the second move of the principal variation, or of the best move
+            stored for the position, or None if it is unknown.
+        """
+        if self._expected_reply and self._expected_reply[0] == board.zobrist_key:
+            return self._expected_reply[1]
+
+        position_entry = self._transposition_table.probe(board.zobrist_key)
+        if position_entry and position_entry[3] in generate_legal_moves(board):
+            return position_entry[3]
+        return None
+
+    def close(self):
+        """Shuts down the helper processes and releases the shared transposition table."""
+        if self._helpers:
+            self._stop_flag.value = True
+            self._helpers.shutdown(cancel_futures=True)
+            self._helpers = None
+        self._transposition_table.close()
+
+    def _probe_book(self, board):
+        """Looks up the position in the opening book, reporting a hit as a search without nodes.
+
+        Returns:
+            Integer move from the book, or None if there is no book or the position is not in it.
+        """
+        if not self._opening_book:
+            return None
+
+        book_start = time.perf_counter()
+        book_move = self._opening_book.choose_move(board)
+        if book_move is None:
+            return None
+
+        self._stats = stats = SearchStats()
+        stats.book_move = True
+        stats.time_ms = (time.perf_counter() - book_start) * 1000
+        self.last_search_stats = stats
+        if self._stats_callback:
+            self._stats_callback(stats)
+        return book_move
+
+    def _probe_tablebase_root(self, board, valid_moves):
+        """Picks the move of a tablebase position that wins fastest or loses slowest.
+
+        Returns:
+            Integer move, or None if there is no tablebase or a position is not in it.
+        """
+        if not self._tablebase or self._tablebase.probe(board) is None:
+            return None
+
+        tablebase_start = time.perf_counter()
+        ranked_moves = []
+        for move in valid_moves:
+            undo = board.make_move(move)
+            result = self._tablebase.probe(board)
+            board.unmake_move(move, undo)
+            if result is None:
+                return None
+
+            # Ranked by the result for the opponent
+            value, dtm = result
+            ranked_moves.append(((value, dtm if value == LOSS else -dtm), move))
+
+        self._stats = stats = SearchStats()
+        stats.tablebase_move = True
+        stats.tablebase_hits = len(ranked_moves) + 1
+        stats.time_ms = (time.perf_counter() - tablebase_start) * 1000
+        self.last_search_stats = stats
+        if self._stats_callback:
+            self._stats_callback(stats)
+        return min(ranked_moves, key=lambda ranked_move: ranked_move[0])[1]
+
+    def _start_helpers(self, board):
+        if not self._helpers:
+            return []
+
+        fen = board.to_fen()
+        generation = self._transposition_table.generation
+        return [
+            self._helpers.submit(_helper_search, fen, generation, index, self._pondering)
+            for index in range(1, self._workers + 1)
+        ]
+
+    def _finish_helpers(self, helper_searches, best_move):
+        """Stops the helpers and picks the move of the deepest completed search.
+
+        Args:
+            helper_searches: List of futures of the helper searches.
+            best_move: Integer move found by the main search.
+
+        Returns:
+            Integer move of the deepest search, preferring the main search on equal depth.
+        """
+        # Helpers keep deepening until told to stop
+        self._stop_flag.value = True
+        best_depth = self._stats.depth
+
+        for future in helper_searches:
+            depth, move, nodes = future.result()
+            self._stats.helper_nodes += nodes
+            if depth > best_depth:
+                best_depth, best_move = depth, move
+
+        return best_move
+
+    def _iterative_deepening(self, board, valid_moves):
+        """Searches the root moves with increasing depth until the depth or time runs out.
+
+        Args:
+            board: Board object, left unchanged.
+            valid_moves: List of legal moves, in the order to try them first.
+
+        Returns:
+            Integer move of the deepest completed iteration, or the first move if none completed.
+        """
+        stats = self._stats
         best_move = valid_moves[0]
         self._current_depth = 1
+        self._pv = []
+        self._killers = [[None, None] for _ in range(self.MAX_PLY + 1)]
+        # Older cutoffs count for less in a new search
+        self._history = array("L", [score // 2 for score in self._history])
+        score = None
 
         # Iterative deepening
         while True:
-            if self._current_depth > self.depth:
+            if self._pondering:
+                if self._current_depth > self.MAX_PONDER_DEPTH:
+                    break
+            elif self._current_depth > self.depth:
                 if self.time_limit is None:
                     break
                 elapsed_time = (time.time() - self._start_time) * 1000
                 if elapsed_time >= self.time_limit:
                     break
 
-            iteration_best_move = None
-            alpha, beta = -self.INFINITY, self.INFINITY
-            move_scores = []
+            iteration_start = time.perf_counter()
+            iteration_start_nodes = stats.total_nodes
+            if (result := self._aspiration_search(board, valid_moves, score)) is None:
+                break
+            score, iteration_best_move, move_scores = result
 
-            for move in valid_moves:
-                if self._should_stop_search():
-                    return best_move
+            best_move = iteration_best_move or best_move
+            self._pv = self._pv_table[0]
+            stats.add_iteration(
+                self._current_depth,
+                (time.perf_counter() - iteration_start) * 1000,
+                stats.total_nodes - iteration_start_nodes,
+                score,
+                best_move,
+                self._pv,
+            )
+
+            # Sort best scored moves first for better pruning in later iterations, with the
+            # best move first among equal scores
+            move_scores.sort(key=lambda x: (x[0], x[1] == best_move), reverse=True)
+            valid_moves = [move for _, move in move_scores]
 
-                new_board = simulate_move(board, move)
-                new_board.flip_board()
+            self._current_depth += 1
 
-                score = -self._negamax(new_board, self._current_depth - 1, -beta, -alpha)
+        return best_move
 
-                if self._should_stop_search():
-                    return best_move
+    def _aspiration_search(self, board, valid_moves, previous_score):
+        """Searches the root in a window around the previous iteration's score.
 
-                move_scores.append((score, move))
+        A narrow window cuts off more of the tree. If the score falls outside it, the
+        window is widened on that side and the root searched again.
 
-                if score > alpha:
-                    alpha = score
-                    iteration_best_move = move
+        Args:
+            board: Board object, left unchanged.
+            valid_moves: List of legal moves, in the order to try them.
+            previous_score: Integer score of the previous iteration, None for the first one.
 
-                if alpha >= beta:
-                    break
+        Returns:
+            (score, best_move, move_scores) tuple as returned by _search_root, or None if
+            the search was interrupted.
+        """
+        alpha, beta = -self.INFINITY, self.INFINITY
+        window = self.ASPIRATION_WINDOW
+        if previous_score is not None and abs(previous_score) < self.WIN_SCORE_BOUND:
+            alpha, beta = previous_score - window, previous_score + window
 
-            best_move = iteration_best_move or best_move
+        while True:
+            if (result := self._search_root(board, valid_moves, alpha, beta)) is None:
+                return None
+
+            score, best_move, _ = result
+            if best_move is not None and score < beta:
+                return result
+
+            self._stats.aspiration_re_searches += 1
+            window *= 4
+            if best_move is None:
+                # Failed low, every move scored at most alpha
+                alpha = max(alpha - window, -self.INFINITY)
+            else:
+                beta = min(score + window, self.INFINITY)
 
-            # Sort best scored moves first for better pruning in later iterations
-            move_scores.sort(key=lambda x: x[0], reverse=True)
-            valid_moves = [move for _, move in move_scores]
+            if window > self.ASPIRATION_WINDOW * 64:
+                alpha, beta = -self.INFINITY, self.INFINITY
 
-            self._current_depth += 1
+    def _search_root(self, board, valid_moves, alpha, beta):
+        """Searches each root move once with the current depth.
 
-        return best_move
+        Args:
+            board: Board object, left unchanged.
+            valid_moves: List of legal moves, in the order to try them.
+            alpha: Integer of the lowest score of interest.
+            beta: Integer of the score from which a move is good enough to stop.
+
+        Returns:
+            (score, best_move, move_scores) tuple, where best_move is None if no move
+            scored above alpha and move_scores lists (score, move) of the searched moves.
+            None if the search was interrupted.
+        """
+        stats = self._stats
+        best_move = None
+        move_scores = []
+
+        for move_index, move in enumerate(valid_moves):
+            if self._should_stop_search():
+                return None
+
+            # The first move starts the principal variation of the previous iteration
+            self._follow_pv = move_index == 0
+            stats.nodes += 1
+            undo = board.make_move(move)
+            score = -self._negamax(board, self._current_depth - 1, -beta, -alpha, 1)
+            board.unmake_move(move, undo)
 
-    def _negamax(self, board, depth, alpha, beta):
+            if self._should_stop_search():
+                return None
+
+            move_scores.append((score, move))
+
+            if score > alpha:
+                alpha = score
+                best_move = move
+                self._pv_table[0] = [move] + self._pv_table[1]
+
+            if alpha >= beta:
+                break
+
+        return alpha, best_move, move_scores
+
+    def stop(self):
+        """Asks a running get_best_move call, e.g. in another thread, to return early.
+
+        The search returns the best move of its deepest completed iteration, or the
+        first legal move if no iteration completed.
+        """
+        self._stop_flag.value = True
+
+    def _negamax(self, board, depth, alpha, beta, ply, allow_null=True):
         """Negamax with alpha-beta pruning and a transposition table.
 
+        The best line found from the position is left in the principal variation table at
+        the ply.
+
         Args:
             board: Board object.
             depth: Integer of remaining search depth.
             alpha: Integer of the best score for maximizing player.
             beta: Integer of the best score for minimizing player.
+            ply: Integer of the distance from the root.
+            allow_null: False right after a null move, so that two are not made in a row.
 
         Returns:
             Integer for best achievable evaluation from given board state.
         """
+        self._pv_table[ply] = []
+        # Taken by every node, so that no return leaves it set for another subtree
+        follow_pv, self._follow_pv = self._follow_pv, False
         if self._should_stop_search():
             return 0
 
         original_alpha = alpha
-        position_hash = self._get_position_hash(board)
-        position_entry = self._transposition_table.get(position_hash)
+        position_hash = board.zobrist_key
+        position_entry = self._transposition_table.probe(position_hash)
+        self._stats.tt_probes += 1
 
         # Check transposition table
-        if position_entry and position_entry["depth"] >= depth:
-            if position_entry["value_type"] == "exact":
-                return position_entry["score"]
-            if position_entry["value_type"] == "lower_bound":
-                alpha = max(alpha, position_entry["score"])
-            elif position_entry["value_type"] == "upper_bound":
-                beta = min(beta, position_entry["score"])
+        if position_entry:
+            self._stats.tt_hits += 1
+        if position_entry and position_entry[1] >= depth:
+            entry_score, _, entry_bound, _ = position_entry
+            if entry_bound == EXACT:
+                return entry_score
+            if entry_bound == LOWER_BOUND:
+                alpha = max(alpha, entry_score)
+            elif entry_bound == UPPER_BOUND:
+                beta = min(beta, entry_score)
 
             if alpha >= beta:
-                return position_entry["score"]
-
-        moves = generate_moves(board)
-
-        # Only let through moves where own king is not checked
-        valid_moves = [
-            (move, new_board) for move in moves if (new_board := simulate_move(board, move))
-        ]
-
-        # If no legal moves exist, player is checkmated or in stalemate
-        if not valid_moves:
-            return -self.CHECKMATE_SCORE + depth if is_in_check(board) else 0
+                return entry_score
+
+        if self._tablebase and (result := self._tablebase.probe(board)):
+            self._stats.tablebase_hits += 1
+            value, dtm = result
+            if value == DRAW:
+                return 0
+            score = self.TABLEBASE_WIN_SCORE - dtm
+            return score if value == WIN else -score
+
+        in_check = is_in_check(board)
+        if (
+            self.null_move_pruning
+            and allow_null
+            and depth >= self.NULL_MOVE_REDUCTION + 1
+            and beta - alpha == 1
+            and not in_check
+            and abs(beta) < self.WIN_SCORE_BOUND
+            and self._null_move_fails_high(board, depth, beta, ply)
+        ):
+            return beta
 
         if depth == 0:
+            # Checkmate and stalemate are found at the horizon too, quiescence only sees captures
+            if not has_legal_move(board):
+                return -self.CHECKMATE_SCORE if in_check else 0
             return self._quiescence_search(board, alpha, beta)
 
-        # If position was evaluated previously, move the best known move to front for better pruning
-        if position_entry and (best_known_move := position_entry["best_move"]):
-            for i, (move, _) in enumerate(valid_moves):
-                if move == best_known_move:
-                    valid_moves.insert(0, valid_moves.pop(i))
-                    break
+        # While on the principal variation of the previous iteration, search its move first
+        hash_moves = []
+        pv_move = None
+        if follow_pv and ply < len(self._pv) and is_pseudo_legal(board, self._pv[ply]):
+            pv_move = self._pv[ply]
+            hash_moves.append(pv_move)
+
+        # If position was evaluated previously, search the best known move next for better pruning
+        if (
+            position_entry
+            and (best_known_move := position_entry[3])
+            and best_known_move not in hash_moves
+            and is_pseudo_legal(board, best_known_move)
+        ):
+            hash_moves.append(best_known_move)
 
         best_move = None
         search_interrupted = False
-        first_move = True
+        legal_moves = 0
 
-        for move, new_board in valid_moves:
+        for move in self._pick_moves(board, hash_moves, ply):
             if self._should_stop_search():
                 search_interrupted = True
                 break
 
-            new_board.flip_board()
+            quiet = not _is_active(board, move)
+            undo = make_legal_move(board, move)
+            if undo is None:
+                continue
+
+            self._stats.nodes += 1
+            move_index = legal_moves
+            legal_moves += 1
+            # Only the position after the principal variation move follows it further
+            self._follow_pv = move == pv_move
 
-            if first_move:
-                score = -self._negamax(new_board, depth - 1, -beta, -alpha)
-                first_move = False
+            if move_index == 0:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
             else:
+                reduction = 0
+                if (
+                    self.late_move_reductions
+                    and quiet
+                    and depth >= 3
+                    and move_index >= self.LATE_MOVE_INDEX
+                    and not in_check
+                    and move not in self._killers[ply]
+                    and not is_in_check(board)
+                ):
+                    reduction = 1 if move_index < 6 or depth < 5 else 2
+                    self._stats.reduced_moves += 1
+
                 # Null window search
-                score = -self._negamax(new_board, depth - 1, -alpha - 1, -alpha)
+                score = -self._negamax(board, depth - 1 - reduction, -alpha - 1, -alpha, ply + 1)
 
-                if self._should_stop_search():
-                    search_interrupted = True
-                    break
+                if reduction and score > alpha and not self._should_stop_search():
+                    # A reduced move that looks good is searched again at full depth
+                    self._stats.reduction_re_searches += 1
+                    score = -self._negamax(board, depth - 1, -alpha - 1, -alpha, ply + 1)
 
-                if score > alpha and score < beta:
-                    score = -self._negamax(new_board, depth - 1, -beta, -alpha)
+                if score > alpha and score < beta and not self._should_stop_search():
+                    self._stats.re_searches += 1
+                    score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+
+            board.unmake_move(move, undo)
 
             if self._should_stop_search():
                 search_interrupted = True
@@ -197,26 +622,136 @@ class AIEngine:
             if score > alpha:
                 alpha = score
                 best_move = move
+                self._pv_table[ply] = [move] + self._pv_table[ply + 1]
 
             if alpha >= beta:
+                self._stats.beta_cutoffs += 1
+                if move_index == 0:
+                    self._stats.first_move_cutoffs += 1
+                if quiet:
+                    self._store_quiet_cutoff(board, move, depth, ply)
                 break
 
+        # If no legal moves exist, player is checkmated or in stalemate
+        if not legal_moves and not search_interrupted:
+            return -self.CHECKMATE_SCORE + depth if in_check else 0
+
         if not search_interrupted:
-            value_type = "exact"
+            bound = EXACT
             if alpha <= original_alpha:
-                value_type = "upper_bound"
+                bound = UPPER_BOUND
             elif alpha >= beta:
-                value_type = "lower_bound"
+                bound = LOWER_BOUND
 
-            self._transposition_table[position_hash] = {
-                "score": alpha,
-                "depth": depth,
-                "value_type": value_type,
-                "best_move": best_move,
-            }
+            self._transposition_table.store(position_hash, alpha, depth, bound, best_move)
 
         return alpha
 
+    def _null_move_fails_high(self, board, depth, beta, ply):
+        """Checks if the side to move still reaches beta after passing the turn.
+
+        Passing is almost always worse than the best move, so if a shallower search after a
+        null move holds beta, the full search would too. With only pawns left, passing may be
+        the best option (zugzwang) and no null move is made.
+
+        Args:
+            board: Board object, not in check.
+            depth: Integer of remaining search depth.
+            beta: Integer of the best score for minimizing player.
+            ply: Integer of the distance from the root.
+
+        Returns:
+            Boolean for whether the node can be cut off.
+        """
+        side = board.side_to_move
+        if not any(
+            piece & COLOR_MASK == side and PAWN < piece & RANK_MASK < KING
+            for piece in board.squares
+        ):
+            return False
+        if evaluate_board(board) < beta:
+            return False
+
+        self._stats.null_moves += 1
+        reduction = self.NULL_MOVE_REDUCTION + (depth > 6)
+        undo = board.make_null_move()
+        score = -self._negamax(
+            board, max(depth - 1 - reduction, 0), -beta, -beta + 1, ply + 1, allow_null=False
+        )
+        board.unmake_null_move(undo)
+
+        if score >= beta and not self._should_stop_search():
+            self._stats.null_move_cutoffs += 1
+            return True
+        return False
+
+    def _pick_moves(self, board, hash_moves, ply):
+        """Yields moves in search order, generating each stage only when the earlier ones are
+        used up, so that a cutoff by an early move saves generating the rest.
+
+        The hash moves come first, then captures and promotions that do not lose material by
+        most valuable victim and least valuable attacker, the killer moves, the other quiet
+        moves by history, and last the losing captures. The moves are pseudo-legal, the caller
+        checks each for leaving the king in check when making it.
+
+        Args:
+            board: Board object, as it was before each move when resumed.
+            hash_moves: List of pseudo-legal moves of the principal variation and the
+                transposition table.
+            ply: Integer of the distance from the root.
+
+        Yields:
+            Integer moves.
+        """
+        yield from hash_moves
+
+        squares = board.squares
+        active_moves = [
+            move for move in generate_moves(board, only_active=True) if move not in hash_moves
+        ]
+        active_moves.sort(key=lambda move: mvv_lva_score(board, move), reverse=True)
+        losing_moves = []
+        for move in active_moves:
+            if squares[move & SQUARE_MASK] and static_exchange_evaluation(board, move) < 0:
+                losing_moves.append(move)
+            else:
+                yield move
+
+        killers = [
+            move
+            for move in self._killers[ply]
+            if move
+            and move not in hash_moves
+            and not _is_active(board, move)
+            and is_pseudo_legal(board, move)
+        ]
+        yield from killers
+
+        history = self._history
+        quiet_moves = [
+            move
+            for move in generate_quiet_moves(board)
+            if move not in hash_moves and move not in killers
+        ]
+        quiet_moves.sort(
+            key=lambda move: history[
+                squares[move >> START_SHIFT & SQUARE_MASK] * 64 + (move & SQUARE_MASK)
+            ],
+            reverse=True,
+        )
+        yield from quiet_moves
+        yield from losing_moves
+
+    def _store_quiet_cutoff(self, board, move, depth, ply):
+        """Remembers a quiet move that failed high as a killer move and in the history."""
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1], killers[0] = killers[0], move
+
+        piece = board.squares[move >> START_SHIFT & SQUARE_MASK]
+        # Deeper cutoffs save more nodes
+        self._history[piece * 64 + (move & SQUARE_MASK)] += depth * depth
+
     def _quiescence_search(self, board, alpha, beta, depth=6):
         """Quiescence search to avoid horizon effect.
 
@@ -229,45 +764,49 @@ class AIEngine:
         Returns:
             Integer for best achievable evaluation from given board state.
         """
-        if self._should_stop_search() or depth <= 0:
-            return evaluate_board(board)
-
         current_eval = evaluate_board(board)
-        if current_eval >= beta:
+        if self._should_stop_search() or depth <= 0 or current_eval >= beta:
             return current_eval
 
         alpha = max(alpha, current_eval)
 
         if in_check := is_in_check(board):
-            moves = generate_moves(board)
+            moves = generate_legal_moves(board)
         else:
-            moves = generate_moves(board, only_active=True)
+            moves = generate_legal_moves(board, only_active=True)
 
-        valid_moves = [
-            (move, new_board) for move in moves if (new_board := simulate_move(board, move))
-        ]
-
-        if not valid_moves:
+        if not moves:
             return -self.CHECKMATE_SCORE if in_check else current_eval
 
-        for move, new_board in valid_moves:
+        if not in_check:
+            moves = sorted(moves, key=lambda move: mvv_lva_score(board, move), reverse=True)
+
+        for move in moves:
             if self._should_stop_search():
                 break
 
             if not in_check:
                 # Delta pruning
-                captured_piece = board.get_piece(move[1])
+                captured_piece = board.squares[move & SQUARE_MASK]
                 captured_value = (
-                    PIECE_VALUES[captured_piece[1]] if captured_piece else PIECE_VALUES["queen"]
+                    PIECE_VALUES[captured_piece & RANK_MASK]
+                    if captured_piece
+                    else PIECE_VALUES[QUEEN]
                 )
 
                 if current_eval + captured_value + 150 < alpha:
                     # Even with the capture and positional bonus, can't reach alpha
                     continue
 
-            new_board.flip_board()
+                # Captures that lose material once the square is fought over
+                if captured_piece and static_exchange_evaluation(board, move) < 0:
+                    self._stats.losing_captures_pruned += 1
+                    continue
 
-            score = -self._quiescence_search(new_board, -beta, -alpha, depth - 1)
+            self._stats.qnodes += 1
+            undo = board.make_move(move)
+            score = -self._quiescence_search(board, -beta, -alpha, depth - 1)
+            board.unmake_move(move, undo)
 
             if score >= beta:
                 return beta
@@ -276,43 +815,16 @@ class AIEngine:
 
         return alpha
 
-    def _get_position_hash(self, board):
-        """Generate a hash for the current board position.
-
-        Returns:
-            String hash representing the board position.
-        """
-
-        # Turn board position into a string
-        def piece_to_string(piece):
-            if piece is None:
-                return "0"
-            color, rank, has_moved = piece
-            color_char = color[0]
-            rank_char = rank[0] if rank != "knight" else "n"
-            if rank in ("king", "rook"):
-                return f"{color_char}{rank_char}{int(has_moved)}"
-            return f"{color_char}{rank_char}"
-
-        position_string = "".join(
-            piece_to_string(piece) for row in board.board_matrix for piece in row
-        )
-
-        # Include player color and en passant information
-        position_string += board.player_color[0]
-        if board.en_passant_target:
-            ep_pos, ep_flag = board.en_passant_target
-            position_string += f"{ep_pos[0]}{ep_pos[1]}{int(ep_flag)}"
-
-        return hashlib.md5(position_string.encode()).hexdigest()
-
     def _should_stop_search(self):
-        """Check if search should stop due to time limit.
+        """Check if search should stop due to time limit or a stop request.
 
         Returns:
             Boolean indicating if search should stop.
         """
-        if self.time_limit is None:
+        if self._stop_flag.value:
+            return True
+
+        if self._pondering or self.time_limit is None:
             return False
 
         if self._current_depth <= self.depth:
@@ -320,3 +832,66 @@ class AIEngine:
 
         elapsed_time = (time.time() - self._start_time) * 1000
         return elapsed_time >= self.time_limit
+
+
+def _is_active(board, move):
+    """Checks if a move is a capture or a promotion, including en passant.
+
+    Args:
+        board: Board object before the move.
+        move: Integer move, see engine.entities.move.
+    """
+    return board.squares[move & SQUARE_MASK] != EMPTY or move >> FLAG_SHIFT in (
+        PROMOTION,
+        EN_PASSANT,
+    )
+
+
+# Engine and shared transposition table of a helper process, set up by _init_helper
+_helper_state = {}
+
+
+def _init_helper(
+    difficulty,
+    tt_name,
+    tt_size_mb,
+    stop_flag,
+    tablebase_directory,
+    null_move_pruning,
+    late_move_reductions,
+    helpers_ready,
+):
+    transposition_table = TranspositionTable.attach(tt_name, tt_size_mb)
+    _helper_state["transposition_table"] = transposition_table
+    _helper_state["helpers_ready"] = helpers_ready
+    _helper_state["engine"] = AIEngine(
+        difficulty,
+        transposition_table=transposition_table,
+        stop_flag=stop_flag,
+        tablebase=Tablebase(tablebase_directory) if tablebase_directory else None,
+        null_move_pruning=null_move_pruning,
+        late_move_reductions=late_move_reductions,
+    )
+
+
+def _wait_for_helpers():
+    """Waits in a helper process until all helper processes have started."""
+    _helper_state["helpers_ready"].wait()
+
+
+def _helper_search(fen, tt_generation, helper_index, pondering):
+    """Searches a position in a helper process.
+
+    A pondering helper keeps deepening until the main search stops it, also after a
+    ponder hit turns the main search into a timed one.
+
+    Returns:
+        (depth, best_move, nodes) tuple of the deepest completed iteration.
+    """
+    _helper_state["transposition_table"].new_search(tt_generation)
+    engine = _helper_state["engine"]
+    if pondering:
+        engine.start_pondering()
+    best_move = engine.get_best_move(Board.from_fen(fen), helper_index)
+    stats = engine.last_search_stats
+    return stats.depth, best_move, stats.total_nodes
@@ -1,4 +1,11 @@
-from .move_simulator import simulate_move
-from .move_generator import generate_moves
-from .check_detector import is_in_check, is_square_attacked
-from .board_evaluator import evaluate_board
+from .move_simulator import simulate_move, make_legal_move, is_legal_move
+from .move_generator import (
+    generate_moves,
+    generate_quiet_moves,
+    generate_legal_moves,
+    is_pseudo_legal,
+    has_legal_move,
+)
+from .check_detector import is_in_check, is_square_attacked, get_check_and_pin_masks
+from .static_exchange import captured_value, mvv_lva_score, static_exchange_evaluation
+from .board_evaluator import evaluate_board, evaluate_boards, encode_boards, evaluate_encoded
@@ -1,119 +1,74 @@
-PIECE_VALUES = {
-    "pawn": 100,
-    "knight": 320,
-    "bishop": 330,
-    "rook": 510,
-    "queen": 975,
-    "king": 0,
-}
-
-POSITION_VALUES = {
-    "pawn": [
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [50, 50, 50, 50, 50, 50, 50, 50],
-        [10, 10, 20, 35, 35, 20, 10, 10],
-        [5, 5, 10, 30, 30, 10, 5, 5],
-        [0, 0, 0, 25, 25, 0, 0, 0],
-        [5, -5, -10, 5, 5, -10, -5, 5],
-        [5, 10, 10, -25, -25, 10, 10, 5],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-    ],
-    "knight": [
-        [-50, -40, -30, -30, -30, -30, -40, -50],
-        [-40, -20, 0, 0, 0, 0, -20, -40],
-        [-30, 0, 10, 15, 15, 10, 0, -30],
-        [-30, 5, 15, 25, 25, 15, 5, -30],
-        [-30, 0, 15, 25, 25, 15, 0, -30],
-        [-30, 5, 10, 15, 15, 10, 5, -30],
-        [-40, -20, 0, 5, 5, 0, -20, -40],
-        [-50, -40, -30, -30, -30, -30, -40, -50],
-    ],
-    "bishop": [
-        [-20, -10, -10, -10, -10, -10, -10, -20],
-        [-10, 0, 0, 0, 0, 0, 0, -10],
-        [-10, 0, 5, 10, 10, 5, 0, -10],
-        [-10, 5, 5, 10, 10, 5, 5, -10],
-        [-10, 0, 10, 12, 12, 10, 0, -10],
-        [-10, 10, 10, 10, 10, 10, 10, -10],
-        [-10, 5, 0, 0, 0, 0, 5, -10],
-        [-20, -10, -10, -10, -10, -10, -10, -20],
-    ],
-    "rook": [
-        [0, 0, 0, 5, 5, 0, 0, 0],
-        [35, 40, 40, 40, 40, 40, 40, 35],
-        [-5, 0, 0, 0, 0, 0, 0, -5],
-        [-5, 0, 0, 0, 0, 0, 0, -5],
-        [-5, 0, 0, 0, 0, 0, 0, -5],
-        [-5, 0, 0, 0, 0, 0, 0, -5],
-        [-5, 0, 0, 0, 0, 0, 0, -5],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-    ],
-    "queen": [
-        [-20, -10, -10, -5, -5, -10, -10, -20],
-        [-10, 0, 0, 0, 0, 0, 0, -10],
-        [-10, 0, 5, 5, 5, 5, 0, -10],
-        [-5, 0, 5, 5, 5, 5, 0, -5],
-        [0, 0, 5, 5, 5, 5, 0, -5],
-        [-10, 5, 5, 5, 5, 5, 0, -10],
-        [-10, 0, 5, 0, 0, 0, 0, -10],
-        [-20, -10, -10, -5, -5, -10, -10, -20],
-    ],
-    "king": [
-        [-30, -40, -40, -50, -50, -40, -40, -30],
-        [-30, -40, -40, -50, -50, -40, -40, -30],
-        [-30, -40, -40, -50, -50, -40, -40, -30],
-        [-30, -40, -40, -50, -50, -40, -40, -30],
-        [-20, -30, -30, -40, -40, -30, -30, -20],
-        [-10, -20, -20, -20, -20, -20, -20, -10],
-        [20, 20, 0, 0, 0, 0, 20, 20],
-        [20, 30, 10, 0, 0, 10, 30, 20],
-    ],
-    "king_endgame": [
-        [-20, -30, -30, -30, -30, -30, -30, -20],
-        [-10, -20, -20, -20, -20, -20, -20, -10],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [5, 5, 10, 20, 20, 10, 5, 5],
-        [5, 5, 10, 20, 20, 10, 5, 5],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-        [0, 0, 0, 0, 0, 0, 0, 0],
-    ],
-}
+import numpy as np
+from engine.entities.pieces import WHITE
+from engine.entities.piece_square_tables import (
+    MAX_PHASE,
+    PHASE_TABLE,
+    MIDGAME_TABLES,
+    ENDGAME_TABLES,
+)
+
+_SQUARES = np.arange(64)
 
 
 def evaluate_board(board):
     """Gets board material balance and positional value.
 
+    Blends the middlegame and endgame scores by the game phase, so the evaluation
+    changes gradually as pieces are traded. The scores are kept up to date by the
+    board as pieces are set, so this takes constant time.
+
     Returns:
         Integer value of own pieces minus enemy pieces, including positional bonuses.
     """
-    total = total_material = 0
-    kings = []
+    if board.stall_clock >= 50:
+        return 0
 
-    for row_index, row in enumerate(board.board_matrix):
-        for col_index, piece in enumerate(row):
-            if not piece:
-                continue
+    # Promotions can raise the phase above that of the initial position
+    phase = min(board.phase, MAX_PHASE)
+    score = (board.midgame_score * phase + board.endgame_score * (MAX_PHASE - phase)) // MAX_PHASE
 
-            color, rank, _ = piece
-            piece_value = PIECE_VALUES[rank]
-            total_material += piece_value
+    return score if board.side_to_move == WHITE else -score
 
-            eval_row = 7 - row_index if color != board.player_color else row_index
-            eval_col = 7 - col_index if color == "black" else col_index
 
-            if rank == "king":
-                kings.append((eval_row, eval_col, color))
-                continue
+def evaluate_boards(boards):
+    """Evaluates many boards at once, giving the same scores as evaluate_board.
 
-            total_piece_value = piece_value + POSITION_VALUES[rank][eval_row][eval_col]
+    Args:
+        boards: List of Board objects.
 
-            total += total_piece_value if color == board.player_color else -total_piece_value
+    Returns:
+        NumPy integer array with the score of each board for its side to move.
+    """
+    scores = evaluate_encoded(encode_boards(boards))
+    signs = np.array([1 if board.side_to_move == WHITE else -1 for board in boards])
+    stalled = np.array([board.stall_clock >= 50 for board in boards], dtype=bool)
+    return np.where(stalled, 0, scores * signs)
 
-    king_table = "king_endgame" if total_material < 2200 else "king"
 
-    for eval_row, eval_col, color in kings:
-        positional_bonus = POSITION_VALUES[king_table][eval_row][eval_col]
-        total += positional_bonus if color == board.player_color else -positional_bonus
+def encode_boards(boards):
+    """Encodes the pieces of boards as an array of piece codes.
 
-    return total if board.stall_clock < 50 else 0
+    Args:
+        boards: List of Board objects.
+
+    Returns:
+        (N, 64) int8 array of piece codes, where square (row, col) is at index row * 8 + col.
+    """
+    squares = b"".join(board.squares.tobytes() for board in boards)
+    return np.frombuffer(squares, dtype=np.int8).reshape(len(boards), 64)
+
+
+def evaluate_encoded(codes):
+    """Evaluates positions encoded by encode_boards with vectorized table lookups.
+
+    Args:
+        codes: (N, 64) integer array of piece codes.
+
+    Returns:
+        NumPy integer array with the tapered score of each position from white's point of view.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    phase = np.minimum(PHASE_TABLE[codes].sum(axis=1), MAX_PHASE)
+    midgame_score = MIDGAME_TABLES[codes, _SQUARES].sum(axis=1)
+    endgame_score = ENDGAME_TABLES[codes, _SQUARES].sum(axis=1)
+    return (midgame_score * phase + endgame_score * (MAX_PHASE - phase)) // MAX_PHASE
@@ -1,117 +1,122 @@
-def is_in_check(board):
-    """Checks if the current player's king is in check.
+from engine.entities.pieces import PAWN, KNIGHT, KING, COLOR_MASK, RANK_MASK
+from engine.entities.board import OPPONENT
+from engine.entities.attack_tables import KNIGHT_TARGETS, KING_TARGETS, PAWN_ATTACKS, SLIDER_RAYS
+
+
+def is_in_check(board, color=None):
+    """Checks if a player's king is in check.
 
     Args:
         board: Board object.
+        color: Color of the king to check, defaults to the side to move.
 
     Returns:
-        Boolean for whether own king is in check.
+        Boolean for whether the king is in check.
     """
-    k_row, k_col = board.king_positions[board.player_color]
-    return is_square_attacked(board, (k_row, k_col))
+    color = color or board.side_to_move
+    return is_square_attacked(board, board.king_positions[color], OPPONENT[color])
 
 
-def is_square_attacked(board, position):
+def is_square_attacked(board, position, attacker_color=None):
     """Checks if a square is under attack.
 
     Args:
         board: Board object.
         position: (row, col) tuple of the square to check.
+        attacker_color: Color of the attacking pieces, defaults to the side not to move.
 
     Returns:
         Boolean for whether the square is under attack.
     """
+    attacker_color = attacker_color or OPPONENT[board.side_to_move]
     row, col = position
+    return board.is_attacked(row * 8 + col, attacker_color)
 
-    if _attacked_by_sliders(board, row, col):
-        return True
-    if _attacked_by_knight(board, row, col):
-        return True
-    if _attacked_by_pawn(board, row, col):
-        return True
-    if _attacked_by_king(board, row, col):
-        return True
-
-    return False
-
-
-def _attacked_by_sliders(board, k_row, k_col):
-    """Checks if king is threatened by bishops, rooks, or queens."""
-    directions = {
-        (0, 1): ["rook", "queen"],
-        (0, -1): ["rook", "queen"],
-        (1, 0): ["rook", "queen"],
-        (-1, 0): ["rook", "queen"],
-        (1, 1): ["bishop", "queen"],
-        (1, -1): ["bishop", "queen"],
-        (-1, 1): ["bishop", "queen"],
-        (-1, -1): ["bishop", "queen"],
-    }
-
-    for (row_direction, col_direction), piece_types in directions.items():
-        row, col = k_row + row_direction, k_col + col_direction
-        while _is_in_bounds(row, col):
-            piece = board.get_piece((row, col))
-            if not piece:
-                row += row_direction
-                col += col_direction
-                continue
-            if _not_own_piece(board, piece) and piece[1] in piece_types:
-                return True
-            break
-    return False
-
-
-def _attacked_by_knight(board, k_row, k_col):
-    knight_positions = [
-        (k_row - 2, k_col - 1),
-        (k_row - 2, k_col + 1),
-        (k_row - 1, k_col - 2),
-        (k_row - 1, k_col + 2),
-        (k_row + 1, k_col - 2),
-        (k_row + 1, k_col + 2),
-        (k_row + 2, k_col - 1),
-        (k_row + 2, k_col + 1),
-    ]
-
-    for row, col in knight_positions:
-        if _is_in_bounds(row, col):
-            piece = board.get_piece((row, col))
-            if _not_own_piece(board, piece) and piece[1] == "knight":
-                return True
-    return False
-
-
-def _attacked_by_pawn(board, k_row, k_col):
-    for row_direction, col_direction in [(-1, -1), (-1, 1)]:
-        row, col = k_row + row_direction, k_col + col_direction
-        if _is_in_bounds(row, col):
-            piece = board.get_piece((row, col))
-            if _not_own_piece(board, piece) and piece[1] == "pawn":
-                return True
-    return False
-
-
-def _attacked_by_king(board, k_row, k_col):
-    for row_offset in [-1, 0, 1]:
-        for col_offset in [-1, 0, 1]:
-            if row_offset == col_offset == 0:
-                continue
 
-            row, col = k_row + row_offset, k_col + col_offset
+def find_attackers(board, square, attacker_color, ignored=()):
+    """Finds the pieces of a color that attack a square.
+
+    Args:
+        board: Board object.
+        square: Index row * 8 + col of the square.
+        attacker_color: Color of the attacking pieces.
+        ignored: Collection of square indexes treated as empty, so that sliding pieces
+            behind them are found.
+
+    Returns:
+        List of square indexes of the attacking pieces.
+    """
+    squares = board.squares
+    attackers = []
 
-            if not _is_in_bounds(row, col):
+    for ray, piece_types in SLIDER_RAYS[square]:
+        for ray_square in ray:
+            if ray_square in ignored:
                 continue
+            piece = squares[ray_square]
+            if piece:
+                if piece & COLOR_MASK == attacker_color and piece & RANK_MASK in piece_types:
+                    attackers.append(ray_square)
+                break
 
-            piece = board.get_piece((row, col))
-            if _not_own_piece(board, piece) and piece[1] == "king":
-                return True
-    return False
+    for targets, attacker in (
+        (KNIGHT_TARGETS[square], attacker_color | KNIGHT),
+        (PAWN_ATTACKS[OPPONENT[attacker_color]][square], attacker_color | PAWN),
+        (KING_TARGETS[square], attacker_color | KING),
+    ):
+        for attacker_square in targets:
+            if attacker_square not in ignored and squares[attacker_square] == attacker:
+                attackers.append(attacker_square)
 
+    return attackers
+
+
+def get_check_and_pin_masks(board):
+    """Finds the checks against the side to move and its pieces pinned to the king.
+
+    Args:
+        board: Board object.
+
+    Returns:
+        (check_mask, pin_masks) tuple of square indexes. check_mask is None when not in
+        check, otherwise the set of squares where a piece other than the king can capture
+        or block the check, empty for double check. pin_masks maps squares of pinned pieces
+        to the set of squares they can move to without exposing the king.
+    """
+    squares = board.squares
+    color = board.side_to_move
+    enemy_color = OPPONENT[color]
+    k_row, k_col = board.king_positions[color]
+    square = k_row * 8 + k_col
+    checks = []
+    pin_masks = {}
+
+    for ray, piece_types in SLIDER_RAYS[square]:
+        pinned_square = None
+        for distance, ray_square in enumerate(ray):
+            piece = squares[ray_square]
+            if not piece:
+                continue
+            if piece & COLOR_MASK == color:
+                if pinned_square is not None:
+                    break
+                pinned_square = ray_square
+                continue
+            if piece & RANK_MASK in piece_types:
+                if pinned_square is not None:
+                    pin_masks[pinned_square] = set(ray[: distance + 1])
+                else:
+                    checks.append(set(ray[: distance + 1]))
+            break
 
-def _not_own_piece(board, piece):
-    return piece and piece[0] != board.player_color
+    for target in KNIGHT_TARGETS[square]:
+        if squares[target] == enemy_color | KNIGHT:
+            checks.append({target})
 
+    for target in PAWN_ATTACKS[color][square]:
+        if squares[target] == enemy_color | PAWN:
+            checks.append({target})
 
-def _is_in_bounds(row, col):
-    return 0 <= row < 8 and 0 <= col < 8
+    if not checks:
+        return None, pin_masks
+    return (checks[0] if len(checks) == 1 else set()), pin_masks
@@ -1,4 +1,39 @@
-from .check_detector import is_in_check, is_square_attacked
+from array import array
+from engine.entities.pieces import (
+    EMPTY,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE,
+    BLACK,
+    COLOR_MASK,
+    RANK_MASK,
+)
+from engine.entities.board import PAWN_DIRECTIONS, PAWN_START_ROWS, PROMOTION_ROWS, HOME_ROWS
+from engine.entities.move import (
+    NORMAL,
+    PROMOTION,
+    EN_PASSANT,
+    CASTLING,
+    START_SHIFT,
+    FLAG_SHIFT,
+    SQUARE_MASK,
+)
+from engine.entities.attack_tables import (
+    KNIGHT_TARGETS,
+    KING_TARGETS,
+    PAWN_ATTACKS,
+    BISHOP_RAYS,
+    ROOK_RAYS,
+)
+from .check_detector import is_in_check, is_square_attacked, get_check_and_pin_masks
+from .move_simulator import is_legal_move
+
+# (kingside, queenside) castling right bits of each color
+CASTLING_RIGHTS = {WHITE: (1, 2), BLACK: (4, 8)}
 
 
 def generate_moves(board, only_active=False):
@@ -9,212 +44,279 @@ def generate_moves(board, only_active=False):
         only_active: If True, only return active moves
 
     Returns:
-        List of move tuples (start, end) where each item is (row, col).
-        Active moves are returned first.
+        Array('H') of integer moves, see engine.entities.move. Active moves are returned
+        first.
     """
-    active_moves = []
-    quiet_moves = []
-
-    for row in range(8):
-        for col in range(8):
-            piece = board.get_piece((row, col))
-            if piece is not None and piece[0] == board.player_color:
-                match piece[1]:
-                    case "knight":
-                        piece_active, piece_quiet = _generate_knight(row, col, board)
-                    case "bishop":
-                        piece_active, piece_quiet = _generate_bishop(row, col, board)
-                    case "queen":
-                        piece_active, piece_quiet = _generate_queen(row, col, board)
-                    case "rook":
-                        piece_active, piece_quiet = _generate_rook(row, col, board)
-                    case "pawn":
-                        piece_active, piece_quiet = _generate_pawn(row, col, board)
-                    case "king":
-                        piece_active, piece_quiet = _generate_king(row, col, board)
-
-                active_moves.extend(piece_active)
-                if not only_active:
-                    quiet_moves.extend(piece_quiet)
-
-    return active_moves if only_active else active_moves + quiet_moves
-
-
-def _generate_pawn(row, col, board):
-    active_moves = []
-    quiet_moves = []
-
-    new_row = row - 1
-    if new_row < 0:
-        return active_moves, quiet_moves
+    active_moves = array("H")
+    quiet_moves = None if only_active else array("H")
+    color = board.side_to_move
 
-    # Peaceful moves
-    target_piece = board.get_piece((new_row, col))
-    if target_piece is None:
-        if new_row == 0:
-            # Promotion
-            active_moves.append(((row, col), (new_row, col)))
-        else:
-            # Normal forward
-            quiet_moves.append(((row, col), (new_row, col)))
+    for square, piece in enumerate(board.squares):
+        if piece and piece & COLOR_MASK == color:
+            _PIECE_GENERATORS[piece & RANK_MASK](square, board, active_moves, quiet_moves)
 
-        if row == 6:
-            if board.get_piece((row - 2, col)) is None:
-                # Double forward
-                quiet_moves.append(((row, col), (row - 2, col)))
+    if not only_active:
+        active_moves.extend(quiet_moves)
+    return active_moves
 
-    # Attacking moves
-    for col_offset in [-1, 1]:
-        new_col = col + col_offset
-        if not 0 <= new_col < 8:
-            continue
 
-        target_piece = board.get_piece((new_row, new_col))
-        if target_piece is not None and target_piece[0] != board.player_color:
-            # Diagonal capture
-            active_moves.append(((row, col), (new_row, new_col)))
-        elif (
-            target_piece is None
-            and board.en_passant_target
-            and board.en_passant_target[0] == (new_row, new_col)
-        ):
-            # En passant
-            active_moves.append(((row, col), (new_row, new_col)))
+def generate_quiet_moves(board):
+    """Generates the moves for current player that are not captures or promotions.
 
-    return active_moves, quiet_moves
+    Args:
+        board: Board object.
 
+    Returns:
+        Array('H') of integer moves.
+    """
+    quiet_moves = array("H")
+    color = board.side_to_move
 
-def _generate_knight(row, col, board):
-    active_moves = []
-    quiet_moves = []
+    for square, piece in enumerate(board.squares):
+        if piece and piece & COLOR_MASK == color:
+            _PIECE_GENERATORS[piece & RANK_MASK](square, board, None, quiet_moves)
 
-    offsets = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+    return quiet_moves
 
-    for row_offset, col_offset in offsets:
-        new_row = row + row_offset
-        new_col = col + col_offset
-        if 0 <= new_row < 8 and 0 <= new_col < 8:
-            target_piece = board.get_piece((new_row, new_col))
-            if target_piece is None:
-                # Normal
-                quiet_moves.append(((row, col), (new_row, new_col)))
-            elif target_piece[0] != board.player_color:
-                # Capture
-                active_moves.append(((row, col), (new_row, new_col)))
 
-    return active_moves, quiet_moves
+def is_pseudo_legal(board, move):
+    """Checks if a move is generated for the position, not testing if it leaves own king in check.
 
+    Moves from the transposition table or sibling positions are tested this way before being
+    made, without generating the moves of the other pieces.
 
-def _generate_bishop(row, col, board):
-    active_moves = []
-    quiet_moves = []
+    Args:
+        board: Board object.
+        move: Integer move.
 
-    directions = [(-1, -1), (-1, 1), (1, 1), (1, -1)]
+    Returns:
+        Boolean for whether the piece on the start square can make the move.
+    """
+    start = move >> START_SHIFT & SQUARE_MASK
+    piece = board.squares[start]
+    if not piece or piece & COLOR_MASK != board.side_to_move:
+        return False
 
-    for row_direction, col_direction in directions:
-        for i in range(1, 8):
-            new_row = row + row_direction * i
-            new_col = col + col_direction * i
-            if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                break
+    active_moves = array("H")
+    quiet_moves = array("H")
+    _PIECE_GENERATORS[piece & RANK_MASK](start, board, active_moves, quiet_moves)
+    return move in active_moves or move in quiet_moves
 
-            target_piece = board.get_piece((new_row, new_col))
-            if target_piece is None:
-                # Normal
-                quiet_moves.append(((row, col), (new_row, new_col)))
-            elif target_piece[0] != board.player_color:
-                # Capture
-                active_moves.append(((row, col), (new_row, new_col)))
-                break
-            else:
-                # Blocked
-                break
 
-    return active_moves, quiet_moves
+def has_legal_move(board):
+    """Checks if current player has a legal move, stopping at the first one found.
 
+    Args:
+        board: Board object.
 
-def _generate_rook(row, col, board):
-    active_moves = []
-    quiet_moves = []
+    Returns:
+        Boolean, False for checkmate and stalemate.
+    """
+    color = board.side_to_move
 
-    directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    for square, piece in enumerate(board.squares):
+        if piece and piece & COLOR_MASK == color:
+            moves = array("H")
+            _PIECE_GENERATORS[piece & RANK_MASK](square, board, moves, moves)
+            if any(is_legal_move(board, move) for move in moves):
+                return True
 
-    for row_direction, col_direction in directions:
-        for i in range(1, 8):
-            new_row = row + row_direction * i
-            new_col = col + col_direction * i
-            if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                break
+    return False
 
-            target_piece = board.get_piece((new_row, new_col))
-            if target_piece is None:
-                # Normal
-                quiet_moves.append(((row, col), (new_row, new_col)))
-            elif target_piece[0] != board.player_color:
-                # Capture
-                active_moves.append(((row, col), (new_row, new_col)))
-                break
-            else:
-                # Blocked
-                break
 
-    return active_moves, quiet_moves
+def generate_legal_moves(board, only_active=False):
+    """Generates strictly legal moves for current player.
 
+    Checks and pins are found once for the position, so only king moves and en passant
+    captures are tested for attacks one by one.
 
-def _generate_queen(row, col, board):
-    # Queen = bishop + rook
-    bishop_active, bishop_quiet = _generate_bishop(row, col, board)
-    rook_active, rook_quiet = _generate_rook(row, col, board)
+    Args:
+        board: Board object.
+        only_active: If True, only return active moves
+
+    Returns:
+        Array('H') of integer moves. Active moves are returned first.
+    """
+    moves = generate_moves(board, only_active)
+    king_pos = board.king_positions[board.side_to_move]
+    king_square = king_pos[0] * 8 + king_pos[1]
+    check_mask, pin_masks = get_check_and_pin_masks(board)
+
+    # Lift the king, so squares behind it on a checking slider's line count as attacked
+    king = board.get_piece(king_pos)
+    board.set_piece(king_pos, EMPTY)
+    safe_king_squares = {
+        move & SQUARE_MASK
+        for move in moves
+        if move >> START_SHIFT & SQUARE_MASK == king_square
+        and not is_square_attacked(board, divmod(move & SQUARE_MASK, 8))
+    }
+    board.set_piece(king_pos, king)
+
+    legal_moves = array("H")
+    for move in moves:
+        start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+        if start == king_square:
+            if end in safe_king_squares:
+                legal_moves.append(move)
+        elif move >> FLAG_SHIFT == EN_PASSANT:
+            # Taking en passant removes two pieces from the king's lines, so test it directly
+            if is_legal_move(board, move):
+                legal_moves.append(move)
+        elif (check_mask is None or end in check_mask) and (
+            start not in pin_masks or end in pin_masks[start]
+        ):
+            legal_moves.append(move)
 
-    return bishop_active + rook_active, bishop_quiet + rook_quiet
+    return legal_moves
 
 
-def _generate_king(row, col, board):
-    active_moves = []
-    quiet_moves = []
+def _generate_pawn(square, board, active_moves, quiet_moves):
+    squares = board.squares
+    color = board.side_to_move
+    step = PAWN_DIRECTIONS[color] * 8
+    target = square + step
+    if not 0 <= target < 64:
+        return
 
-    for row_direction in [-1, 0, 1]:
-        for col_direction in [-1, 0, 1]:
-            if row_direction == col_direction == 0:
-                continue
-            new_row = row + row_direction
-            new_col = col + col_direction
-            if not (0 <= new_row < 8 and 0 <= new_col < 8):
-                continue
+    start = square << START_SHIFT
+    promotion_row = PROMOTION_ROWS[color]
 
-            target_piece = board.get_piece((new_row, new_col))
-            if target_piece is None:
-                # Normal
-                quiet_moves.append(((row, col), (new_row, new_col)))
-            elif target_piece[0] != board.player_color:
-                # Capture
-                active_moves.append(((row, col), (new_row, new_col)))
+    # Peaceful moves
+    if not squares[target]:
+        if target >> 3 == promotion_row:
+            # Promotion
+            if active_moves is not None:
+                active_moves.append(PROMOTION << FLAG_SHIFT | start | target)
+        elif quiet_moves is not None:
+            # Normal forward
+            quiet_moves.append(start | target)
+
+            if square >> 3 == PAWN_START_ROWS[color] and not squares[target + step]:
+                # Double forward
+                quiet_moves.append(start | target + step)
+
+    if active_moves is None:
+        return
+
+    # Attacking moves
+    en_passant_target = board.en_passant_target
+    for target in PAWN_ATTACKS[color][square]:
+        target_piece = squares[target]
+        if target_piece and target_piece & COLOR_MASK != color:
+            # Diagonal capture
+            flag = PROMOTION if target >> 3 == promotion_row else NORMAL
+            active_moves.append(flag << FLAG_SHIFT | start | target)
+        elif (
+            not target_piece
+            and en_passant_target
+            and en_passant_target[0] * 8 + en_passant_target[1] == target
+        ):
+            # En passant
+            active_moves.append(EN_PASSANT << FLAG_SHIFT | start | target)
 
-    if row == 7 and col == 4:
+
+def _generate_knight(square, board, active_moves, quiet_moves):
+    _generate_steps(square, board, KNIGHT_TARGETS[square], active_moves, quiet_moves)
+
+
+def _generate_bishop(square, board, active_moves, quiet_moves):
+    _generate_slides(square, board, BISHOP_RAYS[square], active_moves, quiet_moves)
+
+
+def _generate_rook(square, board, active_moves, quiet_moves):
+    _generate_slides(square, board, ROOK_RAYS[square], active_moves, quiet_moves)
+
+
+def _generate_queen(square, board, active_moves, quiet_moves):
+    # Queen = bishop + rook
+    _generate_bishop(square, board, active_moves, quiet_moves)
+    _generate_rook(square, board, active_moves, quiet_moves)
+
+
+def _generate_king(square, board, active_moves, quiet_moves):
+    _generate_steps(square, board, KING_TARGETS[square], active_moves, quiet_moves)
+    if quiet_moves is None:
+        return
+
+    squares = board.squares
+    color = board.side_to_move
+    home_row = HOME_ROWS[color]
+    home = home_row * 8
+    kingside_right, queenside_right = CASTLING_RIGHTS[color]
+    castling_rights = board.castling_rights & (kingside_right | queenside_right)
+    if square == home + 4 and castling_rights and not is_in_check(board):
+        start = CASTLING << FLAG_SHIFT | square << START_SHIFT
         # Castling
-        king_piece = board.get_piece((row, col))
-        if king_piece and not king_piece[2] and not is_in_check(board):
-            rook_right = board.get_piece((7, 7))
+        if board.castling_rights & kingside_right:
             if (
-                rook_right
-                and rook_right[1] == "rook"
-                and not rook_right[2]
-                and not board.get_piece((7, 5))
-                and not board.get_piece((7, 6))
-                and not is_square_attacked(board, (7, 5))
+                squares[home + 7] == color | ROOK
+                and not squares[home + 5]
+                and not squares[home + 6]
+                and not is_square_attacked(board, (home_row, 5))
             ):
-                quiet_moves.append(((row, col), (row, col + 2)))
+                quiet_moves.append(start | square + 2)
 
-            rook_left = board.get_piece((7, 0))
+        if board.castling_rights & queenside_right:
             if (
-                rook_left
-                and rook_left[1] == "rook"
-                and not rook_left[2]
-                and not board.get_piece((7, 1))
-                and not board.get_piece((7, 2))
-                and not board.get_piece((7, 3))
-                and not is_square_attacked(board, (7, 3))
+                squares[home] == color | ROOK
+                and not squares[home + 1]
+                and not squares[home + 2]
+                and not squares[home + 3]
+                and not is_square_attacked(board, (home_row, 3))
             ):
-                quiet_moves.append(((row, col), (row, col - 2)))
+                quiet_moves.append(start | square - 2)
+
+
+def _generate_steps(square, board, targets, active_moves, quiet_moves):
+    """Generates the moves of a knight or king to precomputed target squares.
+
+    Like the other piece generators, appends captures and promotions to active_moves and
+    the rest to quiet_moves, skipping the moves of a list passed as None.
+    """
+    squares = board.squares
+    color = board.side_to_move
+    start = square << START_SHIFT
+
+    for target in targets:
+        target_piece = squares[target]
+        if not target_piece:
+            # Normal
+            if quiet_moves is not None:
+                quiet_moves.append(start | target)
+        elif target_piece & COLOR_MASK != color and active_moves is not None:
+            # Capture
+            active_moves.append(start | target)
+
+
+def _generate_slides(square, board, rays, active_moves, quiet_moves):
+    """Generates the moves of a sliding piece along precomputed rays."""
+    squares = board.squares
+    color = board.side_to_move
+    start = square << START_SHIFT
+
+    for ray in rays:
+        for target in ray:
+            target_piece = squares[target]
+            if not target_piece:
+                # Normal
+                if quiet_moves is not None:
+                    quiet_moves.append(start | target)
+            elif target_piece & COLOR_MASK != color:
+                # Capture
+                if active_moves is not None:
+                    active_moves.append(start | target)
+                break
+            else:
+                # Blocked
+                break
+
 
-    return active_moves, quiet_moves
+_PIECE_GENERATORS = {
+    PAWN: _generate_pawn,
+    KNIGHT: _generate_knight,
+    BISHOP: _generate_bishop,
+    ROOK: _generate_rook,
+    QUEEN: _generate_queen,
+    KING: _generate_king,
+}
@@ -0,0 +1,81 @@
+from engine.entities.board import OPPONENT
+from engine.entities.pieces import PAWN, QUEEN, KING, COLOR_MASK, RANK_MASK
+from engine.entities.move import PROMOTION, EN_PASSANT, START_SHIFT, FLAG_SHIFT, SQUARE_MASK
+from engine.entities.piece_square_tables import PIECE_VALUES
+from .check_detector import find_attackers
+
+# A king only recaptures when the square is not defended anymore
+_EXCHANGE_VALUES = {**PIECE_VALUES, KING: 20000}
+
+
+def captured_value(board, move):
+    """Material a move wins immediately, including en passant captures and promotions.
+
+    Args:
+        board: Board object before the move.
+        move: Integer move, see engine.entities.move.
+
+    Returns:
+        Integer value of the captured piece plus the gain of a promotion.
+    """
+    flag = move >> FLAG_SHIFT
+    captured = board.squares[move & SQUARE_MASK]
+    value = PIECE_VALUES[captured & RANK_MASK] if captured else 0
+
+    if flag == EN_PASSANT:
+        value = PIECE_VALUES[PAWN]
+    elif flag == PROMOTION:
+        value += PIECE_VALUES[QUEEN] - PIECE_VALUES[PAWN]
+    return value
+
+
+def mvv_lva_score(board, move):
+    """Orders captures by most valuable victim first, then least valuable attacker.
+
+    Args:
+        board: Board object before the move.
+        move: Integer move, see engine.entities.move.
+
+    Returns:
+        Integer, higher for moves to search first.
+    """
+    return captured_value(board, move) * 8 - (
+        board.squares[move >> START_SHIFT & SQUARE_MASK] & RANK_MASK
+    )
+
+
+def static_exchange_evaluation(board, move):
+    """Estimates the material a capture wins once all exchanges on its square are done.
+
+    Both sides recapture with their least valuable attacker, and either side may stop
+    when recapturing would lose material. Pieces behind the capturing ones join in, but
+    pins and checks are not taken into account.
+
+    Args:
+        board: Board object before the move.
+        move: Integer move, see engine.entities.move.
+
+    Returns:
+        Integer material balance of the exchange for the side making the move.
+    """
+    start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+    squares = board.squares
+    piece = squares[start]
+    gains = [captured_value(board, move)]
+    if move >> FLAG_SHIFT == PROMOTION:
+        piece = piece & COLOR_MASK | QUEEN
+
+    removed = {start}
+    color = OPPONENT[piece & COLOR_MASK]
+    while attackers := find_attackers(board, end, color, removed):
+        square = min(attackers, key=lambda square: _EXCHANGE_VALUES[squares[square] & RANK_MASK])
+        # Balance if the piece on the square is captured in turn
+        gains.append(_EXCHANGE_VALUES[piece & RANK_MASK] - gains[-1])
+        piece = squares[square]
+        removed.add(square)
+        color = OPPONENT[color]
+
+    # Each side picks the better of capturing and stopping, from the last capture back
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+    return gains[0]
@@ -1,4 +1,7 @@
-from .core import simulate_move, generate_moves, is_in_check
+from threading import Thread
+from engine.entities.board import OPPONENT
+from engine.entities.pieces import COLOR_NAMES, COLORS_BY_NAME
+from .core import generate_legal_moves, is_in_check
 
 CHECKMATE = 1
 DRAW = 2
@@ -11,25 +14,40 @@ class GameService:
         board: Board object.
     """
 
-    def __init__(self, board, ai_engine=None, user=None, game_repository=None):
-        """Initializes GameService and calls the AI to do the first move, if it is white.
+    def __init__(
+        self,
+        board,
+        ai_engine=None,
+        user=None,
+        game_repository=None,
+        player_color="white",
+        ponder=False,
+    ):
+        """Initializes GameService and starts the AI's first move, if it is white.
 
         Args:
             board: Board object.
             ai_engine: Optional AI engine object.
             user: Optional user object.
             game_repository: Optional GameRepository instance.
+            player_color: Color ("white" or "black") of the player against the AI.
+            ponder: If True, the AI searches the player's expected reply while the player
+                thinks, and keeps the search if the player makes that move.
         """
         self.board = board
         self._ai = ai_engine
         self._winner = None
         self._user = user
         self._game_repo = game_repository
+        self._player_color = COLORS_BY_NAME[player_color]
+        self._ai_thread = None
+        self._ai_move = None
+        self._ponder = ponder
+        self._ponder_thread = None
+        self._ponder_move = None
 
-        if board.player_color == "black":
-            self.board.flip_board()
-            if self._ai:
-                self._move_piece(self._ai.get_best_move(self.board))
+        if self._ai and board.side_to_move != self._player_color:
+            self.request_ai_move()
 
     def get_winner(self):
         """Returns the winner of the game.
@@ -39,47 +57,139 @@ class GameService:
         """
         return self._winner
 
-    def move_handler(self, move):
+    def get_perspective(self):
+        """Returns the color whose point of view the board should be shown from.
+
+        Returns:
+            Name of the player's color against the AI, otherwise of the side to move, or
+            of the side that made the last move once the game is over.
+        """
+        if self._ai:
+            return COLOR_NAMES[self._player_color]
+        if self._winner:
+            return COLOR_NAMES[OPPONENT[self.board.side_to_move]]
+        return COLOR_NAMES[self.board.side_to_move]
+
+    def move_handler(self, move, wait_for_ai=True):
         """Processes a player move and the corresponding AI response, if present.
 
         Args:
-            move: (start, end) positions as (row, col) tuples.
+            move: Integer move, see engine.entities.move. Moves entered as squares are
+                converted with move_from_positions.
+            wait_for_ai: If False, only start the AI response and let the caller
+                apply it later with poll_ai_move.
 
         Returns:
-            Board object or False if the move was illegal.
+            Board object or False if the move was illegal or the AI is still thinking.
         """
-        if not self._move_piece(move):
+        if self.is_ai_thinking() or not self._move_piece(move):
             return False
 
+        ponder_hit = self._ponder_thread is not None and move == self._ponder_move
         if end_state := self._is_game_over():
+            self._stop_pondering()
             self._game_end_handler(end_state)
             return self.board
 
         if self._ai:
-            ai_move = self._ai.get_best_move(self.board)
-            self._move_piece(ai_move)
-
-            if end_state := self._is_game_over():
-                self._game_end_handler(end_state, True)
-                return self.board
+            if ponder_hit:
+                # The search on the expected reply becomes the search for the AI's move
+                self._ai.ponder_hit()
+                self._ai_thread, self._ponder_thread = self._ponder_thread, None
+            else:
+                self._stop_pondering()
+                self.request_ai_move()
+            if wait_for_ai:
+                self.wait_for_ai_move()
+            return self.board
 
         if self.board.stall_clock >= 50:
-            self.board.flip_board()
             self._winner = "draw"
 
         return self.board
 
-    def _move_piece(self, move):
-        valid_moves = generate_moves(self.board)
-        if move not in valid_moves:
+    def request_ai_move(self):
+        """Starts searching for the AI's move in a worker thread."""
+        board = self.board.copy()
+        self._ai_move = None
+        self._ai_thread = Thread(target=self._search_ai_move, args=(board,), daemon=True)
+        self._ai_thread.start()
+
+    def is_ai_thinking(self):
+        """Returns whether an AI move has been requested but not yet applied."""
+        return self._ai_thread is not None
+
+    def poll_ai_move(self):
+        """Applies the AI's move, if its search has finished.
+
+        Returns:
+            Boolean for whether the move was applied and the board changed.
+        """
+        if self._ai_thread is None or self._ai_thread.is_alive():
             return False
 
-        board = simulate_move(self.board, move)
+        self._ai_thread = None
+        self._move_piece(self._ai_move)
+
+        if end_state := self._is_game_over():
+            self._game_end_handler(end_state, True)
+        elif self.board.stall_clock >= 50:
+            self._winner = "draw"
+        elif self._ponder:
+            self._start_pondering()
 
-        if not board:
+        return True
+
+    def wait_for_ai_move(self):
+        """Blocks until the AI's search finishes and applies its move."""
+        if self._ai_thread:
+            self._ai_thread.join()
+        self.poll_ai_move()
+
+    def cancel_ai_move(self):
+        """Stops a running AI search, or pondering, and discards its move."""
+        self._stop_pondering()
+        self._stop_thread(self._ai_thread)
+        self._ai_thread = None
+        self._ai_move = None
+
+    def is_pondering(self):
+        """Returns whether the AI is searching the player's expected reply."""
+        return self._ponder_thread is not None
+
+    def _start_pondering(self):
+        """Starts searching the position after the player's expected reply in a worker thread."""
+        self._ponder_move = self._ai.expected_reply(self.board)
+        if self._ponder_move is None:
+            return
+
+        board = self.board.copy()
+        board.make_move(self._ponder_move)
+        self._ai_move = None
+        self._ai.start_pondering()
+        self._ponder_thread = Thread(target=self._search_ai_move, args=(board,), daemon=True)
+        self._ponder_thread.start()
+
+    def _stop_pondering(self):
+        self._stop_thread(self._ponder_thread)
+        self._ponder_thread = None
+        self._ponder_move = None
+
+    def _stop_thread(self, thread):
+        while thread and thread.is_alive():
+            # Repeated, since a search that has not started yet would clear the request
+            self._ai.stop()
+            thread.join(0.01)
+
+    def _search_ai_move(self, board):
+        self._ai_move = self._ai.get_best_move(board)
+
+    def _move_piece(self, move):
+        if move not in generate_legal_moves(self.board):
             return False
 
-        board.flip_board()
+        board = self.board.copy()
+        board.make_move(move)
         self.board = board
 
         return True
@@ -92,24 +202,20 @@ class GameService:
                 self._winner = "ai"
                 result = -1
             else:
-                self.board.flip_board()
-                self._winner = "player" if self._ai else self.board.player_color
+                self._winner = (
+                    "player" if self._ai else COLOR_NAMES[OPPONENT[self.board.side_to_move]]
+                )
                 result = 1
         elif end_state == DRAW:
             self._winner = "draw"
-            if not ai_turn:
-                self.board.flip_board()
             result = 0
 
         if self._user and self._ai:
             self._game_repo.record_game(self._user.id, result, self._ai.difficulty)
 
     def _is_game_over(self):
-        moves = generate_moves(self.board)
-
-        for move in moves:
-            if simulate_move(self.board, move):
-                return False
+        if generate_legal_moves(self.board):
+            return False
 
         if is_in_check(self.board):
             return CHECKMATE
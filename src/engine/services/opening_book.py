@@ -0,0 +1,217 @@
+import mmap
+import random
+import re
+import struct
+from collections import Counter
+from engine.entities.board import Board
+from engine.entities.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, RANK_MASK
+from engine.entities.move import SQUARES_MASK, decode_move, move_from_positions
+from .core import generate_legal_moves
+
+# The file is a magic header followed by entries sorted by position key. An entry is the
+# 64-bit Zobrist key of a position, the squares of a move from it and the move's weight.
+_MAGIC = b"CHSBOOK1"
+_ENTRY = struct.Struct("<QHH")
+_MAX_WEIGHT = 0xFFFF
+
+_SAN_RANKS = {"N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN, "K": KING}
+_SAN_PATTERN = re.compile(r"([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQ]))?")
+
+# Tag pairs, comments, numeric annotations, move numbers and results
+_PGN_NOISE = re.compile(r"\[[^\]]*\]|\{[^}]*\}|;[^\n]*|\$\d+|\d+\.(?:\.\.)?|1-0|0-1|1/2-1/2|\*")
+_PGN_VARIATION = re.compile(r"\([^()]*\)")
+
+
+class OpeningBook:
+    """Read-only opening book in a memory-mapped file built by build_book.
+
+    Lookups are binary searches on the sorted entries of the file, so the book is not
+    loaded into memory and opening it takes constant time.
+
+    Attributes:
+        path: Path of the book file.
+        size: Number of (position, move) entries.
+    """
+
+    def __init__(self, path, seed=None):
+        """Opens a book file.
+
+        Args:
+            path: Path of a file written by build_book.
+            seed: Optional seed for the random choice between book moves.
+
+        Raises:
+            ValueError: If the file is not an opening book.
+        """
+        self.path = path
+        self._random = random.Random(seed)
+        with open(path, "rb") as book_file:
+            self._data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._data[: len(_MAGIC)] != _MAGIC or (len(self._data) - len(_MAGIC)) % _ENTRY.size:
+            self._data.close()
+            raise ValueError(f"{path} is not an opening book")
+        self.size = (len(self._data) - len(_MAGIC)) // _ENTRY.size
+
+    def probe(self, board):
+        """Finds the book moves of a position.
+
+        Args:
+            board: Board object.
+
+        Returns:
+            List of (move, weight) tuples, empty if the position is not in the book.
+        """
+        key = board.zobrist_key
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for index in range(low, self.size):
+            entry_key, move, weight = self._entry(index)
+            if entry_key != key:
+                break
+            moves.append((decode_book_move(board, move), weight))
+        return moves
+
+    def choose_move(self, board):
+        """Picks a book move at random, weighted by how often it was played.
+
+        Args:
+            board: Board object.
+
+        Returns:
+            Integer move, or None if the position is not in the book.
+        """
+        moves = self.probe(board)
+        if not moves:
+            return None
+        return self._random.choices(
+            [move for move, _ in moves], weights=[weight for _, weight in moves]
+        )[0]
+
+    def close(self):
+        """Releases the memory map."""
+        self._data.close()
+
+    def _entry(self, index):
+        return _ENTRY.unpack_from(self._data, len(_MAGIC) + index * _ENTRY.size)
+
+
+def encode_book_move(move):
+    """Packs a move into 16 bits as start square * 64 + end square, leaving out its flag."""
+    return move & SQUARES_MASK
+
+
+def decode_book_move(board, packed_move):
+    """Unpacks a move packed by encode_book_move, restoring its flag from the position."""
+    return move_from_positions(board, *decode_move(packed_move))
+
+
+def move_from_san(board, san):
+    """Finds the legal move described in Standard Algebraic Notation.
+
+    Args:
+        board: Board object.
+        san: Move such as "e4", "Nbd7", "exd5", "O-O" or "e8=Q", check marks allowed.
+
+    Returns:
+        Integer move, or None if the move is not legal, ambiguous, or an underpromotion,
+        which the engine does not play.
+    """
+    san = san.rstrip("+#!?")
+    legal_moves = generate_legal_moves(board)
+
+    if san in ("O-O", "O-O-O", "0-0", "0-0-0"):
+        row, col = board.king_positions[board.side_to_move]
+        end = (row, col + 2) if len(san) == 3 else (row, col - 2)
+        move = move_from_positions(board, (row, col), end)
+        return move if move in legal_moves else None
+
+    match = _SAN_PATTERN.fullmatch(san)
+    if not match or match.group(5) not in (None, "Q"):
+        return None
+
+    piece, from_file, from_rank, square, _ = match.groups()
+    rank = _SAN_RANKS[piece] if piece else PAWN
+    end = (8 - int(square[1]), ord(square[0]) - ord("a"))
+
+    candidates = []
+    for move in legal_moves:
+        start, move_end = decode_move(move)
+        if (
+            move_end == end
+            and board.get_piece(start) & RANK_MASK == rank
+            and (from_file is None or start[1] == ord(from_file) - ord("a"))
+            and (from_rank is None or start[0] == 8 - int(from_rank))
+        ):
+            candidates.append(move)
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def read_pgn_games(pgn_text):
+    """Splits a PGN collection into the moves of each game.
+
+    Args:
+        pgn_text: Contents of a PGN file.
+
+    Returns:
+        List of games, each a list of moves in Standard Algebraic Notation.
+    """
+    games = []
+    # A new game starts at a tag section following movetext
+    for game_text in re.split(r"\n\s*\n(?=\s*\[)", pgn_text):
+        # Remove nested variations from the inside out
+        while _PGN_VARIATION.search(game_text):
+            game_text = _PGN_VARIATION.sub(" ", game_text)
+        moves = _PGN_NOISE.sub(" ", game_text).split()
+        if moves:
+            games.append(moves)
+    return games
+
+
+def build_book(pgn_texts, path, max_ply=16, min_count=1):
+    """Builds an opening book file from PGN game collections.
+
+    Each game adds its moves up to max_ply half-moves into the book, and the weight of
+    a move is the number of games that played it in the position. Games stop adding
+    moves at the first move that cannot be read.
+
+    Args:
+        pgn_texts: List of PGN file contents.
+        path: Path of the book file to write.
+        max_ply: Number of half-moves of each game to add.
+        min_count: Least number of games that must play a move for it to be added.
+
+    Returns:
+        (games, entries) tuple with the number of games read and entries written.
+    """
+    counts = Counter()
+    games = 0
+    for pgn_text in pgn_texts:
+        for game in read_pgn_games(pgn_text):
+            games += 1
+            board = Board()
+            for san in game[:max_ply]:
+                move = move_from_san(board, san)
+                if move is None:
+                    break
+                counts[(board.zobrist_key, encode_book_move(move))] += 1
+                board.make_move(move)
+
+    entries = sorted(
+        (key, move, min(count, _MAX_WEIGHT))
+        for (key, move), count in counts.items()
+        if count >= min_count
+    )
+    with open(path, "wb") as book_file:
+        book_file.write(_MAGIC)
+        for entry in entries:
+            book_file.write(_ENTRY.pack(*entry))
+
+    return games, len(entries)
@@ -0,0 +1,114 @@
+import time
+from engine.entities.board import Board
+from .core import generate_moves, generate_legal_moves, make_legal_move
+
+# Standard test positions with known node counts. The engine only promotes to a queen,
+# so positions and depths are limited to trees without promotions.
+PERFT_SUITE = [
+    (
+        "Initial position",
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        {1: 20, 2: 400, 3: 8902, 4: 197281},
+    ),
+    (
+        "Kiwipete",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        {1: 48, 2: 2039, 3: 97862},
+    ),
+    (
+        "Rook endgame",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        {1: 14, 2: 191, 3: 2812, 4: 43238},
+    ),
+    (
+        "Middlegame",
+        "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+        {1: 46, 2: 2079, 3: 89890},
+    ),
+]
+
+
+def perft(board, depth, legal_generator=False):
+    """Counts the leaf nodes of the move tree to a given depth.
+
+    Args:
+        board: Board object, left unchanged.
+        depth: Integer depth of the tree.
+        legal_generator: If True, count with generate_legal_moves instead of filtering
+            generate_moves with make_legal_move.
+
+    Returns:
+        Integer number of positions at the given depth.
+    """
+    if depth == 0:
+        return 1
+
+    nodes = 0
+    if legal_generator:
+        for move in generate_legal_moves(board):
+            undo = board.make_move(move)
+            nodes += perft(board, depth - 1, True)
+            board.unmake_move(move, undo)
+        return nodes
+
+    for move in generate_moves(board):
+        undo = make_legal_move(board, move)
+        if undo is None:
+            continue
+        nodes += perft(board, depth - 1)
+        board.unmake_move(move, undo)
+    return nodes
+
+
+def divide(board, depth, legal_generator=False):
+    """Counts the leaf nodes below each legal move, for finding move generation bugs.
+
+    Args:
+        board: Board object, left unchanged.
+        depth: Integer depth of the tree, at least 1.
+        legal_generator: If True, count with generate_legal_moves.
+
+    Returns:
+        Dictionary of integer move to integer node count.
+    """
+    counts = {}
+    for move in generate_legal_moves(board):
+        undo = board.make_move(move)
+        counts[move] = perft(board, depth - 1, legal_generator)
+        board.unmake_move(move, undo)
+    return counts
+
+
+def run_suite(max_depth=3, report=print):
+    """Runs perft on the standard positions with both move generators.
+
+    Args:
+        max_depth: Deepest depth to run for each position.
+        report: Function called with a line of text per result.
+
+    Returns:
+        Boolean for whether all node counts matched.
+    """
+    all_passed = True
+
+    for name, fen, expected_counts in PERFT_SUITE:
+        for depth, expected in expected_counts.items():
+            if depth > max_depth:
+                continue
+
+            for legal_generator in (False, True):
+                board = Board.from_fen(fen)
+                start_time = time.perf_counter()
+                nodes = perft(board, depth, legal_generator)
+                elapsed_time = time.perf_counter() - start_time
+
+                passed = nodes == expected
+                all_passed = all_passed and passed
+                generator = "legal" if legal_generator else "pseudo-legal"
+                report(
+                    f"{'OK  ' if passed else 'FAIL'} {name}, depth {depth}, {generator}: "
+                    f"{nodes} nodes (expected {expected}), "
+                    f"{elapsed_time:.2f} s, {nodes / max(elapsed_time, 1e-9):.0f} nodes/s"
+                )
+
+    return all_passed
@@ -0,0 +1,128 @@
+from engine.entities.move import move_name
+
+
+class IterationStats:
+    """Result of one completed iteration of iterative deepening.
+
+    Attributes:
+        depth: Integer search depth of the iteration.
+        time_ms: Time spent on the iteration in milliseconds.
+        nodes: Number of nodes, including quiescence nodes, searched in the iteration.
+        score: Integer score of the best move for the side to move.
+        best_move: Integer move, see engine.entities.move.
+        pv: List of moves of the principal variation, the expected line of play starting
+            with the best move. Cut short where the line came from the transposition table.
+    """
+
+    def __init__(self, depth, time_ms, nodes, score, best_move, pv=None):
+        self.depth = depth
+        self.time_ms = time_ms
+        self.nodes = nodes
+        self.score = score
+        self.best_move = best_move
+        self.pv = pv or []
+
+    def __repr__(self):
+        return (
+            f"depth {self.depth}: {self.time_ms:.0f} ms, {self.nodes} nodes, "
+            f"score {self.score}, best move {move_name(self.best_move)}, pv of {len(self.pv)} moves"
+        )
+
+
+class SearchStats:
+    """Counters collected during a single AIEngine.get_best_move call.
+
+    Attributes:
+        nodes: Number of positions visited by the main search.
+        qnodes: Number of positions visited by the quiescence search.
+        losing_captures_pruned: Number of captures the quiescence search skipped because the
+            static exchange evaluation found them losing material.
+        depth: Deepest completed iteration, 0 if none completed.
+        iterations: List of IterationStats, one per completed iteration.
+        tt_probes: Number of transposition table lookups.
+        tt_hits: Number of lookups that found the position.
+        beta_cutoffs: Number of nodes where a move failed high.
+        first_move_cutoffs: Number of beta cutoffs caused by the first move searched.
+        re_searches: Number of null window searches that had to be repeated with a full window.
+        aspiration_re_searches: Number of root searches repeated with a wider window after
+            the score fell outside the aspiration window.
+        null_moves: Number of null move searches made for null move pruning.
+        null_move_cutoffs: Number of nodes cut off because they held beta after a null move.
+        reduced_moves: Number of late moves searched with a reduced depth.
+        reduction_re_searches: Number of reduced moves searched again at full depth.
+        helper_nodes: Number of nodes searched by helper processes of a parallel search.
+        book_move: True if the move came from the opening book without searching.
+        tablebase_hits: Number of positions of the search found in the endgame tablebase.
+        tablebase_move: True if the move came from the endgame tablebase without searching.
+        pondered: True if the search started on the opponent's time, on the expected reply.
+        time_ms: Total time of the search in milliseconds.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.qnodes = 0
+        self.losing_captures_pruned = 0
+        self.depth = 0
+        self.iterations = []
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.re_searches = 0
+        self.aspiration_re_searches = 0
+        self.null_moves = 0
+        self.null_move_cutoffs = 0
+        self.reduced_moves = 0
+        self.reduction_re_searches = 0
+        self.helper_nodes = 0
+        self.book_move = False
+        self.tablebase_hits = 0
+        self.tablebase_move = False
+        self.pondered = False
+        self.time_ms = 0
+
+    @property
+    def total_nodes(self):
+        return self.nodes + self.qnodes
+
+    @property
+    def nodes_per_second(self):
+        return self.total_nodes * 1000 / self.time_ms if self.time_ms else 0
+
+    @property
+    def tt_hit_rate(self):
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0
+
+    @property
+    def pv(self):
+        """Principal variation of the deepest completed iteration."""
+        return self.iterations[-1].pv if self.iterations else []
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Share of beta cutoffs found on the first move, a measure of move ordering quality."""
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0
+
+    def add_iteration(self, depth, time_ms, nodes, score, best_move, pv=None):
+        """Records a completed iteration of iterative deepening."""
+        self.depth = depth
+        self.iterations.append(IterationStats(depth, time_ms, nodes, score, best_move, pv))
+
+    def __repr__(self):
+        if self.book_move:
+            return f"book move in {self.time_ms:.2f} ms"
+        if self.tablebase_move:
+            return f"tablebase move in {self.time_ms:.2f} ms"
+        return (
+            f"depth {self.depth}, {self.nodes} nodes + {self.qnodes} qnodes "
+            f"in {self.time_ms:.0f} ms ({self.nodes_per_second:.0f} nodes/s), "
+            f"TT hit rate {self.tt_hit_rate:.1%}, {self.beta_cutoffs} beta cutoffs "
+            f"({self.first_move_cutoff_rate:.1%} on first move), {self.re_searches} re-searches, "
+            f"{self.aspiration_re_searches} aspiration re-searches, "
+            f"{self.null_move_cutoffs}/{self.null_moves} null move cutoffs, "
+            f"{self.reduction_re_searches}/{self.reduced_moves} reduced moves re-searched, "
+            f"{self.losing_captures_pruned} losing captures pruned"
+            + (f", {self.helper_nodes} helper nodes" if self.helper_nodes else "")
+            + (f", {self.tablebase_hits} tablebase hits" if self.tablebase_hits else "")
+            + (", pondered" if self.pondered else "")
+        )
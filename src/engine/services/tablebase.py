@@ -0,0 +1,295 @@
+import mmap
+import os
+from engine.entities.pieces import (
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE,
+    BLACK,
+    COLOR_MASK,
+    RANK_MASK,
+)
+from engine.entities.board import OPPONENT
+from engine.entities.piece_square_tables import PHASE_WEIGHTS
+from engine.entities.zobrist import CASTLING_SQUARES
+
+# Game theoretical values for the side to move. 0 marks an unused index in a table.
+LOSS = 1
+DRAW = 2
+WIN = 3
+
+RANK_LETTERS = {KING: "K", QUEEN: "Q", ROOK: "R", BISHOP: "B", KNIGHT: "N", PAWN: "P"}
+LETTER_RANKS = {letter: rank for rank, letter in RANK_LETTERS.items()}
+_LETTER_ORDER = "KQRBNP"
+
+# Material without mating chances is drawn, so it has no table
+DRAWN_MATERIAL = {"KvK", "KBvK", "KNvK"}
+
+
+def _square_transforms():
+    """Builds the eight symmetries of the board as square mapping lists."""
+    transforms = []
+    for transpose in (False, True):
+        for flip_rows in (False, True):
+            for flip_cols in (False, True):
+                mapping = []
+                for square in range(64):
+                    row, col = divmod(square, 8)
+                    if transpose:
+                        row, col = col, row
+                    row = 7 - row if flip_rows else row
+                    col = 7 - col if flip_cols else col
+                    mapping.append(row * 8 + col)
+                transforms.append(mapping)
+    return transforms
+
+
+_TRANSFORMS = _square_transforms()
+
+# Squares the white king is moved to by the symmetries. Tables without pawns use all eight
+# symmetries and the a1-d1-d4 triangle, tables with pawns only the left-right mirror image
+# and the files a-d. Row 7 is the first rank.
+KING_REGIONS = {
+    False: [row * 8 + col for row in range(7, 3, -1) for col in range(7 - row, 4)],
+    True: [row * 8 + col for row in range(8) for col in range(4)],
+}
+_ALLOWED_TRANSFORMS = {False: _TRANSFORMS, True: _TRANSFORMS[:2]}
+
+
+def _king_transforms(pawns):
+    """Finds for each square of the white king the symmetry that moves it into its region.
+
+    Squares already in the region keep the identity, which comes first.
+    """
+    region = KING_REGIONS[pawns]
+    king_transforms = []
+    for square in range(64):
+        for transform in _ALLOWED_TRANSFORMS[pawns]:
+            if transform[square] in region:
+                king_transforms.append(transform)
+                break
+    return king_transforms
+
+
+_KING_TRANSFORMS = {pawns: _king_transforms(pawns) for pawns in (False, True)}
+_KING_SLOTS = {
+    pawns: {square: slot for slot, square in enumerate(region)}
+    for pawns, region in KING_REGIONS.items()
+}
+
+
+def material_signature(white_ranks, black_ranks):
+    """Names the material of a position, e.g. "KQvK".
+
+    Args:
+        white_ranks: Iterable of the ranks of white's pieces.
+        black_ranks: Iterable of the ranks of black's pieces.
+
+    Returns:
+        String of piece letters, white's before black's.
+    """
+    white = "".join(sorted((RANK_LETTERS[rank] for rank in white_ranks), key=_LETTER_ORDER.index))
+    black = "".join(sorted((RANK_LETTERS[rank] for rank in black_ranks), key=_LETTER_ORDER.index))
+    return f"{white}v{black}"
+
+
+def _side_strength(letters):
+    return len(letters), [-_LETTER_ORDER.index(letter) for letter in letters]
+
+
+def is_canonical(signature):
+    """Tables are stored for the material where white is at least as strong as black."""
+    white, black = signature.split("v")
+    return _side_strength(white) >= _side_strength(black)
+
+
+def table_pieces(signature):
+    """Lists the pieces of a table in index order.
+
+    Args:
+        signature: Material signature, e.g. "KQvK".
+
+    Returns:
+        List of piece codes, white's pieces in signature order before black's.
+    """
+    white, black = signature.split("v")
+    return [WHITE | LETTER_RANKS[letter] for letter in white] + [
+        BLACK | LETTER_RANKS[letter] for letter in black
+    ]
+
+
+def table_size(signature):
+    """Number of indexes of a table, both sides to move included."""
+    pawns = "P" in signature
+    return 2 * len(KING_REGIONS[pawns]) * 64 ** (len(signature) - 2)
+
+
+def position_index(side, squares, pawns):
+    """Computes the index of a position in a table.
+
+    Args:
+        side: Color to move.
+        squares: List of square indexes row * 8 + col of the pieces in table_pieces order.
+        pawns: True if the table has pawns.
+
+    Returns:
+        Integer index.
+    """
+    transform = _KING_TRANSFORMS[pawns][squares[0]]
+    index = (side == BLACK) * len(KING_REGIONS[pawns]) + _KING_SLOTS[pawns][transform[squares[0]]]
+    for square in squares[1:]:
+        index = index * 64 + transform[square]
+    return index
+
+
+class Tablebase:
+    """Endgame tablebase of memory-mapped WDL and DTM files written by the generator.
+
+    Each table has a .wdl file of 2-bit win/draw/loss values and a .dtm file with the
+    distance to mate in plies, both for the side to move. A position with black as the
+    stronger side is looked up with colors swapped and the rows mirrored.
+
+    Attributes:
+        directory: Directory of the table files.
+        signatures: Set of material signatures with a table.
+        max_pieces: Largest number of pieces in a table, kings included.
+    """
+
+    def __init__(self, directory):
+        """Opens the tables of a directory.
+
+        Args:
+            directory: Directory with <signature>.wdl and <signature>.dtm files.
+        """
+        self.directory = directory
+        self._tables = {}
+        self.signatures = set()
+        if os.path.isdir(directory):
+            self.signatures = {
+                name[:-4]
+                for name in os.listdir(directory)
+                if name.endswith(".wdl")
+                and os.path.exists(os.path.join(directory, name[:-4] + ".dtm"))
+            }
+        self.max_pieces = max((len(signature) - 1 for signature in self.signatures), default=2)
+        # Positions with more material than the tables can hold are skipped cheaply by phase
+        self._max_phase = max(
+            (
+                sum(PHASE_WEIGHTS[LETTER_RANKS[letter]] for letter in signature if letter != "v")
+                for signature in self.signatures
+            ),
+            default=0,
+        )
+
+    def probe(self, board):
+        """Looks up a position.
+
+        Positions with castling rights that can still be used are not looked up, since
+        the tables do not contain castling.
+
+        Args:
+            board: Board object.
+
+        Returns:
+            (value, dtm) tuple for the side to move, where value is WIN, DRAW or LOSS and
+            dtm is the number of plies to mate, or None if the position is not in a table.
+        """
+        if board.phase > self._max_phase:
+            return None
+
+        pieces = []
+        for square, piece in enumerate(board.squares):
+            if piece:
+                pieces.append((piece, square))
+                if len(pieces) > self.max_pieces:
+                    return None
+
+        if board.castling_rights and _can_castle(board):
+            return None
+        if board.en_passant_target and {piece for piece, _ in pieces} >= {
+            WHITE | PAWN,
+            BLACK | PAWN,
+        }:
+            return None
+
+        return self.probe_pieces(pieces, board.side_to_move)
+
+    def probe_pieces(self, pieces, side):
+        """Looks up a position given as a list of pieces.
+
+        Args:
+            pieces: List of (piece, square) tuples, square being row * 8 + col.
+            side: Color to move.
+
+        Returns:
+            (value, dtm) tuple for the side to move, or None if there is no table.
+        """
+        signature = material_signature(
+            [piece & RANK_MASK for piece, _ in pieces if piece & COLOR_MASK == WHITE],
+            [piece & RANK_MASK for piece, _ in pieces if piece & COLOR_MASK == BLACK],
+        )
+        if signature in DRAWN_MATERIAL:
+            return DRAW, 0
+
+        if not is_canonical(signature):
+            # Swap the colors and mirror the rows, row 7 - row is square ^ 56
+            pieces = [(piece ^ COLOR_MASK, square ^ 56) for piece, square in pieces]
+            side = OPPONENT[side]
+            white, black = signature.split("v")
+            signature = f"{black}v{white}"
+
+        table = self._table(signature)
+        if table is None:
+            return None
+
+        squares = []
+        remaining = list(pieces)
+        for table_piece in table_pieces(signature):
+            for position, (piece, square) in enumerate(remaining):
+                if piece == table_piece:
+                    squares.append(square)
+                    del remaining[position]
+                    break
+
+        wdl, dtm = table
+        index = position_index(side, squares, "P" in signature)
+        value = wdl[index >> 2] >> ((index & 3) * 2) & 3
+        return (value, dtm[index]) if value else None
+
+    def close(self):
+        """Releases the memory maps."""
+        for table in self._tables.values():
+            if table:
+                for data in table:
+                    data.close()
+        self._tables = {}
+
+    def _table(self, signature):
+        if signature not in self._tables:
+            self._tables[signature] = None
+            if signature in self.signatures:
+                self._tables[signature] = tuple(
+                    self._open(os.path.join(self.directory, f"{signature}.{extension}"))
+                    for extension in ("wdl", "dtm")
+                )
+        return self._tables[signature]
+
+    @staticmethod
+    def _open(path):
+        with open(path, "rb") as table_file:
+            return mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _can_castle(board):
+    """Checks if a castling right is left with the king and rook on their squares."""
+    for right, (color, king_pos, rook_pos) in CASTLING_SQUARES.items():
+        if (
+            board.castling_rights & right
+            and board.get_piece(king_pos) == color | KING
+            and board.get_piece(rook_pos) == color | ROOK
+        ):
+            return True
+    return False
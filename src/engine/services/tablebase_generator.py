@@ -0,0 +1,371 @@
+import os
+from array import array
+from itertools import product
+from engine.entities.pieces import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK
+from engine.entities.pieces import COLOR_MASK, RANK_MASK
+from engine.entities.board import OPPONENT, PAWN_DIRECTIONS, PAWN_START_ROWS, PROMOTION_ROWS
+from engine.entities.attack_tables import KNIGHT_TARGETS, KING_TARGETS, PAWN_ATTACKS
+from engine.entities.attack_tables import BISHOP_RAYS, ROOK_RAYS
+from .tablebase import (
+    LOSS,
+    DRAW,
+    WIN,
+    DRAWN_MATERIAL,
+    KING_REGIONS,
+    Tablebase,
+    is_canonical,
+    table_pieces,
+    table_size,
+    position_index,
+)
+
+# Material generated by default. Four pieces are possible with the same generator, but
+# take hours and gigabytes of memory in pure Python.
+DEFAULT_SIGNATURES = ["KQvK", "KRvK", "KPvK"]
+
+
+_SLIDER_RAYS = {BISHOP: BISHOP_RAYS, ROOK: ROOK_RAYS}
+_STEP_SQUARES = {KNIGHT: KNIGHT_TARGETS, KING: KING_TARGETS}
+
+
+def _lines(rays):
+    """Maps (start, end) squares on a common ray to the squares between them."""
+    lines = {}
+    for start, square_rays in enumerate(rays):
+        for ray in square_rays:
+            for distance, end in enumerate(ray):
+                lines[(start, end)] = ray[:distance]
+    return lines
+
+
+_LINES = {BISHOP: _lines(BISHOP_RAYS), ROOK: _lines(ROOK_RAYS)}
+_SLIDER_LINES = {BISHOP: (_LINES[BISHOP],), ROOK: (_LINES[ROOK],)}
+_SLIDER_LINES[QUEEN] = (_LINES[BISHOP], _LINES[ROOK])
+
+
+def generate_tablebases(directory, signatures=None, report=print):
+    """Generates tables and the tables they depend on.
+
+    Tables reached by captures and promotions are generated first, tables that already
+    exist in the directory are kept.
+
+    Args:
+        directory: Directory to write the table files to.
+        signatures: List of material signatures, defaults to DEFAULT_SIGNATURES.
+        report: Function called with a line of progress text.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for signature in signatures or DEFAULT_SIGNATURES:
+        for dependency in _dependencies(signature):
+            if not os.path.exists(os.path.join(directory, f"{dependency}.dtm")):
+                generate_tablebase(dependency, directory, report)
+
+
+def _dependencies(signature):
+    """Lists the tables a table needs in the order to generate them, ending with itself."""
+    white, black = signature.split("v")
+    if not is_canonical(signature):
+        white, black = black, white
+
+    children = []
+    for side, other in ((white, black), (black, white)):
+        for position, letter in enumerate(side):
+            if letter == "K":
+                continue
+            rest = side[:position] + side[position + 1 :]
+            # A capture removes the piece, a promotion turns a pawn into a queen
+            children.append((rest, other))
+            if letter == "P":
+                children.append((rest + "Q", other))
+
+    order = []
+    for child_side, child_other in children:
+        child = f"{''.join(sorted(child_side, key='KQRBNP'.index))}v{child_other}"
+        if not is_canonical(child):
+            child_white, child_black = child.split("v")
+            child = f"{child_black}v{child_white}"
+        if child in DRAWN_MATERIAL:
+            continue
+        for dependency in _dependencies(child):
+            if dependency not in order:
+                order.append(dependency)
+    return order + [f"{white}v{black}"]
+
+
+def generate_tablebase(signature, directory, report=print):
+    """Solves all positions of a material by retrograde analysis and writes the table files.
+
+    Positions lost in n plies make their predecessors won in n + 1 plies, and positions
+    all of whose moves lead to positions won for the opponent are lost. Solving starts
+    from checkmates and from moves into the already generated tables of less material,
+    and positions left unsolved are draws.
+
+    Args:
+        signature: Material signature with white as the stronger side, e.g. "KQvK".
+        directory: Directory with the tables of less material, and for the new files.
+        report: Function called with a line of progress text.
+
+    Returns:
+        Number of legal positions in the table.
+    """
+    pieces = table_pieces(signature)
+    pawns = "P" in signature
+    solver = _RetrogradeSolver(table_size(signature))
+    subtables = Tablebase(directory)
+
+    for index, side, squares in _positions(pieces, pawns):
+        child_side = OPPONENT[side]
+        solver.legal[index] = 1
+        has_moves = False
+        for child_squares, captured, promoted in _legal_moves(pieces, squares, side):
+            has_moves = True
+            if captured is None and promoted is None:
+                solver.add_move(index, position_index(child_side, child_squares, pawns))
+                continue
+
+            child_pieces = [
+                (QUEEN | piece & COLOR_MASK if promoted == position else piece, square)
+                for position, (piece, square) in enumerate(zip(pieces, child_squares))
+                if position != captured
+            ]
+            solver.add_exit(index, *subtables.probe_pieces(child_pieces, child_side))
+
+        king_square = _king_square(pieces, squares, side)
+        checkmated = not has_moves and _is_attacked(pieces, squares, king_square, side)
+        solver.seed_loss(index, has_moves, checkmated)
+
+    subtables.close()
+    report(f"{signature}: {sum(solver.legal)} positions, {len(solver.edge_from)} moves")
+
+    wdl, dtm = solver.solve()
+    _write_table(directory, signature, wdl, dtm, solver.legal)
+    report(f"{signature}: longest mate {max(dtm)} plies")
+    return sum(solver.legal)
+
+
+class _RetrogradeSolver:
+    """Positions and moves of a table, solved backwards from its decided positions.
+
+    Positions lost in n plies make their predecessors won in n + 1 plies. A position is
+    lost once all its moves have been found to lead to won positions, so each position
+    counts down its remaining moves.
+
+    Attributes:
+        legal: Array of 1 for the indexes of legal positions.
+        edge_from: Array of the positions of the moves within the table.
+        edge_to: Array of the positions the moves lead to.
+    """
+
+    def __init__(self, size):
+        self.legal = array("B", [0]) * size
+        self.edge_from = array("I")
+        self.edge_to = array("I")
+        self._remaining = array("H", [0]) * size
+        self._exit_dtm = array("B", [0]) * size
+        self._escapes = array("B", [0]) * size
+        # Positions to decide, (index, value) lists by ply
+        self._buckets = {}
+
+    def add_move(self, index, child_index):
+        """Records a move within the table."""
+        self._remaining[index] += 1
+        self.edge_from.append(index)
+        self.edge_to.append(child_index)
+
+    def add_exit(self, index, value, dtm):
+        """Records a capture or promotion into another table with its result."""
+        if value == WIN:
+            self._exit_dtm[index] = max(self._exit_dtm[index], min(dtm, 254))
+            return
+        # Moves into lost or drawn positions of other tables keep this one from losing
+        self._escapes[index] = 1
+        if value == LOSS:
+            self._decide(dtm + 1, index, WIN)
+
+    def seed_loss(self, index, has_moves, checkmated):
+        """Decides a position without moves within the table after its moves are recorded."""
+        if self._remaining[index] or self._escapes[index]:
+            return
+        if checkmated:
+            self._decide(0, index, LOSS)
+        elif has_moves:
+            # Only moves into won positions of other tables
+            self._decide(self._exit_dtm[index] + 1, index, LOSS)
+
+    def solve(self):
+        """Walks backwards from the decided positions ply by ply.
+
+        Returns:
+            (wdl, dtm) arrays with a value and distance to mate for each index, where the
+            value is 0 for undecided positions.
+        """
+        predecessors, offsets = _predecessors(len(self.legal), self.edge_from, self.edge_to)
+        wdl = array("B", [0]) * len(self.legal)
+        dtm = array("B", [0]) * len(self.legal)
+        ply = 0
+        while self._buckets:
+            for index, value in self._buckets.pop(ply, []):
+                if wdl[index]:
+                    continue
+                wdl[index], dtm[index] = value, min(ply, 255)
+                for predecessor in predecessors[offsets[index] : offsets[index + 1]]:
+                    if not wdl[predecessor]:
+                        self._propagate(predecessor, value, ply)
+            ply += 1
+        return wdl, dtm
+
+    def _propagate(self, predecessor, value, ply):
+        if value == LOSS:
+            self._decide(ply + 1, predecessor, WIN)
+            return
+        self._remaining[predecessor] -= 1
+        if not self._remaining[predecessor] and not self._escapes[predecessor]:
+            self._decide(max(ply, self._exit_dtm[predecessor]) + 1, predecessor, LOSS)
+
+    def _decide(self, ply, index, value):
+        self._buckets.setdefault(ply, []).append((index, value))
+
+
+def _positions(pieces, pawns):
+    """Yields (index, side, squares) of the legal positions of a table."""
+    for side in (WHITE, BLACK):
+        for king_square in KING_REGIONS[pawns]:
+            for other_squares in product(range(64), repeat=len(pieces) - 1):
+                squares = (king_square,) + other_squares
+                if _is_legal_position(pieces, squares, side):
+                    yield position_index(side, squares, pawns), side, squares
+
+
+def _is_legal_position(pieces, squares, side):
+    if len(set(squares)) != len(squares):
+        return False
+    for piece, square in zip(pieces, squares):
+        if piece & RANK_MASK == PAWN and square // 8 in (0, 7):
+            return False
+    # The side that just moved cannot be in check
+    other_side = OPPONENT[side]
+    return not _is_attacked(pieces, squares, _king_square(pieces, squares, other_side), other_side)
+
+
+def _king_square(pieces, squares, color):
+    return squares[pieces.index(color | KING)]
+
+
+def _is_attacked(pieces, squares, target, color, captured=None):
+    """Checks if the pieces of the opponent of color attack a square.
+
+    Args:
+        pieces: List of piece codes in table order.
+        squares: Squares of the pieces.
+        target: Square to check.
+        color: Color of the side whose square it is.
+        captured: Index of a captured piece, which no longer attacks or blocks.
+    """
+    occupied = {square for position, square in enumerate(squares) if position != captured}
+    for position, (piece, square) in enumerate(zip(pieces, squares)):
+        if position == captured or piece & COLOR_MASK == color:
+            continue
+        rank = piece & RANK_MASK
+        if rank == PAWN:
+            if target in PAWN_ATTACKS[piece & COLOR_MASK][square]:
+                return True
+        elif rank in _STEP_SQUARES:
+            if target in _STEP_SQUARES[rank][square]:
+                return True
+        else:
+            for lines in _SLIDER_LINES[rank]:
+                between = lines.get((square, target))
+                if between is not None and occupied.isdisjoint(between):
+                    return True
+    return False
+
+
+def _legal_moves(pieces, squares, side):
+    """Yields (squares, captured, promoted) for the legal moves of a position.
+
+    captured is the index of the captured piece and promoted the index of a pawn that
+    becomes a queen, both None if not applicable. Castling and en passant do not occur in
+    the tables.
+    """
+    owners = {square: position for position, square in enumerate(squares)}
+    king = pieces.index(side | KING)
+
+    for position, (piece, square) in enumerate(zip(pieces, squares)):
+        if piece & COLOR_MASK != side:
+            continue
+        for target in _targets(piece, square, owners, pieces):
+            captured = owners.get(target)
+            if captured is not None and pieces[captured] & COLOR_MASK == side:
+                continue
+
+            child_squares = list(squares)
+            child_squares[position] = target
+            if _is_attacked(pieces, child_squares, child_squares[king], side, captured):
+                continue
+
+            promoted = None
+            if piece & RANK_MASK == PAWN and target // 8 == PROMOTION_ROWS[side]:
+                promoted = position
+            yield child_squares, captured, promoted
+
+
+def _targets(piece, square, owners, pieces):
+    """Lists the squares a piece can move to, own pieces included."""
+    rank = piece & RANK_MASK
+    if rank in _STEP_SQUARES:
+        return _STEP_SQUARES[rank][square]
+
+    if rank == PAWN:
+        color = piece & COLOR_MASK
+        targets = [
+            target
+            for target in PAWN_ATTACKS[color][square]
+            if target in owners and pieces[owners[target]] & COLOR_MASK != color
+        ]
+        forward = square + 8 * PAWN_DIRECTIONS[color]
+        if forward not in owners:
+            targets.append(forward)
+            double_step = forward + 8 * PAWN_DIRECTIONS[color]
+            if square // 8 == PAWN_START_ROWS[color] and double_step not in owners:
+                targets.append(double_step)
+        return targets
+
+    targets = []
+    for ray_rank in (BISHOP, ROOK):
+        if rank not in (ray_rank, QUEEN):
+            continue
+        for ray in _SLIDER_RAYS[ray_rank][square]:
+            for target in ray:
+                targets.append(target)
+                if target in owners:
+                    break
+    return targets
+
+
+def _predecessors(size, edge_from, edge_to):
+    """Inverts the moves into a flat predecessor array, with offsets per position."""
+    offsets = array("I", [0]) * (size + 1)
+    for index in edge_to:
+        offsets[index + 1] += 1
+    for index in range(size):
+        offsets[index + 1] += offsets[index]
+
+    predecessors = array("I", [0]) * len(edge_from)
+    fill = array("I", offsets)
+    for start, end in zip(edge_from, edge_to):
+        predecessors[fill[end]] = start
+        fill[end] += 1
+    return predecessors, offsets
+
+
+def _write_table(directory, signature, wdl, dtm_table, legal):
+    """Writes the values packed 2 bits per position, and the distances to mate."""
+    packed = array("B", [0]) * ((len(wdl) + 3) // 4)
+    for index, is_legal in enumerate(legal):
+        if is_legal:
+            packed[index >> 2] |= (wdl[index] or DRAW) << ((index & 3) * 2)
+
+    with open(os.path.join(directory, f"{signature}.wdl"), "wb") as wdl_file:
+        wdl_file.write(packed.tobytes())
+    with open(os.path.join(directory, f"{signature}.dtm"), "wb") as dtm_file:
+        dtm_file.write(dtm_table.tobytes())
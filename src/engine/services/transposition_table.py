@@ -0,0 +1,182 @@
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# An entry is two 64-bit words: the position key XOR the packed data below, and the data.
+# Storing the key XOR the data lets processes sharing the table write without locks, since
+# an entry torn by a concurrent write no longer matches the key of either position.
+_SCORE_OFFSET = 1 << 31
+_DEPTH_SHIFT = 32
+_BOUND_SHIFT = 40
+_MOVE_SHIFT = 42
+_MOVE_MASK = 0x3FFF
+_GENERATION_SHIFT = 56
+
+_ENTRY_BYTES = 16
+_BUCKET_SLOTS = 2
+
+
+class TranspositionTable:
+    """Fixed-size transposition table of packed entries in a preallocated array.
+
+    Each bucket has a depth-preferred slot and an always-replace slot. Depth-preferred
+    slots are only overwritten by deeper searches of the current generation, or by any
+    search once the entry is from an older generation.
+
+    A shared table keeps its entries in shared memory, which other processes can open
+    by name with TranspositionTable.attach.
+
+    Attributes:
+        name: Name of the shared memory block, or None if the table is not shared.
+        size_bytes: Memory used by the entries.
+        hits: Number of probes that found the position.
+        misses: Number of probes that did not find the position.
+        collisions: Number of misses where the bucket was occupied by other positions.
+    """
+
+    def __init__(self, size_mb=16, shared=False, name=None):
+        """Preallocates the table.
+
+        Args:
+            size_mb: Upper limit for the table size in megabytes.
+            shared: If True, allocate the entries in shared memory.
+            name: Name of an existing shared table to open instead, used by attach.
+        """
+        bucket_count = 1
+        while bucket_count * 2 * _BUCKET_SLOTS * _ENTRY_BYTES <= size_mb * 1024 * 1024:
+            bucket_count *= 2
+
+        self._bucket_mask = bucket_count - 1
+        self._generation = 0
+        self.size_bytes = bucket_count * _BUCKET_SLOTS * _ENTRY_BYTES
+        self.hits = self.misses = self.collisions = 0
+
+        self._memory = None
+        self._owns_memory = shared and name is None
+        self.name = name
+        if name is not None:
+            self._memory = SharedMemory(name)
+        elif shared:
+            # Fresh shared memory is zero-filled, which is an empty table
+            self._memory = SharedMemory(create=True, size=self.size_bytes)
+            self.name = self._memory.name
+
+        if self._memory:
+            self._table = self._memory.buf[: self.size_bytes].cast("Q")
+        else:
+            self._table = array("Q", [0]) * (bucket_count * _BUCKET_SLOTS * 2)
+
+    @classmethod
+    def attach(cls, name, size_mb):
+        """Opens a shared table created by another process.
+
+        Args:
+            name: Name attribute of the shared table.
+            size_mb: The size_mb the shared table was created with.
+
+        Returns:
+            TranspositionTable object using the same entries.
+        """
+        return cls(size_mb, name=name)
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def new_search(self, generation=None):
+        """Ages the entries stored so far, so new searches may replace them.
+
+        Args:
+            generation: Optional generation to continue from instead of the next one,
+                so processes sharing the table age the entries together.
+        """
+        if generation is None:
+            generation = self._generation + 1
+        self._generation = generation & 0xFF
+
+    def clear(self):
+        """Removes all entries and resets the counters."""
+        self._table[:] = array("Q", [0]) * len(self._table)
+        self._generation = 0
+        self.hits = self.misses = self.collisions = 0
+
+    def close(self):
+        """Releases the shared memory, freeing it if this table created it."""
+        if not self._memory:
+            return
+        self._table.release()
+        self._memory.close()
+        if self._owns_memory:
+            self._memory.unlink()
+        self._memory = None
+
+    def probe(self, key):
+        """Looks up a position.
+
+        Args:
+            key: 64-bit Zobrist key of the position.
+
+        Returns:
+            None or (score, depth, bound, best_move) tuple, where best_move may be None.
+        """
+        table = self._table
+        index = (key & self._bucket_mask) * _BUCKET_SLOTS * 2
+
+        for slot in range(index, index + _BUCKET_SLOTS * 2, 2):
+            data = table[slot + 1]
+            if table[slot] ^ data == key:
+                self.hits += 1
+                return _unpack(data)
+
+        self.misses += 1
+        if table[index] or table[index + 2]:
+            self.collisions += 1
+        return None
+
+    def store(self, key, score, depth, bound, best_move):
+        """Stores a search result.
+
+        Args:
+            key: 64-bit Zobrist key of the position.
+            score: Integer score of the position.
+            depth: Integer search depth the score was found with.
+            bound: EXACT, LOWER_BOUND or UPPER_BOUND.
+            best_move: None or integer move, see engine.entities.move.
+        """
+        table = self._table
+        index = (key & self._bucket_mask) * _BUCKET_SLOTS * 2
+
+        stored_data = table[index + 1]
+        stored_depth = (stored_data >> _DEPTH_SHIFT) & 0xFF
+        stored_generation = stored_data >> _GENERATION_SHIFT
+
+        if not (
+            table[index] ^ stored_data == key
+            or depth >= stored_depth
+            or stored_generation != self._generation
+            or not table[index]
+        ):
+            # Always-replace slot
+            index += 2
+
+        data = (
+            (score + _SCORE_OFFSET)
+            | depth << _DEPTH_SHIFT
+            | bound << _BOUND_SHIFT
+            | (best_move or 0) << _MOVE_SHIFT
+            | self._generation << _GENERATION_SHIFT
+        )
+        table[index] = key ^ data
+        table[index + 1] = data
+
+
+def _unpack(data):
+    score = (data & 0xFFFFFFFF) - _SCORE_OFFSET
+    depth = (data >> _DEPTH_SHIFT) & 0xFF
+    bound = (data >> _BOUND_SHIFT) & 0x3
+    # 0 stands for no move, since a move never ends on its start square
+    best_move = (data >> _MOVE_SHIFT) & _MOVE_MASK or None
+    return score, depth, bound, best_move
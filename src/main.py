@@ -5,15 +5,28 @@ from persistence.repositories.user_repository import UserRepository
 from engine.entities.board import Board
 from engine.services.game_service import GameService
 from engine.services.ai_engine import AIEngine
+from engine.services.opening_book import OpeningBook
+from engine.services.tablebase import Tablebase
 from ui.game_window import GameWindow
 from ui.main_menu import MainMenu
 
+# Helper processes for the parallel search on the hardest difficulty, next to the main search
+SEARCH_WORKERS = max(min(os.cpu_count() or 1, 8) - 2, 0)
+
+# Built from assets/openings.pgn with "invoke build-book"
+OPENING_BOOK_PATH = "assets/opening_book.bin"
+
+# Generated with "invoke build-tablebases"
+TABLEBASE_DIRECTORY = "assets/tablebases"
+
 
 def main():
     platform_init()
 
     running = True
     user = None
+    opening_book = OpeningBook(OPENING_BOOK_PATH) if os.path.exists(OPENING_BOOK_PATH) else None
+    tablebase = Tablebase(TABLEBASE_DIRECTORY)
     while running:
         menu = MainMenu(user, UserRepository(), GameRepository())
         config = menu.run()
@@ -23,16 +36,31 @@ def main():
 
         if config["mode"] == "pvp":
             ai_engine = None
-            board = Board("white")
+            player_color = "white"
+            ponder = False
         else:
-            board = Board(config["player_color"])
-            ai_engine = AIEngine(config["difficulty"])
+            workers = SEARCH_WORKERS if config["difficulty"] == 3 else 0
+            # The easiest difficulty keeps searching its own, weaker openings and endgames
+            strong = config["difficulty"] > 1
+            ai_engine = AIEngine(
+                config["difficulty"],
+                workers=workers,
+                opening_book=opening_book if strong else None,
+                tablebase=tablebase if strong else None,
+            )
+            player_color = config["player_color"]
+            # The hardest difficulty also searches on the player's time
+            ponder = config["difficulty"] == 3
 
         user = config["user"]
-        game_service = GameService(board, ai_engine, user, GameRepository())
+        game_service = GameService(
+            Board(), ai_engine, user, GameRepository(), player_color, ponder=ponder
+        )
         game_window = GameWindow(game_service)
 
         continue_running = game_window.run()
+        if ai_engine:
+            ai_engine.close()
         if not continue_running:
             running = False
 
@@ -0,0 +1,35 @@
+import argparse
+import sys
+import time
+from engine.entities.board import Board
+from engine.entities.move import move_name
+from engine.services.perft import perft, divide, run_suite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move generator node counts and speed.")
+    parser.add_argument("--depth", type=int, default=3, help="search depth, default 3")
+    parser.add_argument("--fen", help="position to count instead of the standard suite")
+    parser.add_argument("--divide", action="store_true", help="show node counts per move")
+    args = parser.parse_args()
+
+    if args.fen is None:
+        sys.exit(0 if run_suite(args.depth) else 1)
+
+    board = Board.from_fen(args.fen)
+    start_time = time.perf_counter()
+
+    if args.divide:
+        counts = divide(board, args.depth)
+        for move, nodes in counts.items():
+            print(f"{move_name(move)}: {nodes}")
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, args.depth, legal_generator=True)
+
+    elapsed_time = time.perf_counter() - start_time
+    print(f"{nodes} nodes, {elapsed_time:.2f} s, {nodes / max(elapsed_time, 1e-9):.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
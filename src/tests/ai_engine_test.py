@@ -1,14 +1,19 @@
 # pylint: skip-file
 
+import time
 import unittest
 from engine.entities.board import Board
-from engine.services.ai_engine import AIEngine
+from engine.entities.pieces import EMPTY, PAWN, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK
+from engine.entities.move import PROMOTION, EN_PASSANT, CASTLING, encode_move
+from engine.services.ai_engine import AIEngine, _is_active
+from engine.services.transposition_table import EXACT
 from engine.services.game_service import GameService
+from engine.services.core import generate_moves, generate_legal_moves
 
 
 class TestAiEngine(unittest.TestCase):
     def setUp(self):
-        self.board = Board("white")
+        self.board = Board()
         self.game_service = GameService(self.board)
 
     def test_get_best_move_returns_valid_move(self):
@@ -19,7 +24,7 @@ class TestAiEngine(unittest.TestCase):
     def test_ai_executes_mate_in_two(self):
         for row in range(8):
             for col in range(8):
-                self.game_service.board.set_piece((row, col), None)
+                self.game_service.board.set_piece((row, col), EMPTY)
 
         # Position with checkmate by white in two moves
         # If mate in two is not taken, white will lose in one move
@@ -33,73 +38,69 @@ class TestAiEngine(unittest.TestCase):
         #    -- wP bQ -- -- -- -- --
         #    -- -- -- -- -- -- -- wK
 
-        self.game_service.board.set_piece((1, 7), ("black", "king", True))
-        self.game_service.board.set_piece((5, 2), ("black", "queen", False))
-        self.game_service.board.set_piece((6, 2), ("black", "queen", False))
-        self.game_service.board.set_piece((1, 6), ("black", "pawn", False))
-        self.game_service.board.set_piece((2, 7), ("black", "pawn", False))
+        self.game_service.board.set_piece((1, 7), BLACK | KING)
+        self.game_service.board.set_piece((5, 2), BLACK | QUEEN)
+        self.game_service.board.set_piece((6, 2), BLACK | QUEEN)
+        self.game_service.board.set_piece((1, 6), BLACK | PAWN)
+        self.game_service.board.set_piece((2, 7), BLACK | PAWN)
 
-        self.game_service.board.set_piece((7, 7), ("white", "king", True))
-        self.game_service.board.set_piece((3, 7), ("white", "bishop", False))
-        self.game_service.board.set_piece((1, 3), ("white", "pawn", False))
-        self.game_service.board.set_piece((3, 5), ("white", "pawn", False))
-        self.game_service.board.set_piece((6, 1), ("white", "pawn", False))
+        self.game_service.board.set_piece((7, 7), WHITE | KING)
+        self.game_service.board.set_piece((3, 7), WHITE | BISHOP)
+        self.game_service.board.set_piece((1, 3), WHITE | PAWN)
+        self.game_service.board.set_piece((3, 5), WHITE | PAWN)
+        self.game_service.board.set_piece((6, 1), WHITE | PAWN)
 
-        self.game_service.board.king_positions = {"white": (7, 7), "black": (6, 0)}
+        self.game_service.board.king_positions = {WHITE: (7, 7), BLACK: (1, 7)}
 
         ai_engine = AIEngine(difficulty=2)
 
         # White should move bishop to check black
         ai_move = ai_engine.get_best_move(self.game_service.board)
         self.assertTrue(self.game_service.move_handler(ai_move))
-        self.assertEqual(
-            self.game_service.board.get_piece((5, 1)), ("white", "bishop", False)
-        )
+        self.assertEqual(self.game_service.board.get_piece((2, 6)), WHITE | BISHOP)
 
         # Black moves king away from check
-        self.assertTrue(self.game_service.move_handler(((6, 0), (7, 1))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 7), (0, 6))))
 
         # White should checkmate through promotion
         ai_move2 = ai_engine.get_best_move(self.game_service.board)
         self.assertTrue(self.game_service.move_handler(ai_move2))
-        self.assertEqual(
-            self.game_service.board.get_piece((0, 3)), ("white", "queen", False)
-        )
+        self.assertEqual(self.game_service.board.get_piece((0, 3)), WHITE | QUEEN)
 
     def test_quiescence_search_prevents_bad_trade(self):
         for row in range(8):
             for col in range(8):
-                self.game_service.board.set_piece((row, col), None)
+                self.game_service.board.set_piece((row, col), EMPTY)
 
         #    -- -- -- -- -- -- -- --
         #    -- -- -- -- -- -- -- --
         #    -- -- -- -- -- -- -- --
         #    -- -- -- wQ -- -- -- --
-        #    -- -- -- -- -- -- -- wK
+        #    -- -- bP -- -- -- -- wK
         #    -- -- -- bR -- -- -- --
-        #    -- -- bP -- -- -- -- --
+        #    -- -- -- -- -- -- -- --
         #    -- -- -- -- -- bK -- --
 
-        self.game_service.board.set_piece((4, 7), ("white", "king", True))
-        self.game_service.board.set_piece((3, 3), ("white", "queen", False))
+        self.game_service.board.set_piece((4, 7), WHITE | KING)
+        self.game_service.board.set_piece((3, 3), WHITE | QUEEN)
 
-        self.game_service.board.set_piece((7, 5), ("black", "king", True))
-        self.game_service.board.set_piece((5, 3), ("black", "rook", True))
-        self.game_service.board.set_piece((6, 2), ("black", "pawn", False))
+        self.game_service.board.set_piece((7, 5), BLACK | KING)
+        self.game_service.board.set_piece((5, 3), BLACK | ROOK)
+        self.game_service.board.set_piece((4, 2), BLACK | PAWN)
 
-        self.game_service.board.king_positions = {"white": (4, 4), "black": (7, 5)}
+        self.game_service.board.king_positions = {WHITE: (4, 7), BLACK: (7, 5)}
 
         # AI with very shallow depth should avoid the rook capture
         # because quiescence search will reveal it leads to losing the queen
         ai_engine = AIEngine(difficulty=1)
         ai_move = ai_engine.get_best_move(self.game_service.board)
 
-        self.assertNotEqual(ai_move, ((3, 3), (5, 3)))
+        self.assertNotEqual(ai_move, encode_move((3, 3), (5, 3)))
 
     def test_ai_executes_castle(self):
         for row in range(8):
             for col in range(8):
-                self.game_service.board.set_piece((row, col), None)
+                self.game_service.board.set_piece((row, col), EMPTY)
 
         #    -- -- -- -- -- -- bK --
         #    -- -- -- -- -- -- -- --
@@ -110,23 +111,275 @@ class TestAiEngine(unittest.TestCase):
         #    bQ -- -- wP wP wP wP --
         #    -- -- -- -- wK -- -- wR
 
-        self.game_service.board.set_piece((7, 4), ("white", "king", False))
-        self.game_service.board.set_piece((7, 7), ("white", "rook", False))
-        self.game_service.board.set_piece((6, 6), ("white", "pawn", False))
-        self.game_service.board.set_piece((6, 5), ("white", "pawn", False))
-        self.game_service.board.set_piece((6, 4), ("white", "pawn", False))
-        self.game_service.board.set_piece((6, 3), ("white", "pawn", False))
-        self.game_service.board.set_piece((5, 5), ("white", "pawn", False))
-        self.game_service.board.set_piece((5, 4), ("white", "pawn", False))
-        self.game_service.board.set_piece((5, 3), ("white", "pawn", False))
+        self.game_service.board.set_piece((7, 4), WHITE | KING)
+        self.game_service.board.set_piece((7, 7), WHITE | ROOK)
+        self.game_service.board.set_piece((6, 6), WHITE | PAWN)
+        self.game_service.board.set_piece((6, 5), WHITE | PAWN)
+        self.game_service.board.set_piece((6, 4), WHITE | PAWN)
+        self.game_service.board.set_piece((6, 3), WHITE | PAWN)
+        self.game_service.board.set_piece((5, 5), WHITE | PAWN)
+        self.game_service.board.set_piece((5, 4), WHITE | PAWN)
+        self.game_service.board.set_piece((5, 3), WHITE | PAWN)
 
-        self.game_service.board.set_piece((0, 6), ("black", "king", True))
-        self.game_service.board.set_piece((6, 0), ("black", "queen", False))
+        self.game_service.board.set_piece((0, 6), BLACK | KING)
+        self.game_service.board.set_piece((6, 0), BLACK | QUEEN)
 
-        self.game_service.board.king_positions = {"white": (7, 4), "black": (0, 6)}
+        self.game_service.board.king_positions = {WHITE: (7, 4), BLACK: (0, 6)}
 
         # AI should castle kingside to prevent checkmate in one from black queen
         ai_engine = AIEngine(difficulty=2)
         ai_move = ai_engine.get_best_move(self.game_service.board)
 
-        self.assertEqual(ai_move, ((7, 4), (7, 6)))
+        self.assertEqual(ai_move, encode_move((7, 4), (7, 6), CASTLING))
+
+    def test_search_stats_are_reported(self):
+        reported_stats = []
+        ai_engine = AIEngine(difficulty=2, stats_callback=reported_stats.append)
+        ai_engine.get_best_move(self.board)
+
+        stats = ai_engine.last_search_stats
+        self.assertEqual(reported_stats, [stats])
+        self.assertGreaterEqual(stats.depth, 2)
+        self.assertEqual(
+            [iteration.depth for iteration in stats.iterations], list(range(1, stats.depth + 1))
+        )
+        # An unfinished last iteration is not recorded
+        iteration_nodes = sum(iteration.nodes for iteration in stats.iterations)
+        self.assertLessEqual(iteration_nodes, stats.total_nodes)
+        self.assertGreater(stats.nodes, 20)
+        self.assertGreaterEqual(stats.tt_probes, stats.tt_hits)
+        self.assertGreaterEqual(stats.beta_cutoffs, stats.first_move_cutoffs)
+        self.assertTrue(0 <= stats.first_move_cutoff_rate <= 1)
+
+    def test_search_stats_are_reset_per_search(self):
+        ai_engine = AIEngine(difficulty=1)
+        ai_engine.get_best_move(self.board)
+        first_stats = ai_engine.last_search_stats
+        ai_engine.get_best_move(self.board)
+
+        self.assertIsNot(ai_engine.last_search_stats, first_stats)
+        self.assertEqual(ai_engine.last_search_stats.nodes, first_stats.nodes)
+
+    def test_ai_moves_first_in_background_as_white(self):
+        game_service = GameService(Board(), AIEngine(difficulty=1), player_color="black")
+        game_service.wait_for_ai_move()
+
+        self.assertFalse(game_service.is_ai_thinking())
+        self.assertEqual(game_service.board.side_to_move, BLACK)
+
+    def test_async_ai_move_is_applied_when_polled(self):
+        game_service = GameService(Board(), AIEngine(difficulty=1))
+
+        new_board = game_service.move_handler(encode_move((6, 4), (4, 4)), wait_for_ai=False)
+
+        self.assertEqual(new_board.get_piece((4, 4)), WHITE | PAWN)
+        self.assertFalse(game_service.move_handler(encode_move((6, 3), (4, 3)), wait_for_ai=False))
+        while not game_service.poll_ai_move():
+            time.sleep(0.01)
+        self.assertFalse(game_service.is_ai_thinking())
+        self.assertEqual(game_service.board.side_to_move, WHITE)
+
+    def test_cancel_ai_move_stops_search(self):
+        ai_engine = AIEngine(difficulty=3)
+        ai_engine.depth = 20
+        game_service = GameService(Board(), ai_engine)
+        game_service.move_handler(encode_move((6, 4), (4, 4)), wait_for_ai=False)
+
+        start_time = time.time()
+        game_service.cancel_ai_move()
+
+        self.assertLess(time.time() - start_time, 1)
+        self.assertFalse(game_service.is_ai_thinking())
+        self.assertFalse(game_service.poll_ai_move())
+        self.assertEqual(game_service.board.side_to_move, BLACK)
+
+    def test_principal_variation_is_legal_line(self):
+        ai_engine = AIEngine(difficulty=1)
+        ai_engine.depth = 4
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+
+        ai_move = ai_engine.get_best_move(board)
+        pv = ai_engine.last_search_stats.pv
+
+        self.assertEqual(pv[0], ai_move)
+        self.assertEqual(len(pv), 4)
+        for move in pv:
+            self.assertIn(move, generate_legal_moves(board))
+            board.make_move(move)
+
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        board.make_move(ai_move)
+        self.assertEqual(ai_engine.expected_reply(board), pv[1])
+
+    def test_early_return_stops_following_pv(self):
+        ai_engine = AIEngine(difficulty=1)
+        board = Board()
+        ai_engine._transposition_table.store(board.zobrist_key, 25, 3, EXACT, None)
+        ai_engine._pv = [encode_move((6, 4), (4, 4))]
+        ai_engine._follow_pv = True
+
+        score = ai_engine._negamax(board, 2, -ai_engine.INFINITY, ai_engine.INFINITY, 0)
+
+        self.assertEqual(score, 25)
+        self.assertFalse(ai_engine._follow_pv)
+
+    def test_quiet_cutoffs_order_later_searches(self):
+        ai_engine = AIEngine(difficulty=1)
+        ai_engine.depth = 3
+        board = Board.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        ai_engine.get_best_move(board)
+
+        killers = [killer for killers in ai_engine._killers for killer in killers if killer]
+        self.assertTrue(killers)
+        self.assertGreater(max(ai_engine._history), 0)
+
+        board.make_move(encode_move((6, 3), (4, 3)))
+        moves = list(ai_engine._pick_moves(board, [], 1))
+        self.assertCountEqual(moves, generate_moves(board))
+        active_count = sum(_is_active(board, move) for move in moves)
+        self.assertTrue(all(_is_active(board, move) for move in moves[:active_count]))
+        quiet_moves = moves[active_count:]
+        self.assertEqual(
+            quiet_moves,
+            sorted(quiet_moves, key=lambda move: move in ai_engine._killers[1], reverse=True),
+        )
+
+    def test_move_picker_stages(self):
+        ai_engine = AIEngine(difficulty=1)
+        # The pawn on b5 can be taken safely, the one on d5 is defended
+        board = Board.from_fen("4k3/8/4p3/1p1p4/8/2N2Q2/8/4K3 w - - 0 1")
+        hash_move = encode_move((7, 4), (7, 3))
+        killer = encode_move((5, 2), (4, 0))
+        ai_engine._killers[1] = [killer, encode_move((1, 1), (0, 1))]
+
+        moves = ai_engine._pick_moves(board, [hash_move], 1)
+
+        self.assertEqual(next(moves), hash_move)
+        self.assertEqual(next(moves), encode_move((5, 2), (3, 1)))
+        self.assertEqual(next(moves), killer)
+        rest = list(moves)
+        self.assertEqual(rest[-2:], [encode_move((5, 2), (3, 3)), encode_move((5, 5), (3, 3))])
+        self.assertNotIn(hash_move, rest)
+        self.assertNotIn(killer, rest)
+
+    def test_finds_mate_and_stalemate_without_move_lists(self):
+        ai_engine = AIEngine(difficulty=1)
+        mated = Board.from_fen("R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1")
+        stalemated = Board.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+
+        for depth in (0, 2):
+            self.assertEqual(
+                ai_engine._negamax(mated, depth, -ai_engine.INFINITY, ai_engine.INFINITY, 1),
+                -ai_engine.CHECKMATE_SCORE + depth,
+            )
+            self.assertEqual(
+                ai_engine._negamax(stalemated, depth, -ai_engine.INFINITY, ai_engine.INFINITY, 1),
+                0,
+            )
+
+    def test_active_moves(self):
+        board = Board.from_fen("4k3/1P6/8/3pP3/8/8/8/4K2R w K d6 0 1")
+
+        self.assertTrue(_is_active(board, encode_move((3, 4), (2, 3), EN_PASSANT)))
+        self.assertTrue(_is_active(board, encode_move((1, 1), (0, 1), PROMOTION)))
+        self.assertFalse(_is_active(board, encode_move((3, 4), (2, 4))))
+        self.assertFalse(_is_active(board, encode_move((7, 4), (7, 6), CASTLING)))
+
+    def test_selective_search_can_be_switched_off(self):
+        fen = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+        stats = {}
+        for selective in (True, False):
+            ai_engine = AIEngine(
+                difficulty=1, null_move_pruning=selective, late_move_reductions=selective
+            )
+            ai_engine.depth = 5
+            ai_engine.get_best_move(Board.from_fen(fen))
+            stats[selective] = ai_engine.last_search_stats
+
+        self.assertGreater(stats[True].reduced_moves, stats[True].reduction_re_searches)
+        self.assertEqual((stats[False].null_moves, stats[False].reduced_moves), (0, 0))
+        self.assertLess(stats[True].nodes, stats[False].nodes)
+
+    def test_aspiration_window_widens_when_score_falls_outside(self):
+        ai_engine = AIEngine(difficulty=1)
+        ai_engine._current_depth = 2
+        moves = generate_legal_moves(self.board)
+        full_window = ai_engine._search_root(
+            self.board, moves, -ai_engine.INFINITY, ai_engine.INFINITY
+        )
+
+        for wrong_score in (full_window[0] + 1000, full_window[0] - 1000):
+            score, move, _ = ai_engine._aspiration_search(self.board, moves, wrong_score)
+            self.assertEqual((score, move), full_window[:2])
+        self.assertGreaterEqual(ai_engine._stats.aspiration_re_searches, 2)
+
+    def test_null_move_cutoff(self):
+        ai_engine = AIEngine(difficulty=1)
+        # White is a queen up
+        board = Board.from_fen("r1b1kbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 4")
+
+        self.assertTrue(ai_engine._null_move_fails_high(board, 3, 0, 1))
+        self.assertEqual(ai_engine._stats.null_move_cutoffs, 1)
+        self.assertEqual(
+            board.to_fen(), "r1b1kbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 0 4"
+        )
+
+    def test_no_null_move_with_only_pawns(self):
+        ai_engine = AIEngine(difficulty=1)
+        board = Board.from_fen("8/2k5/3p4/p2P1p2/P2P1P2/8/3K4/8 w - - 0 1")
+
+        self.assertFalse(ai_engine._null_move_fails_high(board, 4, -ai_engine.INFINITY, 1))
+        self.assertEqual(ai_engine._stats.null_moves, 0)
+
+    def test_ponder_hit_keeps_search(self):
+        ai_engine = AIEngine(difficulty=2)
+        game_service = GameService(Board(), ai_engine, ponder=True)
+        game_service.move_handler(encode_move((6, 4), (4, 4)))
+
+        self.assertTrue(game_service.is_pondering())
+        expected_reply = ai_engine.expected_reply(game_service.board)
+        game_service.move_handler(expected_reply)
+
+        self.assertTrue(ai_engine.last_search_stats.pondered)
+        self.assertEqual(game_service.board.side_to_move, WHITE)
+        game_service.cancel_ai_move()
+        self.assertFalse(game_service.is_pondering())
+
+    def test_ponder_miss_searches_again(self):
+        ai_engine = AIEngine(difficulty=2)
+        game_service = GameService(Board(), ai_engine, ponder=True)
+        game_service.move_handler(encode_move((6, 4), (4, 4)))
+
+        expected_reply = ai_engine.expected_reply(game_service.board)
+        other_move = next(
+            move for move in generate_legal_moves(game_service.board) if move != expected_reply
+        )
+        game_service.move_handler(other_move)
+
+        self.assertFalse(ai_engine.last_search_stats.pondered)
+        self.assertEqual(game_service.board.side_to_move, WHITE)
+        game_service.cancel_ai_move()
+
+    def test_parallel_search_with_helper_processes(self):
+        ai_engine = AIEngine(difficulty=2, workers=1)
+        try:
+            ai_move = ai_engine.get_best_move(self.board)
+        finally:
+            ai_engine.close()
+
+        self.assertTrue(self.game_service.move_handler(ai_move))
+        self.assertGreater(ai_engine.last_search_stats.helper_nodes, 0)
+
+    def test_helper_processes_ponder_along(self):
+        ai_engine = AIEngine(difficulty=2, workers=1)
+        game_service = GameService(Board(), ai_engine, ponder=True)
+        try:
+            game_service.move_handler(encode_move((6, 4), (4, 4)))
+            game_service.move_handler(ai_engine.expected_reply(game_service.board))
+            stats = ai_engine.last_search_stats
+        finally:
+            game_service.cancel_ai_move()
+            ai_engine.close()
+
+        self.assertTrue(stats.pondered)
+        self.assertGreater(stats.helper_nodes, 0)
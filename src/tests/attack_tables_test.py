@@ -0,0 +1,43 @@
+# pylint: skip-file
+
+import unittest
+from engine.entities.board import Board
+from engine.entities.pieces import EMPTY, KNIGHT, WHITE, BLACK
+from engine.services.core import is_square_attacked
+from engine.entities.attack_tables import (
+    KNIGHT_TARGETS,
+    KING_TARGETS,
+    PAWN_ATTACKS,
+    ROOK_RAYS,
+    SLIDER_RAYS,
+)
+
+
+class TestAttackTables(unittest.TestCase):
+    def test_target_counts(self):
+        self.assertEqual(set(KNIGHT_TARGETS[0]), {1 * 8 + 2, 2 * 8 + 1})
+        self.assertEqual(len(KNIGHT_TARGETS[4 * 8 + 4]), 8)
+        self.assertEqual(len(KING_TARGETS[63]), 3)
+        self.assertEqual(len(KING_TARGETS[3 * 8 + 3]), 8)
+
+    def test_pawn_attacks_follow_direction(self):
+        self.assertEqual(PAWN_ATTACKS[WHITE][6 * 8 + 0], (5 * 8 + 1,))
+        self.assertEqual(PAWN_ATTACKS[BLACK][1 * 8 + 4], (2 * 8 + 3, 2 * 8 + 5))
+        self.assertEqual(PAWN_ATTACKS[WHITE][0], ())
+
+    def test_rays_run_outwards_to_the_edge(self):
+        self.assertIn((57, 58, 59, 60, 61, 62, 63), ROOK_RAYS[56])
+        self.assertEqual(len(ROOK_RAYS[56]), 2)
+        self.assertEqual(sum(len(ray) for ray, _ in SLIDER_RAYS[27]), 27)
+
+    def test_square_attacks_on_initial_board(self):
+        board = Board()
+
+        self.assertTrue(is_square_attacked(board, (5, 0), WHITE))
+        self.assertTrue(is_square_attacked(board, (2, 7), BLACK))
+        self.assertFalse(is_square_attacked(board, (4, 4), WHITE))
+
+        self.assertFalse(is_square_attacked(board, (2, 4), WHITE))
+        board.set_piece((7, 1), EMPTY)
+        board.set_piece((4, 3), WHITE | KNIGHT)
+        self.assertTrue(is_square_attacked(board, (2, 4), WHITE))
@@ -0,0 +1,82 @@
+# pylint: skip-file
+
+import random
+import unittest
+from engine.entities.board import Board
+from engine.entities.bitboard import BitBoard
+from engine.entities.pieces import EMPTY, PAWN, QUEEN, WHITE, BLACK, PIECE_CODE_COUNT
+from engine.entities.move import encode_move
+from engine.services.core import generate_legal_moves, is_square_attacked
+from engine.services.ai_engine import AIEngine
+from engine.services.game_service import GameService
+
+
+class TestBitBoard(unittest.TestCase):
+    def assertSameBoard(self, bitboard, board):
+        for row in range(8):
+            for col in range(8):
+                self.assertEqual(bitboard.get_piece((row, col)), board.get_piece((row, col)))
+
+    def test_initial_position_matches_board(self):
+        self.assertSameBoard(BitBoard(), Board())
+
+    def test_set_piece_replaces_and_removes(self):
+        board = BitBoard()
+        board.set_piece((6, 0), WHITE | QUEEN)
+        self.assertEqual(board.get_piece((6, 0)), WHITE | QUEEN)
+
+        board.set_piece((6, 0), EMPTY)
+        self.assertEqual(board.get_piece((6, 0)), EMPTY)
+        self.assertEqual(bin(board.occupied).count("1"), 31)
+
+    def test_masks_follow_squares_during_game(self):
+        rng = random.Random(7)
+        board = BitBoard()
+        for _ in range(80):
+            moves = generate_legal_moves(board)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+
+            piece_masks = [0] * PIECE_CODE_COUNT
+            for square, piece in enumerate(board.squares):
+                if piece:
+                    piece_masks[piece] |= 1 << square
+            self.assertEqual(board.piece_masks, piece_masks)
+            self.assertEqual(board.occupied, sum(piece_masks))
+
+    def test_attacks_match_board(self):
+        rng = random.Random(11)
+        board = Board()
+        for _ in range(60):
+            moves = generate_legal_moves(board)
+            if not moves:
+                break
+            board.make_move(rng.choice(moves))
+
+            bitboard = BitBoard.from_fen(board.to_fen())
+            for square in range(64):
+                for color in (WHITE, BLACK):
+                    self.assertEqual(
+                        is_square_attacked(bitboard, divmod(square, 8), color),
+                        is_square_attacked(board, divmod(square, 8), color),
+                    )
+
+    def test_copy_is_independent(self):
+        board = BitBoard()
+        board_copy = board.copy()
+        self.assertIsInstance(board_copy, BitBoard)
+        self.assertEqual(board_copy.to_fen(), board.to_fen())
+        self.assertEqual(board_copy.piece_masks, board.piece_masks)
+        board_copy.set_piece((6, 4), EMPTY)
+
+        self.assertEqual(board.get_piece((6, 4)), WHITE | PAWN)
+        self.assertEqual(bin(board.occupied).count("1"), 32)
+
+    def test_game_service_and_ai_accept_bitboard(self):
+        game_service = GameService(BitBoard())
+        self.assertTrue(game_service.move_handler(encode_move((6, 4), (4, 4))))
+        self.assertTrue(game_service.move_handler(encode_move((1, 3), (3, 3))))
+
+        ai_move = AIEngine(difficulty=1).get_best_move(game_service.board)
+        self.assertTrue(game_service.move_handler(ai_move))
@@ -0,0 +1,105 @@
+# pylint: skip-file
+
+import random
+import unittest
+from engine.entities.board import Board
+from engine.entities.bitboard import BitBoard
+from engine.entities.pieces import KING, WHITE, BLACK, RANKS
+from engine.entities.move import encode_move
+from engine.entities.piece_square_tables import (
+    MAX_PHASE,
+    MIDGAME_SCORES,
+    ENDGAME_SCORES,
+    compute_eval_scores,
+)
+from engine.services.core import (
+    generate_legal_moves,
+    evaluate_board,
+    evaluate_boards,
+    encode_boards,
+    evaluate_encoded,
+)
+
+
+def eval_totals(board):
+    return board.phase, board.midgame_score, board.endgame_score
+
+
+class TestBoardEvaluator(unittest.TestCase):
+    def assertTotalsKeptDuringGame(self, board):
+        rng = random.Random(3)
+        initial_totals = eval_totals(board)
+        history = []
+
+        for _ in range(120):
+            self.assertEqual(eval_totals(board), compute_eval_scores(board))
+            moves = generate_legal_moves(board)
+            if not moves:
+                break
+            move = rng.choice(moves)
+            history.append((move, board.make_move(move)))
+
+        while history:
+            move, undo = history.pop()
+            board.unmake_move(move, undo)
+        self.assertEqual(eval_totals(board), initial_totals)
+
+    def test_totals_kept_during_game(self):
+        self.assertTotalsKeptDuringGame(Board())
+
+    def test_totals_kept_during_game_on_bitboard(self):
+        self.assertTotalsKeptDuringGame(BitBoard())
+
+    def test_initial_position_is_balanced(self):
+        board = Board()
+
+        self.assertEqual(evaluate_board(board), 0)
+        board.make_move(encode_move((6, 4), (4, 4)))
+        self.assertLess(evaluate_board(board), 0)
+        self.assertEqual(evaluate_board(board), -board.midgame_score)
+
+    def test_phase_blends_midgame_and_endgame_scores(self):
+        middlegame = Board()
+        endgame = Board.from_fen("8/4k3/8/3p4/8/8/4PK2/8 w - - 0 1")
+        rook_endgame = Board.from_fen("8/4k3/8/3p4/8/8/4PK2/R7 w - - 0 1")
+
+        self.assertEqual(middlegame.phase, MAX_PHASE)
+        self.assertEqual(endgame.phase, 0)
+        self.assertEqual(evaluate_board(endgame), endgame.endgame_score)
+        self.assertEqual(rook_endgame.phase, 2)
+        self.assertEqual(
+            evaluate_board(rook_endgame),
+            (rook_endgame.midgame_score * 2 + rook_endgame.endgame_score * 22) // MAX_PHASE,
+        )
+
+    def test_black_tables_mirror_white_tables(self):
+        for rank in RANKS:
+            for index in range(64):
+                self.assertEqual(
+                    MIDGAME_SCORES[BLACK | rank][63 - index], -MIDGAME_SCORES[WHITE | rank][index]
+                )
+                self.assertEqual(
+                    ENDGAME_SCORES[BLACK | rank][63 - index], -ENDGAME_SCORES[WHITE | rank][index]
+                )
+
+    def test_batch_evaluation_matches_single_evaluation(self):
+        rng = random.Random(5)
+        board = BitBoard()
+        boards = [board.copy()]
+        for _ in range(60):
+            board.make_move(rng.choice(generate_legal_moves(board)))
+            boards.append(board.copy())
+        boards[-1].stall_clock = 50
+
+        scores = evaluate_boards(boards)
+
+        self.assertEqual(scores.tolist(), [evaluate_board(board) for board in boards])
+
+    def test_encoded_positions(self):
+        codes = encode_boards([Board(), Board.from_fen("8/4k3/8/3p4/8/8/4PK2/8 w - - 0 1")])
+
+        self.assertEqual(codes.shape, (2, 64))
+        self.assertEqual(codes[0, 60], WHITE | KING)
+        self.assertEqual(codes[0, 4], BLACK | KING)
+        self.assertEqual(codes[1].astype(bool).sum(), 4)
+        self.assertEqual(evaluate_encoded(codes)[0], 0)
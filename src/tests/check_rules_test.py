@@ -2,18 +2,21 @@
 
 import unittest
 from engine.entities.board import Board
+from engine.entities.pieces import BLACK
+from engine.entities.move import encode_move
 from engine.services.core.move_simulator import simulate_move
 
 
 class TestKingCheck(unittest.TestCase):
     def test_disallow_normal_moves_in_check(self):
-        board = Board("black")
+        board = Board()
+        board.side_to_move = BLACK
 
         # Pass if not threatened
-        self.assertTrue(simulate_move(board, ((6, 0), (5, 0))))
+        self.assertTrue(simulate_move(board, encode_move((1, 7), (2, 7))))
 
-        enemy_rook = board.get_piece((0, 0))
-        board.set_piece((6, 3), enemy_rook)
+        enemy_rook = board.get_piece((7, 7))
+        board.set_piece((1, 4), enemy_rook)
 
         # Don't pass if threatened
-        self.assertFalse(simulate_move(board, ((6, 0), (5, 0))))
+        self.assertFalse(simulate_move(board, encode_move((1, 7), (2, 7))))
@@ -2,32 +2,33 @@
 
 import unittest
 from engine.entities.board import Board
+from engine.entities.move import encode_move
 from engine.services.game_service import GameService
 
 
 class TestGameEnd(unittest.TestCase):
     def setUp(self):
-        self.board = Board("black")
+        self.board = Board()
         self.game_service = GameService(self.board)
 
     def test_black_win(self):
-        self.assertTrue(self.game_service.move_handler(((6, 5), (5, 5))))
-        self.assertTrue(self.game_service.move_handler(((6, 3), (5, 3))))
-        self.assertTrue(self.game_service.move_handler(((6, 6), (4, 6))))
-        
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 5), (5, 5))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 4), (2, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 6), (4, 6))))
+
         self.assertEqual(self.game_service.get_winner(), None)
-        self.assertTrue(self.game_service.move_handler(((7, 4), (3, 0))))
+        self.assertTrue(self.game_service.move_handler(encode_move((0, 3), (4, 7))))
         self.assertEqual(self.game_service.get_winner(), "black")
-    
+
     def test_stall_clock_counter(self):
         self.assertEqual(self.game_service.board.stall_clock, 0)
-        self.assertTrue(self.game_service.move_handler(((6, 5), (5, 5))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 5), (5, 5))))
         self.assertEqual(self.game_service.board.stall_clock, 0)
-        self.assertTrue(self.game_service.move_handler(((7, 1), (5, 0))))
+        self.assertTrue(self.game_service.move_handler(encode_move((0, 6), (2, 7))))
         self.assertEqual(self.game_service.board.stall_clock, 1)
-    
+
     def test_stall_draw(self):
         self.game_service.board.stall_clock = 49
-        self.assertTrue(self.game_service.move_handler(((7, 1), (5, 0))))
+        self.assertTrue(self.game_service.move_handler(encode_move((7, 1), (5, 0))))
         self.assertEqual(self.game_service.board.stall_clock, 50)
         self.assertEqual(self.game_service.get_winner(), "draw")
@@ -0,0 +1,109 @@
+# pylint: skip-file
+
+import random
+import unittest
+from engine.entities.board import Board
+from engine.entities.pieces import EMPTY, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK
+from engine.entities.move import EN_PASSANT, encode_move, decode_move
+from engine.services.core import (
+    generate_moves,
+    generate_quiet_moves,
+    generate_legal_moves,
+    is_pseudo_legal,
+    has_legal_move,
+    simulate_move,
+)
+
+
+def empty_board():
+    board = Board()
+    for row in range(8):
+        for col in range(8):
+            board.set_piece((row, col), EMPTY)
+    return board
+
+
+class TestLegalMoves(unittest.TestCase):
+    def assertMatchesFilteredMoves(self, board):
+        expected = [move for move in generate_moves(board) if simulate_move(board, move)]
+        self.assertEqual(list(generate_legal_moves(board)), expected)
+
+    def test_matches_filtered_pseudo_legal_moves(self):
+        for seed in range(4):
+            rng = random.Random(seed)
+            board = Board()
+            for _ in range(100):
+                self.assertMatchesFilteredMoves(board)
+                moves = generate_legal_moves(board)
+                if not moves:
+                    break
+                # Prefer captures and checks to reach tactical positions
+                board.make_move(rng.choice(moves[:3] if rng.random() < 0.3 else moves))
+
+    def test_staged_generation_matches_generate_moves(self):
+        for fen in [
+            "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+            "r3k2r/8/8/3pP3/8/8/1p6/R3K2R w KQkq d6 0 1",
+            "R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1",
+            "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1",
+        ]:
+            board = Board.from_fen(fen)
+            moves = generate_moves(board)
+
+            self.assertEqual(
+                generate_moves(board, only_active=True) + generate_quiet_moves(board), moves
+            )
+            self.assertTrue(all(is_pseudo_legal(board, move) for move in moves))
+            self.assertEqual(has_legal_move(board), bool(generate_legal_moves(board)))
+
+        board = Board()
+        self.assertFalse(is_pseudo_legal(board, encode_move((6, 4), (3, 4))))
+        self.assertFalse(is_pseudo_legal(board, encode_move((1, 4), (3, 4))))
+        self.assertFalse(is_pseudo_legal(board, encode_move((4, 4), (3, 4))))
+
+    def test_pinned_piece_moves_only_along_pin(self):
+        board = empty_board()
+        board.set_piece((7, 4), WHITE | KING)
+        board.set_piece((5, 4), WHITE | ROOK)
+        board.set_piece((6, 3), WHITE | KNIGHT)
+        board.set_piece((1, 4), BLACK | QUEEN)
+        board.set_piece((4, 1), BLACK | BISHOP)
+        board.set_piece((0, 0), BLACK | KING)
+        board.king_positions = {WHITE: (7, 4), BLACK: (0, 0)}
+
+        moves = generate_legal_moves(board)
+
+        self.assertFalse([move for move in moves if decode_move(move)[0] == (6, 3)])
+        rook_targets = {end for start, end in map(decode_move, moves) if start == (5, 4)}
+        self.assertEqual(rook_targets, {(4, 4), (3, 4), (2, 4), (1, 4), (6, 4)})
+        self.assertMatchesFilteredMoves(board)
+
+    def test_double_check_allows_only_king_moves(self):
+        board = empty_board()
+        board.set_piece((7, 4), WHITE | KING)
+        board.set_piece((7, 0), WHITE | ROOK)
+        board.set_piece((2, 4), BLACK | ROOK)
+        board.set_piece((5, 3), BLACK | KNIGHT)
+        board.set_piece((0, 0), BLACK | KING)
+        board.king_positions = {WHITE: (7, 4), BLACK: (0, 0)}
+
+        moves = generate_legal_moves(board)
+
+        self.assertTrue(moves)
+        self.assertTrue(all(start == (7, 4) for start, _ in map(decode_move, moves)))
+        self.assertNotIn(encode_move((7, 4), (6, 4)), moves)
+        self.assertMatchesFilteredMoves(board)
+
+    def test_en_passant_exposing_king_on_rank(self):
+        board = empty_board()
+        board.set_piece((3, 0), WHITE | KING)
+        board.set_piece((3, 4), WHITE | PAWN)
+        board.set_piece((1, 3), BLACK | PAWN)
+        board.set_piece((3, 7), BLACK | ROOK)
+        board.set_piece((0, 7), BLACK | KING)
+        board.king_positions = {WHITE: (3, 0), BLACK: (0, 7)}
+        board.side_to_move = BLACK
+        board.make_move(encode_move((1, 3), (3, 3)))
+
+        self.assertNotIn(encode_move((3, 4), (2, 3), EN_PASSANT), generate_legal_moves(board))
+        self.assertMatchesFilteredMoves(board)
@@ -0,0 +1,134 @@
+# pylint: skip-file
+
+import random
+import unittest
+from engine.entities.board import Board
+from engine.entities.bitboard import BitBoard
+from engine.entities.pieces import (
+    EMPTY,
+    PAWN,
+    ROOK,
+    QUEEN,
+    KING,
+    WHITE,
+    BLACK,
+    COLOR_MASK,
+    RANK_MASK,
+)
+from engine.entities.move import (
+    PROMOTION,
+    EN_PASSANT,
+    CASTLING,
+    START_SHIFT,
+    FLAG_SHIFT,
+    SQUARE_MASK,
+    encode_move,
+)
+from engine.entities.zobrist import compute_key
+from engine.entities.piece_square_tables import compute_eval_scores
+from engine.services.core import generate_moves, make_legal_move, is_in_check
+
+
+# Starting positions with castling, en passant and promotions early in the game
+START_FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+]
+
+
+def expected_squares(board, move):
+    """Applies a move to a copy of the piece array one square at a time, as a reference."""
+    squares = list(board.squares)
+    start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+    flag = move >> FLAG_SHIFT
+    piece = squares[start]
+    squares[start] = EMPTY
+    squares[end] = piece & COLOR_MASK | QUEEN if flag == PROMOTION else piece
+
+    row, start_col, end_col = start // 8, start % 8, end % 8
+    if flag == EN_PASSANT:
+        squares[row * 8 + end_col] = EMPTY
+    elif flag == CASTLING:
+        rook_col, rook_end_col = (7, 5) if end_col > start_col else (0, 3)
+        squares[row * 8 + rook_end_col] = squares[row * 8 + rook_col]
+        squares[row * 8 + rook_col] = EMPTY
+    return squares
+
+
+def expected_en_passant_target(board, move):
+    start, end = move >> START_SHIFT & SQUARE_MASK, move & SQUARE_MASK
+    if board.squares[start] & RANK_MASK == PAWN and abs(start - end) == 16:
+        return divmod((start + end) // 2, 8)
+    return None
+
+
+class TestMakeMove(unittest.TestCase):
+    def assertStateConsistent(self, board):
+        self.assertEqual(board.zobrist_key, compute_key(board))
+        self.assertEqual(
+            (board.phase, board.midgame_score, board.endgame_score), compute_eval_scores(board)
+        )
+        for color in (WHITE, BLACK):
+            king_square = board.squares.index(color | KING)
+            self.assertEqual(board.king_positions[color], divmod(king_square, 8))
+
+    def play_random_game(self, board):
+        rng = random.Random(7)
+
+        for _ in range(80):
+            moves = generate_moves(board)
+            rng.shuffle(moves)
+            legal_moves = []
+            for move in moves:
+                color = board.side_to_move
+                before = (list(board.squares), board.to_fen(), board.zobrist_key)
+                squares = expected_squares(board, move)
+                en_passant_target = expected_en_passant_target(board, move)
+
+                undo = make_legal_move(board, move)
+                if undo is None:
+                    self.assertEqual(
+                        (list(board.squares), board.to_fen(), board.zobrist_key), before
+                    )
+                    continue
+
+                legal_moves.append(move)
+                self.assertEqual(list(board.squares), squares)
+                self.assertEqual(board.en_passant_target, en_passant_target)
+                self.assertNotEqual(board.side_to_move, color)
+                self.assertFalse(is_in_check(board, color))
+                self.assertStateConsistent(board)
+
+                board.unmake_move(move, undo)
+                self.assertEqual((list(board.squares), board.to_fen(), board.zobrist_key), before)
+                self.assertStateConsistent(board)
+
+            if not legal_moves:
+                break
+            board.make_move(rng.choice(legal_moves))
+
+    def test_make_unmake_matches_reference(self):
+        for fen in START_FENS:
+            self.play_random_game(Board.from_fen(fen))
+
+    def test_make_unmake_on_bitboard(self):
+        for fen in START_FENS:
+            self.play_random_game(BitBoard.from_fen(fen))
+
+    def test_unmake_castling(self):
+        board = Board()
+        for col in (5, 6):
+            board.set_piece((7, col), EMPTY)
+
+        undo = board.make_move(encode_move((7, 4), (7, 6), CASTLING))
+        self.assertEqual(board.get_piece((7, 5)), WHITE | ROOK)
+        self.assertEqual(board.king_positions[WHITE], (7, 6))
+
+        board.unmake_move(encode_move((7, 4), (7, 6), CASTLING), undo)
+        self.assertEqual(board.get_piece((7, 4)), WHITE | KING)
+        self.assertEqual(board.get_piece((7, 7)), WHITE | ROOK)
+        self.assertEqual(board.get_piece((7, 5)), EMPTY)
+        self.assertEqual(board.king_positions[WHITE], (7, 4))
@@ -0,0 +1,108 @@
+# pylint: skip-file
+
+import os
+import tempfile
+import unittest
+from engine.entities.board import Board
+from engine.entities.move import PROMOTION, CASTLING, encode_move
+from engine.services.ai_engine import AIEngine
+from engine.services.opening_book import (
+    OpeningBook,
+    build_book,
+    move_from_san,
+    read_pgn_games,
+    encode_book_move,
+    decode_book_move,
+)
+
+PGN = """[Event "First"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {main line} Nc6 (2... d6 3. d4) 3. Bb5 a6 1-0
+
+[Event "Second"]
+[Result "*"]
+
+1. e4 c5 2. Nf3 $1 d6 *
+
+[Event "Third"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 0-1
+"""
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "book.bin")
+        self.games, self.entries = build_book([PGN], self.path)
+        self.book = OpeningBook(self.path, seed=1)
+
+    def tearDown(self):
+        self.book.close()
+        self.directory.cleanup()
+
+    def test_read_pgn_games_skips_comments_and_variations(self):
+        games = read_pgn_games(PGN)
+
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games[0], ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6"])
+        self.assertEqual(games[1], ["e4", "c5", "Nf3", "d6"])
+
+    def test_probe_weights_moves_by_games(self):
+        self.assertEqual((self.games, self.entries), (3, 12))
+
+        moves = dict(self.book.probe(Board()))
+        self.assertEqual(moves, {encode_move((6, 4), (4, 4)): 2, encode_move((6, 3), (4, 3)): 1})
+
+        board = Board()
+        board.make_move(encode_move((6, 4), (4, 4)))
+        self.assertEqual(len(self.book.probe(board)), 2)
+
+        board.make_move(encode_move((1, 0), (2, 0)))
+        self.assertEqual(self.book.probe(board), [])
+        self.assertIsNone(self.book.choose_move(board))
+
+    def test_engine_plays_book_moves(self):
+        stats = []
+        ai_engine = AIEngine(difficulty=3, opening_book=self.book, stats_callback=stats.append)
+
+        move = ai_engine.get_best_move(Board())
+
+        self.assertIn(move, [encode_move((6, 4), (4, 4)), encode_move((6, 3), (4, 3))])
+        self.assertTrue(stats[0].book_move)
+        self.assertEqual(stats[0].nodes, 0)
+        ai_engine.close()
+
+    def test_move_from_san(self):
+        board = Board.from_fen("r3k2r/8/8/8/8/2N3N1/8/R3K2R w KQkq - 0 1")
+
+        self.assertEqual(move_from_san(board, "O-O"), encode_move((7, 4), (7, 6), CASTLING))
+        self.assertEqual(move_from_san(board, "O-O-O+"), encode_move((7, 4), (7, 2), CASTLING))
+        self.assertEqual(move_from_san(board, "Nce4"), encode_move((5, 2), (4, 4)))
+        self.assertIsNone(move_from_san(board, "Ne4"))
+        self.assertIsNone(move_from_san(Board.from_fen("8/P7/8/8/8/8/k6K/8 w - - 0 1"), "a8=N"))
+        self.assertEqual(
+            move_from_san(Board.from_fen("8/P7/8/8/8/8/k6K/8 w - - 0 1"), "a8=Q"),
+            encode_move((1, 0), (0, 0), PROMOTION),
+        )
+
+    def test_move_encoding_round_trip(self):
+        board = Board.from_fen("r3k2r/P7/8/8/8/8/4P3/R3K2R w KQkq - 0 1")
+        for move in [
+            encode_move((7, 0), (0, 0)),
+            encode_move((7, 4), (7, 6), CASTLING),
+            encode_move((6, 4), (4, 4)),
+            encode_move((1, 0), (0, 1), PROMOTION),
+        ]:
+            self.assertLess(encode_book_move(move), 1 << 12)
+            self.assertEqual(decode_book_move(board, encode_book_move(move)), move)
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.directory.name, "other.bin")
+        with open(path, "wb") as file:
+            file.write(b"not a book file")
+
+        with self.assertRaises(ValueError):
+            OpeningBook(path)
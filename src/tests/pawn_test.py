@@ -2,44 +2,67 @@
 
 import unittest
 from engine.entities.board import Board
+from engine.entities.pieces import EMPTY, PAWN, WHITE, BLACK
+from engine.entities.move import EN_PASSANT, encode_move
 from engine.services.game_service import GameService
 
 
 class TestPawn(unittest.TestCase):
     def setUp(self):
-        self.board = Board("white")
+        self.board = Board()
         self.game_service = GameService(self.board)
 
     def test_pawn_move(self):
-        self.assertTrue(self.game_service.move_handler(((6, 2), (5, 2))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 2), (5, 2))))
 
     def test_pawn_can_jump(self):
-        self.assertTrue(self.game_service.move_handler(((6, 2), (4, 2))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 2), (4, 2))))
 
     def test_pawn_loses_jump_ability(self):
-        self.game_service.move_handler(((6, 2), (4, 2)))
-        self.game_service.move_handler(((6, 0), (5, 0)))
+        self.game_service.move_handler(encode_move((6, 2), (4, 2)))
+        self.game_service.move_handler(encode_move((1, 7), (2, 7)))
 
-        self.assertFalse(self.game_service.move_handler(((4, 2), (2, 2))))
-        self.assertFalse(self.game_service.move_handler(((5, 2), (3, 2))))
+        self.assertFalse(self.game_service.move_handler(encode_move((4, 2), (2, 2))))
+        self.assertFalse(self.game_service.move_handler(encode_move((5, 2), (3, 2))))
 
     def test_pawn_can_diagonal_eat(self):
-        self.assertTrue(self.game_service.move_handler(((6, 3), (4, 3))))
-        self.assertTrue(self.game_service.move_handler(((6, 3), (4, 3))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 3), (4, 3))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 4), (3, 4))))
 
-        self.assertTrue(self.game_service.move_handler(((4, 3), (3, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((4, 3), (3, 4))))
 
-        self.assertEqual(self.game_service.board.get_piece((3, 4)), None)
-        self.assertEqual(self.game_service.board.get_piece((4, 3)), ('white', 'pawn', False))
+        self.assertEqual(self.game_service.board.get_piece((4, 3)), EMPTY)
+        self.assertEqual(self.game_service.board.get_piece((3, 4)), WHITE | PAWN)
 
     def test_pawn_cant_diagonal_move(self):
-        self.assertFalse(self.game_service.move_handler(((6, 2), (5, 3))))
+        self.assertFalse(self.game_service.move_handler(encode_move((6, 2), (5, 3))))
 
     def test_pawn_cant_forward_eat(self):
-        self.assertTrue(self.game_service.move_handler(((6, 4), (4, 4))))
-        self.assertTrue(self.game_service.move_handler(((6, 3), (4, 3))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 4), (4, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 4), (3, 4))))
 
-        self.assertFalse(self.game_service.move_handler(((4, 4), (3, 4))))
+        self.assertFalse(self.game_service.move_handler(encode_move((4, 4), (3, 4))))
 
-        self.assertEqual(self.game_service.board.get_piece((3, 4)), ('black', 'pawn', False))
-        self.assertEqual(self.game_service.board.get_piece((4, 4)), ('white', 'pawn', False))
+        self.assertEqual(self.game_service.board.get_piece((3, 4)), BLACK | PAWN)
+        self.assertEqual(self.game_service.board.get_piece((4, 4)), WHITE | PAWN)
+
+    def test_pawn_en_passant(self):
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 4), (4, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 0), (2, 0))))
+        self.assertTrue(self.game_service.move_handler(encode_move((4, 4), (3, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 3), (3, 3))))
+
+        self.assertTrue(self.game_service.move_handler(encode_move((3, 4), (2, 3), EN_PASSANT)))
+
+        self.assertEqual(self.game_service.board.get_piece((3, 3)), EMPTY)
+        self.assertEqual(self.game_service.board.get_piece((2, 3)), WHITE | PAWN)
+
+    def test_pawn_en_passant_expires(self):
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 4), (4, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 0), (2, 0))))
+        self.assertTrue(self.game_service.move_handler(encode_move((4, 4), (3, 4))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 3), (3, 3))))
+        self.assertTrue(self.game_service.move_handler(encode_move((6, 7), (5, 7))))
+        self.assertTrue(self.game_service.move_handler(encode_move((1, 7), (2, 7))))
+
+        self.assertFalse(self.game_service.move_handler(encode_move((3, 4), (2, 3), EN_PASSANT)))
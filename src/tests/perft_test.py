@@ -0,0 +1,61 @@
+# pylint: skip-file
+
+import unittest
+from engine.entities.board import Board
+from engine.entities.pieces import KING, WHITE, BLACK
+from engine.entities.move import encode_move
+from engine.services.perft import PERFT_SUITE, perft, divide, run_suite
+
+
+class TestPerft(unittest.TestCase):
+    def test_suite_node_counts(self):
+        self.assertTrue(run_suite(max_depth=2, report=lambda _: None))
+
+    def test_divide_sums_to_perft(self):
+        name, fen, expected_counts = PERFT_SUITE[1]
+        board = Board.from_fen(fen)
+
+        counts = divide(board, 2)
+
+        self.assertEqual(len(counts), expected_counts[1])
+        self.assertEqual(sum(counts.values()), expected_counts[2])
+        self.assertEqual(perft(board, 2), expected_counts[2])
+
+    def test_from_fen_initial_position(self):
+        board = Board.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        initial_board = Board()
+
+        for row in range(8):
+            for col in range(8):
+                self.assertEqual(board.get_piece((row, col)), initial_board.get_piece((row, col)))
+        self.assertEqual(board.zobrist_key, initial_board.zobrist_key)
+
+    def test_from_fen_state(self):
+        board = Board.from_fen("4k3/8/8/3pP3/8/8/8/R3K3 w Q d6 3 40")
+
+        self.assertEqual(board.en_passant_target, (2, 3))
+        self.assertEqual(board.stall_clock, 3)
+        self.assertEqual(board.castling_rights, 2)
+        self.assertEqual(board.king_positions, {WHITE: (7, 4), BLACK: (0, 4)})
+        self.assertEqual(board.get_piece((0, 4)), BLACK | KING)
+
+    def test_to_fen_round_trip(self):
+        for name, fen, expected_counts in PERFT_SUITE[:3]:
+            board = Board.from_fen(fen)
+            self.assertEqual(board.to_fen(), fen)
+
+        board = Board()
+        board.make_move(encode_move((6, 4), (4, 4)))
+        fen = board.to_fen()
+
+        self.assertEqual(fen, "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1")
+        self.assertEqual(Board.from_fen(fen).zobrist_key, board.zobrist_key)
+
+        move = encode_move((1, 4), (3, 4))
+        undo = board.make_move(move)
+        self.assertEqual(
+            board.to_fen(), "rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq e6 0 2"
+        )
+        self.assertEqual(Board.from_fen(board.to_fen()).fullmove_number, 2)
+        board.unmake_move(move, undo)
+        self.assertEqual(board.to_fen(), fen)
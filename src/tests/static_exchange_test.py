@@ -0,0 +1,70 @@
+# pylint: skip-file
+
+import unittest
+from engine.entities.board import Board
+from engine.entities.pieces import WHITE, BLACK
+from engine.entities.move import PROMOTION, EN_PASSANT, encode_move
+from engine.services.ai_engine import AIEngine
+from engine.services.core import (
+    captured_value,
+    generate_legal_moves,
+    mvv_lva_score,
+    static_exchange_evaluation,
+)
+from engine.services.core.check_detector import find_attackers
+
+
+class TestStaticExchange(unittest.TestCase):
+    def test_find_attackers_sees_through_ignored_pieces(self):
+        board = Board.from_fen("4k3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1")
+
+        self.assertEqual(find_attackers(board, 27, WHITE), [51])
+        self.assertEqual(sorted(find_attackers(board, 27, WHITE, ignored={51})), [59])
+        self.assertEqual(find_attackers(board, 36, BLACK), [27])
+
+    def test_undefended_pawn_is_won(self):
+        board = Board.from_fen("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1")
+
+        self.assertEqual(static_exchange_evaluation(board, encode_move((7, 4), (3, 4))), 100)
+
+    def test_defended_pawn_loses_the_knight(self):
+        board = Board.from_fen("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+
+        self.assertEqual(static_exchange_evaluation(board, encode_move((5, 3), (3, 4))), -220)
+
+    def test_king_only_recaptures_undefended_piece(self):
+        board = Board.from_fen("4k3/4p3/8/8/8/8/4R3/4K3 w - - 0 1")
+        self.assertEqual(static_exchange_evaluation(board, encode_move((6, 4), (1, 4))), -410)
+
+        board = Board.from_fen("4k3/4p3/8/8/8/8/4R3/4R1K1 w - - 0 1")
+        self.assertEqual(static_exchange_evaluation(board, encode_move((6, 4), (1, 4))), 100)
+
+        board = Board.from_fen("4k3/3qp3/8/8/8/8/4R3/6K1 w - - 0 1")
+        self.assertEqual(static_exchange_evaluation(board, encode_move((6, 4), (1, 4))), -410)
+
+    def test_captured_value_of_special_moves(self):
+        en_passant = Board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+        promotion = Board.from_fen("1n2k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+
+        self.assertEqual(captured_value(en_passant, encode_move((3, 4), (2, 3), EN_PASSANT)), 100)
+        self.assertEqual(captured_value(promotion, encode_move((1, 0), (0, 0), PROMOTION)), 875)
+        self.assertEqual(captured_value(promotion, encode_move((1, 0), (0, 1), PROMOTION)), 1195)
+
+    def test_mvv_lva_orders_valuable_victims_first(self):
+        board = Board.from_fen("4k3/8/2q3r1/1P2N3/8/8/8/4K3 w - - 0 1")
+        captures = [move for move in generate_legal_moves(board) if captured_value(board, move)]
+
+        captures.sort(key=lambda move: mvv_lva_score(board, move), reverse=True)
+
+        self.assertEqual(
+            captures,
+            [encode_move((3, 1), (2, 2)), encode_move((3, 4), (2, 2)), encode_move((3, 4), (2, 6))],
+        )
+
+    def test_quiescence_skips_losing_captures(self):
+        ai_engine = AIEngine(difficulty=1)
+        board = Board.from_fen("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1")
+
+        ai_engine._quiescence_search(board, -ai_engine.INFINITY, ai_engine.INFINITY)
+
+        self.assertGreater(ai_engine._stats.losing_captures_pruned, 0)
@@ -0,0 +1,114 @@
+# pylint: skip-file
+
+import os
+import tempfile
+import unittest
+from engine.entities.board import Board
+from engine.entities.pieces import KING, QUEEN, WHITE, BLACK
+from engine.entities.move import encode_move
+from engine.services.ai_engine import AIEngine
+from engine.services.tablebase import (
+    Tablebase,
+    WIN,
+    DRAW,
+    LOSS,
+    is_canonical,
+    material_signature,
+    position_index,
+    table_size,
+)
+from engine.services.tablebase_generator import generate_tablebase, _dependencies
+
+TABLEBASE_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "assets", "tablebases")
+
+
+class TestTablebase(unittest.TestCase):
+    def setUp(self):
+        self.tablebase = Tablebase(TABLEBASE_DIRECTORY)
+
+    def tearDown(self):
+        self.tablebase.close()
+
+    def probe(self, fen):
+        return self.tablebase.probe(Board.from_fen(fen))
+
+    def test_signatures(self):
+        self.assertEqual(material_signature([QUEEN, KING], [KING]), "KQvK")
+        self.assertTrue(is_canonical("KQvK"))
+        self.assertFalse(is_canonical("KvKR"))
+        self.assertEqual(table_size("KQvK"), 2 * 10 * 64 * 64)
+        self.assertEqual(self.tablebase.signatures, {"KQvK", "KRvK", "KPvK"})
+
+    def test_index_is_symmetric(self):
+        # White king on h8 and a1 are mirror images of each other
+        self.assertEqual(
+            position_index(WHITE, [7, 20], False), position_index(WHITE, [56, 43], False)
+        )
+        self.assertNotEqual(
+            position_index(WHITE, [56, 0], False), position_index(BLACK, [56, 0], False)
+        )
+
+    def test_known_results(self):
+        self.assertEqual(self.probe("7k/8/8/8/8/8/8/KQ6 w - - 0 1")[0], WIN)
+        self.assertEqual(self.probe("7k/6Q1/5K2/8/8/8/8/8 b - - 0 1"), (LOSS, 0))
+        self.assertEqual(self.probe("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"), (DRAW, 0))
+        self.assertEqual(self.probe("8/8/8/8/8/4k3/4P3/4K3 w - - 0 1"), (DRAW, 0))
+        self.assertEqual(self.probe("4k3/8/4K3/4P3/8/8/8/8 b - - 0 1")[0], LOSS)
+        self.assertEqual(self.probe("8/8/8/8/8/8/8/KB5k w - - 0 1"), (DRAW, 0))
+
+    def test_longest_mates(self):
+        for signature, plies in (("KQvK", 20), ("KRvK", 32)):
+            with open(os.path.join(TABLEBASE_DIRECTORY, f"{signature}.dtm"), "rb") as dtm_file:
+                self.assertEqual(max(dtm_file.read()), plies)
+
+    def test_colors_swapped_give_same_result(self):
+        self.assertEqual(
+            self.probe("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1"),
+            self.probe("8/8/8/8/4p3/4k3/8/4K3 b - - 0 1"),
+        )
+        self.assertEqual(
+            self.probe("8/8/8/3k4/8/8/1R6/K7 b - - 0 1"),
+            self.probe("k7/1r6/8/8/3K4/8/8/8 w - - 0 1"),
+        )
+
+    def test_skips_other_positions(self):
+        self.assertIsNone(self.tablebase.probe(Board()))
+        self.assertIsNone(self.probe("7k/8/8/8/8/8/8/KQQ5 w - - 0 1"))
+        self.assertIsNone(self.probe("4k3/8/8/8/8/8/8/R3K3 w Q - 0 1"))
+
+    def test_engine_plays_tablebase_moves(self):
+        stats = []
+        ai_engine = AIEngine(difficulty=1, tablebase=self.tablebase, stats_callback=stats.append)
+
+        # Mate in one with the rook
+        move = ai_engine.get_best_move(Board.from_fen("6k1/8/6K1/8/8/8/8/R7 w - - 0 1"))
+
+        self.assertEqual(move, encode_move((7, 0), (0, 0)))
+        self.assertTrue(stats[0].tablebase_move)
+        ai_engine.close()
+
+    def test_search_scores_tablebase_positions(self):
+        ai_engine = AIEngine(difficulty=1, tablebase=self.tablebase)
+        board = Board.from_fen("8/8/8/8/8/4k3/4P3/4K3 b - - 0 1")
+
+        self.assertEqual(
+            ai_engine._negamax(board, 2, -ai_engine.INFINITY, ai_engine.INFINITY, 1), 0
+        )
+        self.assertEqual(ai_engine._stats.tablebase_hits, 1)
+        ai_engine.close()
+
+
+class TestTablebaseGenerator(unittest.TestCase):
+    def test_dependencies_come_first(self):
+        self.assertEqual(_dependencies("KPvK"), ["KQvK", "KPvK"])
+        self.assertEqual(_dependencies("KvKR"), ["KRvK"])
+
+    def test_generates_shipped_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            positions = generate_tablebase("KRvK", directory, report=lambda _: None)
+
+            self.assertEqual(positions, 62320)
+            for extension in ("wdl", "dtm"):
+                with open(os.path.join(directory, f"KRvK.{extension}"), "rb") as new_file:
+                    with open(os.path.join(TABLEBASE_DIRECTORY, f"KRvK.{extension}"), "rb") as file:
+                        self.assertEqual(new_file.read(), file.read())
@@ -0,0 +1,77 @@
+# pylint: skip-file
+
+import unittest
+from engine.entities.move import encode_move
+from engine.services.transposition_table import (
+    TranspositionTable,
+    EXACT,
+    LOWER_BOUND,
+    UPPER_BOUND,
+)
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(size_mb=1)
+        self.bucket_count = self.table.size_bytes // 32
+
+    def test_size_stays_under_limit(self):
+        self.assertLessEqual(self.table.size_bytes, 1024 * 1024)
+        self.assertGreater(TranspositionTable(size_mb=4).size_bytes, self.table.size_bytes)
+
+    def test_store_and_probe(self):
+        self.table.store(12345, -750, 3, UPPER_BOUND, encode_move((6, 4), (4, 4)))
+        self.table.store(67890, 100000, 0, EXACT, None)
+
+        self.assertEqual(
+            self.table.probe(12345), (-750, 3, UPPER_BOUND, encode_move((6, 4), (4, 4)))
+        )
+        self.assertEqual(self.table.probe(67890), (100000, 0, EXACT, None))
+        self.assertEqual(self.table.probe(54321), None)
+        self.assertEqual((self.table.hits, self.table.misses), (2, 1))
+
+    def test_depth_preferred_and_always_replace_slots(self):
+        deep, shallow, newest = 7, 7 + self.bucket_count, 7 + 2 * self.bucket_count
+
+        self.table.store(deep, 10, 5, EXACT, None)
+        self.table.store(shallow, 20, 1, LOWER_BOUND, None)
+        self.table.store(newest, 30, 2, EXACT, None)
+
+        # Deep entry is kept, shallow entries take turns in the always-replace slot
+        self.assertEqual(self.table.probe(deep)[0], 10)
+        self.assertEqual(self.table.probe(shallow), None)
+        self.assertEqual(self.table.probe(newest)[0], 30)
+        self.assertEqual(self.table.collisions, 1)
+
+    def test_new_search_lets_old_deep_entries_be_replaced(self):
+        deep, newer = 7, 7 + self.bucket_count
+
+        self.table.store(deep, 10, 5, EXACT, None)
+        self.table.new_search()
+        self.table.store(newer, 20, 1, EXACT, None)
+
+        self.assertEqual(self.table.probe(newer)[0], 20)
+        self.assertEqual(self.table.probe(deep), None)
+
+    def test_shared_table_is_visible_to_attached_table(self):
+        shared_table = TranspositionTable(size_mb=1, shared=True)
+        attached_table = TranspositionTable.attach(shared_table.name, size_mb=1)
+        try:
+            shared_table.store(12345, 42, 2, EXACT, encode_move((6, 4), (4, 4)))
+            attached_table.store(67890, -7, 1, LOWER_BOUND, None)
+
+            self.assertEqual(
+                attached_table.probe(12345), (42, 2, EXACT, encode_move((6, 4), (4, 4)))
+            )
+            self.assertEqual(shared_table.probe(67890), (-7, 1, LOWER_BOUND, None))
+        finally:
+            attached_table.close()
+            shared_table.close()
+
+    def test_torn_entry_does_not_match(self):
+        self.table.store(12345, 42, 2, EXACT, None)
+        index = (12345 % self.bucket_count) * 4
+        # Data word of another position written without its key word
+        self.table._table[index + 1] ^= 1
+
+        self.assertEqual(self.table.probe(12345), None)
@@ -0,0 +1,93 @@
+# pylint: skip-file
+
+import random
+import unittest
+from engine.entities.board import Board
+from engine.entities.bitboard import BitBoard
+from engine.entities.zobrist import compute_key
+from engine.entities.pieces import EMPTY
+from engine.entities.move import encode_move
+from engine.services.core import generate_moves, make_legal_move
+
+
+class TestZobrist(unittest.TestCase):
+    def play(self, board, moves):
+        for move in moves:
+            board.make_move(move)
+        return board.zobrist_key
+
+    def test_key_matches_full_computation_during_game(self):
+        for board in (Board(), BitBoard()):
+            rng = random.Random(3)
+            self.assertEqual(board.zobrist_key, compute_key(board))
+
+            for _ in range(60):
+                moves = generate_moves(board)
+                rng.shuffle(moves)
+                for move in moves:
+                    key = board.zobrist_key
+                    if (undo := make_legal_move(board, move)) is None:
+                        continue
+                    self.assertEqual(board.zobrist_key, compute_key(board))
+                    board.unmake_move(move, undo)
+                    self.assertEqual(board.zobrist_key, key)
+
+                legal_moves = [move for move in moves if make_legal_move(board.copy(), move)]
+                if not legal_moves:
+                    break
+                board.make_move(rng.choice(legal_moves))
+
+    def test_transposed_move_orders_share_key(self):
+        knight_f3, knight_c3, knight_c6 = (
+            encode_move((7, 6), (5, 5)),
+            encode_move((7, 1), (5, 2)),
+            encode_move((0, 1), (2, 2)),
+        )
+
+        key = self.play(Board(), [knight_f3, knight_c6, knight_c3])
+        self.assertEqual(key, self.play(Board(), [knight_c3, knight_c6, knight_f3]))
+
+    def test_side_to_move_and_castling_rights_change_key(self):
+        board = Board()
+        initial_key = board.zobrist_key
+
+        # Knights out and back: same position with the same side to move
+        self.play(
+            board,
+            [
+                encode_move((7, 6), (5, 5)),
+                encode_move((0, 6), (2, 5)),
+                encode_move((5, 5), (7, 6)),
+                encode_move((2, 5), (0, 6)),
+            ],
+        )
+        self.assertEqual(board.zobrist_key, initial_key)
+
+        # King steps out and back: same pieces, but castling rights are gone
+        board.set_piece((7, 5), EMPTY)
+        key_before_king_moves = board.zobrist_key
+        self.play(
+            board,
+            [
+                encode_move((7, 4), (7, 5)),
+                encode_move((0, 6), (2, 5)),
+                encode_move((7, 5), (7, 4)),
+                encode_move((2, 5), (0, 6)),
+            ],
+        )
+        self.assertEqual(board.castling_rights, 12)
+        self.assertNotEqual(board.zobrist_key, key_before_king_moves)
+        self.assertEqual(board.zobrist_key, compute_key(board))
+
+    def test_null_move_passes_turn(self):
+        board = Board()
+        board.make_move(encode_move((6, 4), (4, 4)))
+        key, fen = board.zobrist_key, board.to_fen()
+
+        undo = board.make_null_move()
+        self.assertEqual(board.zobrist_key, compute_key(board))
+        self.assertIsNone(board.en_passant_target)
+        self.assertEqual(board.to_fen(), "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 1")
+
+        board.unmake_null_move(undo)
+        self.assertEqual((board.zobrist_key, board.to_fen()), (key, fen))
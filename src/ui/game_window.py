@@ -1,5 +1,7 @@
 # pylint: skip-file
 import pygame
+from engine.entities.pieces import piece_names
+from engine.entities.move import move_from_positions
 
 BOARD_SIZE = 640
 WIDTH, HEIGHT = 800, 800
@@ -50,6 +52,8 @@ class GameWindow:
         """
         while self._running:
             self._handle_events()
+            if self._game_service.poll_ai_move():
+                self._board = self._game_service.board
             self._render()
             self._clock.tick(60)
             if self._return_to_menu:
@@ -59,25 +63,29 @@ class GameWindow:
     def _handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                self._game_service.cancel_ai_move()
                 self._running = False
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 pos = pygame.mouse.get_pos()
 
                 # Check for menu button click
                 if self._menu_button.collidepoint(pos):
+                    self._game_service.cancel_ai_move()
                     self._return_to_menu = True
                     self._running = False
                     return
 
                 # Check for board click
                 board_pos = self._get_board_square(pos)
-                if board_pos:
+                if board_pos and not self._game_service.is_ai_thinking():
+                    board_pos = self._to_board_position(board_pos)
                     if not self._clicks and not self._board.get_piece(board_pos):
                         return
                     self._clicks.append(board_pos)
 
                     if len(self._clicks) == 2:
-                        new_board = self._game_service.move_handler(tuple(self._clicks))
+                        move = move_from_positions(self._board, *self._clicks)
+                        new_board = self._game_service.move_handler(move, wait_for_ai=False)
                         if new_board:
                             self._board = new_board
                         self._clicks = []
@@ -103,6 +111,13 @@ class GameWindow:
             return (row, col)
         return None
 
+    def _to_board_position(self, view_pos):
+        # The board is shown from the perspective's side, so black sees it turned around
+        row, col = view_pos
+        if self._game_service.get_perspective() == "black":
+            return (7 - row, 7 - col)
+        return (row, col)
+
     def _render(self):
         self._screen.fill(BG_COLOR)
 
@@ -113,6 +128,11 @@ class GameWindow:
         menu_rect = menu_text.get_rect(center=self._menu_button.center)
         self._screen.blit(menu_text, menu_rect)
 
+        if self._game_service.is_ai_thinking():
+            thinking_text = self._font.render("Thinking...", True, BLACK)
+            thinking_rect = thinking_text.get_rect(midright=(WIDTH - 10, self._menu_button.centery))
+            self._screen.blit(thinking_text, thinking_rect)
+
         if winner := self._game_service.get_winner():
             self._render_game_over(winner)
 
@@ -129,18 +149,20 @@ class GameWindow:
                     SQUARE_SIZE,
                 )
                 pygame.draw.rect(self._screen, square_color, rect)
+                board_pos = self._to_board_position((row, col))
 
                 # Highlight
-                if (row, col) in self._clicks:
+                if board_pos in self._clicks:
                     square_highlight = WHITE_HIGHLIGHT if (row + col) % 2 == 0 else DARK_HIGHLIGHT
                     pygame.draw.rect(self._screen, square_highlight, rect)
 
-                piece = self._board.get_piece((row, col))
+                piece = self._board.get_piece(board_pos)
                 if piece:
-                    image_path = f"assets/pieces/{piece[0]}_{piece[1]}.png"
+                    color, rank = piece_names(piece)
+                    image_path = f"assets/pieces/{color}_{rank}.png"
                     piece_image = pygame.image.load(image_path).convert_alpha()
                     image_rect = piece_image.get_rect(center=rect.center)
-                    if piece[1] == "pawn" or piece[1] == "knight":
+                    if rank == "pawn" or rank == "knight":
                         image_rect.x -= 1
                     self._screen.blit(piece_image, image_rect)
 
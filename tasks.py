@@ -25,6 +25,31 @@ def coverage_report(ctx):
     ctx.run("coverage html", pty=PTY_OPTION)
 
 
+@task
+def perft(ctx, depth=3, fen=None, divide=False):
+    fen_option = f' --fen "{fen}"' if fen else ""
+    divide_option = " --divide" if divide else ""
+    ctx.run(
+        f"{executable} src/perft.py --depth {depth}{fen_option}{divide_option}", pty=PTY_OPTION
+    )
+
+
+@task
+def build_book(ctx, pgn="assets/openings.pgn", max_ply=16):
+    ctx.run(
+        f"{executable} src/build_book.py {pgn} --output assets/opening_book.bin --max-ply {max_ply}",
+        pty=PTY_OPTION,
+    )
+
+
+@task
+def build_tablebases(ctx, signatures=""):
+    ctx.run(
+        f"{executable} src/build_tablebases.py {signatures} --output assets/tablebases",
+        pty=PTY_OPTION,
+    )
+
+
 @task
 def lint(ctx):
     ctx.run("pylint src/", pty=PTY_OPTION)